@@ -14,6 +14,7 @@ from datetime import datetime
 from pathlib import Path
 from typing import Any, Dict, List, Tuple
 
+from pipeline_profiling import run_profiled, stage
 
 REPO_ROOT = Path(__file__).resolve().parents[1]
 BACKEND_AI_ROOT = REPO_ROOT / "backend_ai"
@@ -41,6 +42,7 @@ DAYMASTERS = [
     ("임", "수"),
     ("계", "수"),
 ]
+TEN_GODS = ["비견", "식신", "정재", "정관", "정인", "편재", "상관", "편관", "편인", "겁재"]
 SIGNS = ["Aries", "Taurus", "Gemini", "Cancer", "Leo", "Virgo", "Libra", "Scorpio", "Sagittarius", "Capricorn", "Aquarius", "Pisces"]
 
 
@@ -122,9 +124,8 @@ def _build_sample(index: int) -> Tuple[Dict[str, Any], Dict[str, Any], str]:
     asc_sign = SIGNS[(index + 5) % len(SIGNS)]
     theme = THEMES[index % len(THEMES)]
 
-    ten_god_cycle = ["비견", "식신", "정재", "정관", "정인", "편재", "상관", "편관", "편인", "겁재"]
-    dominant = ten_god_cycle[index % len(ten_god_cycle)]
-    secondary = ten_god_cycle[(index + 2) % len(ten_god_cycle)]
+    dominant = TEN_GODS[index % len(TEN_GODS)]
+    secondary = TEN_GODS[(index + 2) % len(TEN_GODS)]
     kibsin = ["금", "수", "목", "화", "토"][(index + 1) % 5]
 
     saju_data = {
@@ -306,12 +307,13 @@ def _write_md(path: Path, payload: Dict[str, Any]) -> None:
 
 
 async def _run(samples: int, locale: str) -> Dict[str, Any]:
+    # Uncached on purpose: _forbidden_calls_count is a regression gate on the live backend.
     from backend_ai.app.rag_manager import prefetch_all_rag_data_async
-    from backend_ai.app.rag.cross_store import build_cross_summary
     from backend_ai.app.rag.advanced_signals import (
         extract_astro_advanced_signals,
         extract_saju_advanced_signals,
     )
+    from cross_batch import CrossItem, build_cross_summaries
 
     sample_rows: List[Dict[str, Any]] = []
     total_groups = 0
@@ -320,6 +322,8 @@ async def _run(samples: int, locale: str) -> Dict[str, Any]:
     empty_advanced_link_count = 0
     forbidden_total = 0
 
+    prepared: List[Tuple[Dict[str, Any], Dict[str, Any], str, str, int]] = []
+    batch: List[CrossItem] = []
     for idx in range(samples):
         saju_data, astro_data, theme = _build_sample(idx)
         query = _build_query(theme, saju_data, astro_data)
@@ -329,17 +333,13 @@ async def _run(samples: int, locale: str) -> Dict[str, Any]:
         forbidden_count = _forbidden_calls_count(prefetch)
         forbidden_total += forbidden_count
 
-        summary, grouped = build_cross_summary(
-            query,
-            saju_seed=saju_seed,
-            astro_seed=astro_seed,
-            saju_json=saju_data,
-            astro_json=astro_data,
-            top_k=12,
-            max_groups=3,
-            return_meta=True,
-        )
+        prepared.append((saju_data, astro_data, theme, query, forbidden_count))
+        batch.append(CrossItem(query, saju_seed, astro_seed, saju_data, astro_data))
 
+    cross_results = build_cross_summaries(batch, top_k=12, max_groups=3, return_meta=True)
+    for idx, ((saju_data, astro_data, theme, query, forbidden_count), (summary, grouped)) in enumerate(
+        zip(prepared, cross_results)
+    ):
         groups_payload: List[Dict[str, Any]] = []
         for axis, items in grouped:
             gp = _group_payload(axis, items)
@@ -404,14 +404,15 @@ def main() -> int:
     os.environ["EXCLUDE_NON_SAJU_ASTRO"] = "1"
     os.environ["CROSS_ADVANCED"] = "1"
 
-    payload = asyncio.run(_run(max(1, int(args.samples)), args.locale))
+    with stage("query"):
+        payload = asyncio.run(_run(max(1, int(args.samples)), args.locale))
 
     out_json = Path(args.out)
-    out_json.parent.mkdir(parents=True, exist_ok=True)
-    out_json.write_text(json.dumps(payload, ensure_ascii=False, indent=2), encoding="utf-8")
-
     out_md = out_json.with_suffix(".md")
-    _write_md(out_md, payload)
+    with stage("write"):
+        out_json.parent.mkdir(parents=True, exist_ok=True)
+        out_json.write_text(json.dumps(payload, ensure_ascii=False, indent=2), encoding="utf-8")
+        _write_md(out_md, payload)
 
     print(f"json={out_json}")
     print(f"md={out_md}")
@@ -423,4 +424,4 @@ def main() -> int:
 
 
 if __name__ == "__main__":
-    raise SystemExit(main())
+    raise SystemExit(run_profiled("audit_cross_advanced", main, REPO_ROOT / "out"))
@@ -0,0 +1,156 @@
+"""
+Encode batch auto-tuning with a memory guard.
+
+--token-budget auto probes encode throughput on a sample of the corpus at a
+few token budgets (ascending), records RSS after each probe, stops before the
+memory ceiling and picks the smallest budget within 5% of the best docs/sec.
+
+MemoryGuard backs off during the run: whenever RSS crosses 90% of the ceiling
+it halves a scale factor that callers apply to the token budget and the
+write chunk size (see encode_bucketed and the reindex loops).
+
+The ceiling comes from --memory-ceiling-mb, then RAG_MEMORY_CEILING_MB, then
+80% of the cgroup memory limit or total RAM. RSS is read from /proc (psutil
+fallback); where neither exists the guard is a no-op.
+"""
+
+from __future__ import annotations
+
+import gc
+import os
+import random
+import time
+from typing import Any, List, Optional, Sequence, Tuple
+
+CEILING_ENV = "RAG_MEMORY_CEILING_MB"
+DEFAULT_CEILING_FRACTION = 0.8
+HIGH_WATER = 0.9
+DEFAULT_CANDIDATES = (2048, 4096, 8192, 16384, 32768)
+MIN_SCALE = 1 / 16
+
+
+def parse_token_budget(value: str) -> Optional[int]:
+    """argparse type for --token-budget: an int, or "auto" (returns None)."""
+    if str(value).strip().lower() == "auto":
+        return None
+    return int(value)
+
+
+def current_rss_mb() -> Optional[float]:
+    try:
+        with open("/proc/self/statm", "r", encoding="ascii") as f:
+            pages = int(f.read().split()[1])
+        return pages * os.sysconf("SC_PAGE_SIZE") / (1024 * 1024)
+    except (OSError, ValueError, AttributeError, IndexError):
+        pass
+    try:
+        import psutil  # pylint: disable=import-outside-toplevel
+    except ImportError:
+        return None
+    return psutil.Process().memory_info().rss / (1024 * 1024)
+
+
+def _memory_limit_mb() -> Optional[float]:
+    try:
+        with open("/sys/fs/cgroup/memory.max", "r", encoding="ascii") as f:
+            raw = f.read().strip()
+        if raw != "max":
+            return int(raw) / (1024 * 1024)
+    except (OSError, ValueError):
+        pass
+    try:
+        with open("/proc/meminfo", "r", encoding="ascii") as f:
+            for line in f:
+                if line.startswith("MemTotal:"):
+                    return int(line.split()[1]) / 1024
+    except (OSError, ValueError):
+        pass
+    try:
+        import psutil  # pylint: disable=import-outside-toplevel
+    except ImportError:
+        return None
+    return psutil.virtual_memory().total / (1024 * 1024)
+
+
+def resolve_memory_ceiling(ceiling_mb: Optional[float] = None) -> Optional[float]:
+    if ceiling_mb:
+        return float(ceiling_mb)
+    env_value = os.getenv(CEILING_ENV)
+    if env_value:
+        return float(env_value)
+    limit = _memory_limit_mb()
+    return limit * DEFAULT_CEILING_FRACTION if limit else None
+
+
+class MemoryGuard:
+    """Halves a shared scale factor whenever RSS nears the ceiling."""
+
+    def __init__(self, ceiling_mb: Optional[float], high_water: float = HIGH_WATER):
+        self.ceiling_mb = ceiling_mb
+        self.high_water = high_water
+        self.scale = 1.0
+        self.events = 0
+
+    def check(self) -> float:
+        if not self.ceiling_mb or self.scale <= MIN_SCALE:
+            return self.scale
+        rss = current_rss_mb()
+        if rss is not None and rss >= self.ceiling_mb * self.high_water:
+            self.scale /= 2
+            self.events += 1
+            gc.collect()
+            print(
+                f"[autotune] memory pressure rss={rss:.0f}MB ceiling={self.ceiling_mb:.0f}MB "
+                f"-> batch scale {self.scale:g}"
+            )
+        return self.scale
+
+    def scaled(self, value: int, floor: int = 1) -> int:
+        return max(floor, int(value * self.scale))
+
+
+def autotune_token_budget(
+    model,
+    texts: Sequence[str],
+    ceiling_mb: Optional[float],
+    candidates: Sequence[int] = DEFAULT_CANDIDATES,
+    sample_size: int = 256,
+    seed: int = 7,
+    **encode_kwargs: Any,
+) -> int:
+    """Pick a token budget for encode_docs from short throughput probes."""
+    from embedding_backends import encode_docs  # pylint: disable=import-outside-toplevel
+
+    candidates = sorted(candidates)
+    texts = list(texts)
+    sample = texts if len(texts) <= sample_size else random.Random(seed).sample(texts, sample_size)
+    encode_docs(model, sample[:8], token_budget=candidates[0], **encode_kwargs)  # warm up
+
+    limit = ceiling_mb * HIGH_WATER if ceiling_mb else None
+    results: List[Tuple[int, float]] = []
+    for budget in candidates:
+        gc.collect()
+        before = current_rss_mb()
+        started = time.perf_counter()
+        encode_docs(model, sample, token_budget=budget, **encode_kwargs)
+        elapsed = time.perf_counter() - started
+        after = current_rss_mb()
+        rate = len(sample) / elapsed if elapsed else 0.0
+        rss_note = f" rss={after:.0f}MB" if after is not None else ""
+        print(f"[autotune] token_budget={budget} docs/s={rate:.1f}{rss_note}")
+        if limit and after is not None and after >= limit:
+            print(f"[autotune] token_budget={budget} crosses memory ceiling; stopping probes")
+            break
+        results.append((budget, rate))
+        # The next candidate doubles activations: stop if that growth would not fit.
+        if limit and before is not None and after is not None and after + 2 * max(0.0, after - before) >= limit:
+            break
+
+    if not results:
+        chosen = candidates[0]
+    else:
+        best_rate = max(rate for _, rate in results)
+        chosen = min(budget for budget, rate in results if rate >= 0.95 * best_rate)
+    ceiling_note = f" ceiling={ceiling_mb:.0f}MB" if ceiling_mb else ""
+    print(f"[autotune] chosen token_budget={chosen}{ceiling_note}")
+    return chosen
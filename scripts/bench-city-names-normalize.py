@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+"""
+도시 이름 정규화 벤치마크 — 예전 per-script 재계산 vs city_name_utils 공용 캐시.
+
+비교 대상
+--------
+- legacy : 스크립트마다 복사돼 있던 memoize 없는 capitalize_words/norm/fold 를
+           filter(3 pass) + geonames(2 pass) + translate(1 pass) 순서대로 매번 호출.
+- shared (cold) : city_name_utils 의 lru_cache 함수로 키 테이블을 새로 계산.
+- shared (warm) : .cache/city-keys sidecar 를 읽기만 함 (원본 hash 가 같을 때).
+
+사용
+----
+  python3 scripts/bench-city-names-normalize.py
+  # build-cities-min.py 직후(142k 전체 목록)에 돌려야 실제 규모가 나온다.
+  #   --cities-path PATH   (default public/data/cities.min.json)
+  #   --repeat N           (default 3) 각 측정 반복 후 최솟값 사용
+"""
+
+import argparse
+import json
+import re
+import time
+import unicodedata
+from pathlib import Path
+
+import city_name_utils
+from city_name_utils import build_key_table, clear_caches, kr_lookup_key, load_key_table
+
+ROOT = Path(__file__).resolve().parent.parent
+CITIES_PATH = ROOT / "public" / "data" / "cities.min.json"
+KR_PATH = ROOT / "src" / "lib" / "cities" / "data" / "city-names-kr.json"
+
+
+# ────────────────────────────────── 예전 구현 (스크립트별 복사본 그대로)
+
+
+def _legacy_capitalize_words(s: str) -> str:
+    return " ".join(w[:1].upper() + w[1:].lower() for w in s.lower().split(" ") if w)
+
+
+def _legacy_norm(s: str) -> str:
+    return re.sub(r"\s+", " ", s.strip().lower())
+
+
+def _legacy_fold(s: str) -> str:
+    nfkd = unicodedata.normalize("NFKD", s)
+    return "".join(c for c in nfkd if not unicodedata.combining(c)).lower().strip()
+
+
+def _legacy_strip_quotes(k: str) -> str:
+    return k[1:-1] if k.startswith("'") and k.endswith("'") else k
+
+
+def run_legacy(cities: list[dict], kr: dict) -> int:
+    n = 0
+    # filter-cities-to-translated.py: covered, 커버 검사, fold dedupe, koname
+    covered = {_legacy_capitalize_words(_legacy_strip_quotes(k)) for k in kr}
+    city_kr = {_legacy_capitalize_words(_legacy_strip_quotes(k)): v for k, v in kr.items()}
+    for c in cities:
+        name = c.get("name") or ""
+        n += _legacy_capitalize_words(name) in covered
+        n += len(_legacy_fold(name))
+        n += bool(city_kr.get(_legacy_capitalize_words(name)))
+    # build-city-names-kr-geonames.py: present 집합 + merge 루프
+    for c in cities:
+        name = c.get("name") or ""
+        n += len(_legacy_capitalize_words(name))
+    for c in cities:
+        name = c.get("name") or ""
+        n += len(_legacy_capitalize_words(name)) + len(_legacy_norm(name))
+    # translate-cities-kr.py: 스킵 검사
+    for c in cities:
+        n += (c.get("name") or "") in kr
+    return n
+
+
+def run_shared(cities: list[dict], kr: dict, key_rows: list) -> int:
+    n = 0
+    covered = {kr_lookup_key(k) for k in kr}
+    city_kr = {kr_lookup_key(k): v for k, v in kr.items()}
+    for key, _norm, fold in key_rows:
+        n += key in covered
+        n += len(fold)
+        n += bool(city_kr.get(key))
+    for key, _norm, _fold in key_rows:
+        n += len(key)
+    for key, nkey, _fold in key_rows:
+        n += len(key) + len(nkey)
+    for key, _norm, _fold in key_rows:
+        n += key in covered
+    return n
+
+
+def _best_of(repeat: int, fn) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--cities-path", type=Path, default=CITIES_PATH)
+    ap.add_argument("--repeat", type=int, default=3)
+    args = ap.parse_args()
+
+    cities = json.loads(args.cities_path.read_text(encoding="utf-8"))
+    kr = json.loads(KR_PATH.read_text(encoding="utf-8"))
+    unique = len({c.get("name") or "" for c in cities})
+    print(f"cities: {len(cities)} (unique names {unique}) / KR keys: {len(kr)}")
+
+    t_legacy = _best_of(args.repeat, lambda: run_legacy(cities, kr))
+
+    def _cold():
+        clear_caches()
+        run_shared(cities, kr, build_key_table(cities))
+
+    t_cold = _best_of(args.repeat, _cold)
+
+    load_key_table(args.cities_path, cities)  # sidecar 준비
+
+    def _warm():
+        clear_caches()
+        run_shared(cities, kr, load_key_table(args.cities_path, cities))
+
+    t_warm = _best_of(args.repeat, _warm)
+
+    print(f"legacy (per-pass recompute) : {t_legacy * 1000:8.1f} ms")
+    print(f"shared cold (memoized build): {t_cold * 1000:8.1f} ms  ({t_legacy / t_cold:.2f}x)")
+    print(f"shared warm (sidecar load)  : {t_warm * 1000:8.1f} ms  ({t_legacy / t_warm:.2f}x)")
+    for name, stats in city_name_utils.cache_stats().items():
+        print(f"  {name}: {stats}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,197 @@
+#!/usr/bin/env python
+"""
+Benchmark the ONNX Runtime int8 embedder against the PyTorch path.
+
+For each model key and corpus (tarot corpus JSONL, Saju+Astro cross records)
+it encodes the same documents with SentenceTransformer (fp32 torch) and with
+onnx_embedder.OnnxEmbedder, then reports:
+- docs/sec for both backends and the speedup
+- cosine between paired document vectors (mean / min)
+- retrieval agreement over brute-force cosine search on the document set:
+  top-1 agreement and mean overlap@k of the torch vs onnx result lists
+
+Queries: tarot uses the eval_auto fixture queries, cross uses record labels.
+Export/quantization happens once (cached) and is excluded from timings.
+
+Usage:
+  python scripts/bench_onnx_embedder.py --models minilm
+  python scripts/bench_onnx_embedder.py --models minilm,e5-large --corpora tarot --max-docs 500
+  python scripts/bench_onnx_embedder.py --precision fp32   # isolate export vs quantization loss
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import random
+import time
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+from onnx_embedder import ONNX_MODEL_SPECS, PRECISIONS, OnnxEmbedder
+from tarot_pipeline_utils import DEFAULT_CORPUS_PATH, load_jsonl_records
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+BENCH_DIR = REPO_ROOT / ".cache" / "bench-onnx"
+DEFAULT_TAROT_QUERIES = REPO_ROOT / "tests" / "fixtures" / "tarot-eval" / "eval_auto.jsonl"
+DEFAULT_GRAPH_ROOT = REPO_ROOT / "backend_ai" / "data" / "graph"
+
+
+def _sample(items: List, limit: int, seed: int) -> List:
+    if limit <= 0 or len(items) <= limit:
+        return list(items)
+    picked = sorted(random.Random(seed).sample(range(len(items)), limit))
+    return [items[i] for i in picked]
+
+
+def _load_tarot(args) -> Tuple[List[str], List[str]]:
+    docs = [str(r.get("text") or "") for r in load_jsonl_records(Path(args.tarot_corpus))]
+    queries = [str(r.get("query") or "") for r in load_jsonl_records(Path(args.tarot_queries))]
+    return [d for d in docs if d.strip()], [q for q in queries if q.strip()]
+
+
+def _load_cross(args) -> Tuple[List[str], List[str]]:
+    from reindex_saju_astro_cross import collect_docs  # pylint: disable=import-outside-toplevel
+
+    _ids, docs, metas = collect_docs(Path(args.graph_root))
+    queries = [str(m.get("label") or "") for m in metas]
+    return docs, [q for q in queries if q.strip()]
+
+
+CORPORA = {"tarot": _load_tarot, "cross": _load_cross}
+
+
+def _timed_encode(encode, texts: List[str], batch_size: int) -> Tuple[np.ndarray, float]:
+    encode(texts[:8], batch_size)  # warm up kernels / allocator
+    started = time.perf_counter()
+    vecs = encode(texts, batch_size)
+    return np.ascontiguousarray(vecs, dtype=np.float32), time.perf_counter() - started
+
+
+def _topk(queries: np.ndarray, docs: np.ndarray, k: int) -> np.ndarray:
+    scores = queries @ docs.T
+    k = min(k, docs.shape[0])
+    idx = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+    order = np.take_along_axis(scores, idx, axis=1).argsort(axis=1)[:, ::-1]
+    return np.take_along_axis(idx, order, axis=1)
+
+
+def _agreement(ref_q, ref_d, cand_q, cand_d, k: int) -> Dict[str, float]:
+    ref_top = _topk(ref_q, ref_d, k)
+    cand_top = _topk(cand_q, cand_d, k)
+    overlap = [len(set(a) & set(b)) / ref_top.shape[1] for a, b in zip(ref_top.tolist(), cand_top.tolist())]
+    return {
+        "top1_agreement": float(np.mean(ref_top[:, 0] == cand_top[:, 0])),
+        f"overlap_at_{k}": float(np.mean(overlap)),
+    }
+
+
+def _bench_model(model_key: str, corpora: Dict[str, Tuple[List[str], List[str]]], args) -> List[Dict]:
+    import torch  # pylint: disable=import-outside-toplevel
+    from sentence_transformers import SentenceTransformer  # pylint: disable=import-outside-toplevel
+
+    spec = ONNX_MODEL_SPECS[model_key]
+    if args.threads:
+        torch.set_num_threads(args.threads)
+    torch_model = SentenceTransformer(spec.hf_name, device="cpu")
+    onnx_model = OnnxEmbedder(model_key, precision=args.precision, threads=args.threads or None)
+
+    def _torch_encode(prefix: str):
+        def _encode(texts: List[str], batch_size: int):
+            return torch_model.encode(
+                [prefix + t for t in texts],
+                batch_size=batch_size,
+                convert_to_numpy=True,
+                normalize_embeddings=True,
+                show_progress_bar=False,
+            )
+
+        return _encode
+
+    def _onnx_encode(is_query: bool):
+        return lambda texts, batch_size: onnx_model.encode(texts, batch_size=batch_size, is_query=is_query)
+
+    rows: List[Dict] = []
+    for corpus, (docs, queries) in corpora.items():
+        ref_d, torch_sec = _timed_encode(_torch_encode(spec.passage_prefix), docs, args.batch_size)
+        cand_d, onnx_sec = _timed_encode(_onnx_encode(False), docs, args.batch_size)
+        ref_q, _ = _timed_encode(_torch_encode(spec.query_prefix), queries, args.batch_size)
+        cand_q, _ = _timed_encode(_onnx_encode(True), queries, args.batch_size)
+
+        paired = np.einsum("ij,ij->i", ref_d, cand_d)
+        row = {
+            "model": model_key,
+            "precision": onnx_model.precision,
+            "corpus": corpus,
+            "docs": len(docs),
+            "queries": len(queries),
+            "torch_docs_per_sec": len(docs) / torch_sec if torch_sec else 0.0,
+            "onnx_docs_per_sec": len(docs) / onnx_sec if onnx_sec else 0.0,
+            "speedup": (torch_sec / onnx_sec) if onnx_sec else 0.0,
+            "cosine_mean": float(paired.mean()),
+            "cosine_min": float(paired.min()),
+        }
+        row.update(_agreement(ref_q, ref_d, cand_q, cand_d, args.top_k))
+        rows.append(row)
+        print(
+            f"[bench_onnx] {model_key} {corpus} torch={row['torch_docs_per_sec']:.1f}/s "
+            f"onnx={row['onnx_docs_per_sec']:.1f}/s top1={row['top1_agreement']:.3f}"
+        )
+    return rows
+
+
+def _print_table(rows: List[Dict], k: int) -> None:
+    header = (
+        f"{'model':<9} {'prec':<5} {'corpus':<6} {'docs':>6} {'torch/s':>9} {'onnx/s':>9} {'speedup':>8} "
+        f"{'cos_mean':>9} {'cos_min':>8} {'top1':>6} {f'ovl@{k}':>7}"
+    )
+    print(header)
+    print("-" * len(header))
+    for r in rows:
+        print(
+            f"{r['model']:<9} {r['precision']:<5} {r['corpus']:<6} {r['docs']:>6} "
+            f"{r['torch_docs_per_sec']:>9.1f} {r['onnx_docs_per_sec']:>9.1f} {r['speedup']:>7.2f}x "
+            f"{r['cosine_mean']:>9.4f} {r['cosine_min']:>8.4f} {r['top1_agreement']:>6.3f} {r[f'overlap_at_{k}']:>7.3f}"
+        )
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Compare ONNX int8 vs PyTorch embedding throughput and retrieval agreement.")
+    parser.add_argument("--models", default="minilm", help=f"Comma-separated keys ({', '.join(ONNX_MODEL_SPECS)}).")
+    parser.add_argument("--corpora", default="tarot,cross", help="Comma-separated: tarot,cross")
+    parser.add_argument("--precision", choices=PRECISIONS, default="int8")
+    parser.add_argument("--tarot-corpus", default=str(DEFAULT_CORPUS_PATH))
+    parser.add_argument("--tarot-queries", default=str(DEFAULT_TAROT_QUERIES))
+    parser.add_argument("--graph-root", default=str(DEFAULT_GRAPH_ROOT))
+    parser.add_argument("--max-docs", type=int, default=2000, help="Sample size per corpus (0 = all).")
+    parser.add_argument("--max-queries", type=int, default=200)
+    parser.add_argument("--top-k", type=int, default=10)
+    parser.add_argument("--batch-size", type=int, default=64)
+    parser.add_argument("--threads", type=int, default=0, help="Same thread count for torch and onnxruntime (0 = default).")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--output-json", type=Path, default=None)
+    args = parser.parse_args()
+
+    corpora: Dict[str, Tuple[List[str], List[str]]] = {}
+    for name in [c.strip() for c in args.corpora.split(",") if c.strip()]:
+        docs, queries = CORPORA[name](args)
+        corpora[name] = (_sample(docs, args.max_docs, args.seed), _sample(queries, args.max_queries, args.seed))
+        print(f"[bench_onnx] corpus={name} docs={len(corpora[name][0])} queries={len(corpora[name][1])}")
+
+    rows: List[Dict] = []
+    for model_key in [m.strip() for m in args.models.split(",") if m.strip()]:
+        rows.extend(_bench_model(model_key, corpora, args))
+
+    print()
+    _print_table(rows, args.top_k)
+    output = args.output_json or BENCH_DIR / f"bench_{time.strftime('%Y%m%d_%H%M%S')}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps({"top_k": args.top_k, "rows": rows}, indent=2), encoding="utf-8")
+    print(f"[bench_onnx] wrote: {output}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,302 @@
+#!/usr/bin/env python
+"""
+Scale benchmark for the Saju+Astro reindexers on synthetic graph roots.
+
+For each --scale it generates a synthetic graph root (gen_synthetic_graph_root)
+and runs reindex_saju_astro_graph_nodes then reindex_saju_astro_cross into a
+throwaway Chroma dir. Each reindexer runs in its own child process so peak RSS
+is per stage. Each --write-modes entry gets its own Chroma dir: "batch" is the
+per-batch index_nodes path, "bulk" the reindexers' --bulk-load path.
+Reported per stage:
+- docs, docs/sec (end to end)
+- embed_sec   time inside encode()
+- write_sec   time inside VectorStoreManager.index_nodes or chroma_bulk
+              (Chroma writes, incl. bulk finalize)
+- query_sec   time inside collection.query (cross ref backfill)
+- parse_sec   the rest: loading files, building docs/metadata, ids
+- q_p50/q_p95 top-10 query latency (ms) on the finished collection, probed
+              with stored vectors
+- peak_rss_mb
+
+Defaults to the offline fake embedder so numbers isolate the pipeline itself.
+Pass --embedder model to include real encoding cost.
+
+Usage:
+  python scripts/bench_reindex_saju_astro.py --scales 1,10
+  python scripts/bench_reindex_saju_astro.py --scales 100 --quiet
+  python scripts/bench_reindex_saju_astro.py --scales 10 --write-modes batch
+  python scripts/bench_reindex_saju_astro.py --graph-root backend_ai/data/graph --embedder model
+"""
+
+from __future__ import annotations
+
+import argparse
+import contextlib
+import json
+import multiprocessing
+import os
+import queue
+import shutil
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from pipeline_profiling import peak_rss_mb
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+BACKEND_AI_ROOT = REPO_ROOT / "backend_ai"
+if str(BACKEND_AI_ROOT) not in sys.path:
+    sys.path.insert(0, str(BACKEND_AI_ROOT))
+
+BENCH_DIR = REPO_ROOT / ".cache" / "bench-reindex"
+STAGES = ("graph_nodes", "cross")
+WRITE_MODES = ("batch", "bulk")
+QUERY_PROBES = 200
+
+
+class _Timers:
+    def __init__(self) -> None:
+        self.sec: Dict[str, float] = {"embed": 0.0, "write": 0.0, "query": 0.0}
+        self.docs = 0
+
+    def wrap(self, key: str, fn):
+        def _timed(*args, **kwargs):
+            started = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                self.sec[key] += time.perf_counter() - started
+
+        return _timed
+
+
+class _TimedEmbedder:
+    def __init__(self, inner, timers: _Timers):
+        self._inner = inner
+        self.encode = timers.wrap("embed", inner.encode)
+
+    def __getattr__(self, name):
+        return getattr(self._inner, name)
+
+
+def _query_latency_ms(collection, probes: int = QUERY_PROBES) -> Dict[str, float]:
+    import numpy as np  # pylint: disable=import-outside-toplevel
+
+    vectors = collection.get(limit=probes, include=["embeddings"]).get("embeddings")
+    if vectors is None or len(vectors) == 0:
+        return {"query_p50_ms": 0.0, "query_p95_ms": 0.0}
+    samples: List[float] = []
+    for vec in vectors:
+        started = time.perf_counter()
+        collection.query(query_embeddings=[vec], n_results=10)
+        samples.append((time.perf_counter() - started) * 1000)
+    return {
+        "query_p50_ms": float(np.percentile(samples, 50)),
+        "query_p95_ms": float(np.percentile(samples, 95)),
+    }
+
+
+def _run_stage(
+    stage: str, mode: str, graph_root: str, persist_dir: str, batch_size: int, embedder: str, quiet: bool, out_q
+) -> None:
+    """Child-process entry: instrument, run one reindexer, report timings."""
+    import chroma_bulk  # pylint: disable=import-outside-toplevel
+    import embedding_backends  # pylint: disable=import-outside-toplevel
+    from app.rag.vector_store import VectorStoreManager  # pylint: disable=import-outside-toplevel
+    from chromadb.api.models.Collection import Collection  # pylint: disable=import-outside-toplevel
+
+    timers = _Timers()
+    managers: List = []
+    original_init = VectorStoreManager.__init__
+
+    def _init(self, *args, **kwargs):
+        original_init(self, *args, **kwargs)
+        managers.append(self)
+
+    VectorStoreManager.__init__ = _init
+    original_load = embedding_backends.load_embedder
+    embedding_backends.load_embedder = lambda *a, **kw: _TimedEmbedder(original_load(*a, **kw), timers)
+
+    original_index = VectorStoreManager.index_nodes
+
+    def _index_nodes(self, *args, **kwargs):
+        timers.docs += len(kwargs.get("ids") or (args[0] if args else []))
+        return original_index(self, *args, **kwargs)
+
+    VectorStoreManager.index_nodes = timers.wrap("write", _index_nodes)
+
+    original_add = chroma_bulk.BulkWriter.add
+
+    def _bulk_add(self, ids, *args, **kwargs):
+        timers.docs += len(ids)
+        return original_add(self, ids, *args, **kwargs)
+
+    # add() flushes full chunks itself; finalize() writes the tail and probes the index.
+    chroma_bulk.BulkWriter.add = timers.wrap("write", _bulk_add)
+    chroma_bulk.BulkWriter.finalize = timers.wrap("write", chroma_bulk.BulkWriter.finalize)
+    original_query = Collection.query
+    Collection.query = timers.wrap("query", original_query)
+
+    if stage == "graph_nodes":
+        import reindex_saju_astro_graph_nodes as module  # pylint: disable=import-outside-toplevel
+    else:
+        import reindex_saju_astro_cross as module  # pylint: disable=import-outside-toplevel
+
+    sink = open(os.devnull, "w", encoding="utf-8") if quiet else None
+    started = time.perf_counter()
+    error: Optional[str] = None
+    try:
+        with contextlib.redirect_stdout(sink) if sink else contextlib.nullcontext():
+            module.reindex(
+                graph_root=Path(graph_root),
+                collection_name=module.COLLECTION_NAME,
+                persist_dir=persist_dir,
+                batch_size=batch_size,
+                reset=True,
+                smoke_query=None,
+                embedder=embedder,
+                bulk_load=mode == "bulk",
+            )
+    except Exception as exc:  # reported in the summary row
+        error = f"{type(exc).__name__}: {exc}"
+    finally:
+        if sink:
+            sink.close()
+    total = time.perf_counter() - started
+    timed = sum(timers.sec.values())
+    Collection.query = original_query
+    latency = {"query_p50_ms": 0.0, "query_p95_ms": 0.0}
+    if error is None and managers:
+        latency = _query_latency_ms(managers[0].collection)
+    out_q.put(
+        {
+            "stage": stage,
+            "mode": mode,
+            "docs": timers.docs,
+            "total_sec": total,
+            "docs_per_sec": (timers.docs / total) if total else 0.0,
+            "embed_sec": timers.sec["embed"],
+            "write_sec": timers.sec["write"],
+            "query_sec": timers.sec["query"],
+            "parse_sec": max(0.0, total - timed),
+            "peak_rss_mb": peak_rss_mb(),
+            "error": error,
+            **latency,
+        }
+    )
+
+
+def _run_in_child(*args) -> Dict:
+    methods = multiprocessing.get_all_start_methods()
+    ctx = multiprocessing.get_context("fork" if "fork" in methods else "spawn")
+    out_q = ctx.Queue()
+    proc = ctx.Process(target=_run_stage, args=(*args, out_q))
+    proc.start()
+    while True:
+        try:
+            result = out_q.get(timeout=1.0)
+            break
+        except queue.Empty:
+            if not proc.is_alive():
+                result = {"stage": args[0], "mode": args[1], "docs": 0, "error": f"child exited with {proc.exitcode}"}
+                result.update(
+                    {
+                        k: 0.0
+                        for k in (
+                            "total_sec",
+                            "docs_per_sec",
+                            "embed_sec",
+                            "write_sec",
+                            "query_sec",
+                            "parse_sec",
+                            "peak_rss_mb",
+                            "query_p50_ms",
+                            "query_p95_ms",
+                        )
+                    }
+                )
+                break
+    proc.join()
+    return result
+
+
+def _print_table(rows: List[Dict]) -> None:
+    header = (
+        f"{'scale':>6} {'mode':<6} {'stage':<12} {'docs':>9} {'docs/s':>9} {'parse':>8} {'embed':>8} {'write':>8} "
+        f"{'query':>8} {'q_p50':>7} {'q_p95':>7} {'rss_mb':>8}"
+    )
+    print(header)
+    print("-" * len(header))
+    for r in rows:
+        print(
+            f"{r['scale']:>6g} {r['mode']:<6} {r['stage']:<12} {r['docs']:>9} {r['docs_per_sec']:>9.1f} "
+            f"{r['parse_sec']:>8.2f} {r['embed_sec']:>8.2f} {r['write_sec']:>8.2f} {r['query_sec']:>8.2f} "
+            f"{r['query_p50_ms']:>7.2f} {r['query_p95_ms']:>7.2f} "
+            f"{r['peak_rss_mb']:>8.1f}" + (f"  ERROR {r['error']}" if r.get("error") else "")
+        )
+
+
+def main() -> int:
+    from gen_synthetic_graph_root import generate  # pylint: disable=import-outside-toplevel
+
+    parser = argparse.ArgumentParser(description="Benchmark Saju+Astro reindexers on synthetic data.")
+    parser.add_argument("--scales", default="1,10", help="Comma-separated data scale factors.")
+    parser.add_argument("--graph-root", type=Path, default=None, help="Benchmark an existing graph root instead.")
+    parser.add_argument("--embedder", choices=["model", "onnx", "fake"], default="fake")
+    parser.add_argument("--batch-size", type=int, default=512)
+    parser.add_argument("--write-modes", default=",".join(WRITE_MODES), help="Comma-separated: batch,bulk")
+    parser.add_argument("--seed", type=int, default=20240601)
+    parser.add_argument("--quiet", action="store_true", help="Silence reindexer progress output.")
+    parser.add_argument("--keep", action="store_true", help="Keep generated data and Chroma dirs.")
+    parser.add_argument("--output-json", type=Path, default=None)
+    args = parser.parse_args()
+
+    modes = [m.strip() for m in args.write_modes.split(",") if m.strip()]
+    unknown = sorted(set(modes) - set(WRITE_MODES))
+    if unknown:
+        parser.error(f"unknown --write-modes: {', '.join(unknown)}")
+    BENCH_DIR.mkdir(parents=True, exist_ok=True)
+    scales = [1.0] if args.graph_root else [float(s) for s in args.scales.split(",") if s.strip()]
+    rows: List[Dict] = []
+    for scale in scales:
+        work = BENCH_DIR / f"x{scale:g}"
+        graph_root = args.graph_root or work / "graph"
+        if not args.graph_root:
+            shutil.rmtree(graph_root, ignore_errors=True)
+            started = time.perf_counter()
+            counts = generate(graph_root, scale, args.seed)
+            print(f"[bench] scale={scale:g} generated {counts} in {time.perf_counter() - started:.1f}s")
+        for mode in modes:
+            persist_dir = work / f"chromadb-{mode}"
+            shutil.rmtree(persist_dir, ignore_errors=True)
+            for stage in STAGES:
+                result = _run_in_child(
+                    stage, mode, str(graph_root), str(persist_dir), args.batch_size, args.embedder, args.quiet
+                )
+                result["scale"] = scale
+                rows.append(result)
+                print(
+                    f"[bench] scale={scale:g} mode={mode} {stage} docs={result['docs']} "
+                    f"total={result['total_sec']:.2f}s write={result['write_sec']:.2f}s"
+                )
+        if not args.keep:
+            shutil.rmtree(work, ignore_errors=True)
+
+    print()
+    _print_table(rows)
+    output = args.output_json or BENCH_DIR / f"bench_{time.strftime('%Y%m%d_%H%M%S')}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(
+        json.dumps(
+            {"embedder": args.embedder, "batch_size": args.batch_size, "write_modes": modes, "rows": rows},
+            indent=2,
+        ),
+        encoding="utf-8",
+    )
+    print(f"[bench] wrote: {output}")
+    return 1 if any(r.get("error") for r in rows) else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -8,7 +8,7 @@ source:
     (dr5hn KR=297개로 부족, 안산·봉화·보성 등 중간 도시 누락)
 
 사용:
-  python3 scripts/build-cities-min.py
+  python3 scripts/build-cities-min.py [--profile]
 
 결과 row shape:
   { name, country (ISO2), lat, lon, region }
@@ -18,12 +18,15 @@ region 은 dr5hn state.name (영문). KR 보강분의 region 은 9개 도(provin
 한글화.
 """
 
+import argparse
 import json
 import os
 import sys
 from pathlib import Path
 from urllib.request import urlopen
 
+from pipeline_profiling import run_profiled, stage
+
 ROOT = Path(__file__).resolve().parent.parent
 TARGET = ROOT / "public" / "data" / "cities.min.json"
 KR_EXTRA = ROOT / "src" / "lib" / "cities" / "data" / "kr-cities-extra.json"
@@ -96,16 +99,19 @@ def append_kr_extras(rows: list, keys: set) -> int:
 
 
 def main() -> int:
-    csc = fetch_dr5hn()
-    rows, keys = flatten(csc)
-    print(f"dr5hn rows: {len(rows)}")
-    kr_added = append_kr_extras(rows, keys)
-    print(f"KR augment: +{kr_added} → total {len(rows)}")
-    with TARGET.open("w") as f:
+    argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter).parse_args()
+    with stage("load"):
+        csc = fetch_dr5hn()
+    with stage("parse"):
+        rows, keys = flatten(csc)
+        print(f"dr5hn rows: {len(rows)}")
+        kr_added = append_kr_extras(rows, keys)
+        print(f"KR augment: +{kr_added} → total {len(rows)}")
+    with stage("write"), TARGET.open("w") as f:
         json.dump(rows, f, separators=(",", ":"), ensure_ascii=False)
     print(f"wrote {TARGET} ({TARGET.stat().st_size / 1024 / 1024:.1f} MB)")
     return 0
 
 
 if __name__ == "__main__":
-    sys.exit(main())
+    sys.exit(run_profiled("build_cities_min", main))
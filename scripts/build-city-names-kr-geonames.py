@@ -23,7 +23,8 @@ GeoNames 파일 (TSV, 헤더 없음):
 cities.min.json 의 각 도시 name 을 GeoNames 의 asciiname/name 과 정규화 비교
 (소문자·공백 정리, 가능하면 country code 까지). 매칭되면 그 도시 표시명을
 formatter 가 찾는 키 형태(capitalizeWords)로 저장한다. 기존 수기 매핑은
-신뢰도가 높으므로 보존하고(덮어쓰지 않음) 빠진 것만 채운다.
+신뢰도가 높으므로 보존하고(덮어쓰지 않음) 빠진 것만 채운다. 정규화 함수와
+도시별 정규화 키 테이블은 city_name_utils.py 에서 공유한다.
 
 전제
 ----
@@ -49,6 +50,9 @@ import urllib.request
 import zipfile
 from pathlib import Path
 
+from city_name_utils import capitalize_words, fold, load_key_table, norm
+from pipeline_profiling import run_profiled, stage
+
 ROOT = Path(__file__).resolve().parent.parent
 CITIES_PATH = ROOT / "public" / "data" / "cities.min.json"
 KR_PATH = ROOT / "src" / "lib" / "cities" / "data" / "city-names-kr.json"
@@ -60,16 +64,6 @@ HANGUL = re.compile(r"[가-힣]")
 SUPPLEMENT_MIN_POP = 500_000
 
 
-def norm(s: str) -> str:
-    """매칭용 정규화: 소문자 + 공백/구분 정리."""
-    return re.sub(r"\s+", " ", s.strip().lower())
-
-
-def capitalize_words(s: str) -> str:
-    """formatter.ts 의 capitalizeWords 와 동일 — 출력 키 형태를 맞춘다."""
-    return " ".join(w[:1].upper() + w[1:].lower() for w in s.lower().split(" ") if w)
-
-
 def pick_korean(alternatenames: str) -> str | None:
     """쉼표 구분 alternatenames 에서 한글이 든 첫 토큰을 고른다."""
     for tok in alternatenames.split(","):
@@ -204,24 +198,28 @@ def main() -> None:
     ap.add_argument("--dry-run", action="store_true")
     args = ap.parse_args()
 
-    cities = json.loads(CITIES_PATH.read_text(encoding="utf-8"))
-    if args.limit:
-        cities = cities[: args.limit]
-    existing = json.loads(KR_PATH.read_text(encoding="utf-8"))
-    print(f"cities: {len(cities)} / existing KR: {len(existing)}", file=sys.stderr)
-
-    supplement: list[dict] = []
-    if args.full:
-        by_name_country, by_name, supplement = build_geo_kr_full(args.source)
-    else:
-        by_name_country, by_name = build_geo_kr(download_geonames(args.source))
-    print(f"GeoNames KR names: {len(by_name)} (by name)", file=sys.stderr)
+    with stage("load"):
+        cities = json.loads(CITIES_PATH.read_text(encoding="utf-8"))
+        # 행별 (key, norm, fold). --limit 은 앞쪽 행만 쓰므로 테이블도 같이 자른다.
+        key_rows = load_key_table(CITIES_PATH, cities)
+        if args.limit:
+            cities = cities[: args.limit]
+            key_rows = key_rows[: args.limit]
+        existing = json.loads(KR_PATH.read_text(encoding="utf-8"))
+        print(f"cities: {len(cities)} / existing KR: {len(existing)}", file=sys.stderr)
+
+        supplement: list[dict] = []
+        if args.full:
+            by_name_country, by_name, supplement = build_geo_kr_full(args.source)
+        else:
+            by_name_country, by_name = build_geo_kr(download_geonames(args.source))
+        print(f"GeoNames KR names: {len(by_name)} (by name)", file=sys.stderr)
 
     # 대도시 보충: dr5hn 에 누락된 인구 SUPPLEMENT_MIN_POP 이상 도시(상하이 등)를
     # GeoNames 좌표로 cities.min.json 에 추가. (전체 모드 + dry-run 아닐 때만)
     if args.full and not args.dry_run and not args.limit and supplement:
-        present = {(capitalize_words(c.get("name") or ""), (c.get("country") or "").upper())
-                   for c in cities}
+        present = {(keys[0], (c.get("country") or "").upper())
+                   for c, keys in zip(cities, key_rows)}
         sup_added = 0
         seen_sup = set()
         for s in supplement:
@@ -231,29 +229,29 @@ def main() -> None:
             seen_sup.add(key)
             cities.append({"name": s["name"], "country": s["country"],
                            "lat": s["lat"], "lon": s["lon"], "region": s["region"]})
+            key_rows.append((key[0], norm(s["name"]), fold(s["name"])))
             sup_added += 1
         print(f"supplement added to city list: {sup_added}", file=sys.stderr)
         if sup_added:
-            CITIES_PATH.write_text(
-                json.dumps(cities, ensure_ascii=False, separators=(",", ":")) + "\n",
-                encoding="utf-8",
-            )
-
-    merged = dict(existing)  # 기존 수기 매핑 보존
-    added = 0
-    for c in cities:
-        name = c.get("name")
-        if not name:
-            continue
-        key = capitalize_words(name)
-        if key in merged:
-            continue  # 이미 있음(수기 or 앞서 추가)
-        nkey = norm(name)
-        country = (c.get("country") or "").upper()
-        kr = by_name_country.get((nkey, country)) or by_name.get(nkey)
-        if kr and kr != key:
-            merged[key] = kr
-            added += 1
+            with stage("write"):
+                CITIES_PATH.write_text(
+                    json.dumps(cities, ensure_ascii=False, separators=(",", ":")) + "\n",
+                    encoding="utf-8",
+                )
+
+    with stage("parse"):
+        merged = dict(existing)  # 기존 수기 매핑 보존
+        added = 0
+        for c, (key, nkey, _fold) in zip(cities, key_rows):
+            if not c.get("name"):
+                continue
+            if key in merged:
+                continue  # 이미 있음(수기 or 앞서 추가)
+            country = (c.get("country") or "").upper()
+            kr = by_name_country.get((nkey, country)) or by_name.get(nkey)
+            if kr and kr != key:
+                merged[key] = kr
+                added += 1
 
     print(f"added: {added} → total: {len(merged)}", file=sys.stderr)
 
@@ -262,10 +260,11 @@ def main() -> None:
         print("sample (last 10):", json.dumps(dict(sample), ensure_ascii=False), file=sys.stderr)
         return
 
-    out = {k: merged[k] for k in sorted(merged)}
-    KR_PATH.write_text(json.dumps(out, ensure_ascii=False, indent=2) + "\n", encoding="utf-8")
+    with stage("write"):
+        out = {k: merged[k] for k in sorted(merged)}
+        KR_PATH.write_text(json.dumps(out, ensure_ascii=False, indent=2) + "\n", encoding="utf-8")
     print(f"wrote {KR_PATH.relative_to(ROOT)}", file=sys.stderr)
 
 
 if __name__ == "__main__":
-    main()
+    raise SystemExit(run_profiled("build_city_names_kr_geonames", main))
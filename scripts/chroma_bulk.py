@@ -0,0 +1,183 @@
+"""
+Bulk-load helpers for full Chroma reindexes.
+
+recreate_with_metadata() is also how the reindexers apply creation-time
+settings (hnsw:* from hnsw_params) to the collection VectorStoreManager made.
+
+The per-batch path (VectorStoreManager.index_nodes per encode batch) runs
+Chroma with its default HNSW settings: vectors are inserted into the graph
+every hnsw:batch_size (100) records and the index is persisted every
+hnsw:sync_threshold (1000) records, so a full rebuild pays for thousands of
+small graph updates and index flushes plus one SQLite commit per call.
+
+Bulk mode (reindexers' --bulk-load, only with --reset):
+- recreate_for_bulk() recreates the empty target collection with its normal
+  metadata (plus extra, e.g. tuned M/ef), then switches its HNSW
+  configuration to bulk-sized batch_size / sync_threshold with
+  collection.modify(configuration=...), so the load skips the small graph
+  inserts and index flushes
+- BulkWriter buffers encode batches and upserts them straight into the
+  target in client max-batch chunks (one commit each), independent of the
+  encode batch size
+- finalize() flushes the tail, puts batch_size / sync_threshold back to
+  Chroma's defaults (the graph is built and persisted once, under the bulk
+  settings, before that) and runs one probe query
+
+The bulk settings only ever live in the collection configuration, never in
+its metadata, so later --no-reset upserts and chroma_snapshot exports see
+the normal settings. Chroma < 1.0 has no configuration argument on modify()
+and fixes hnsw:* at creation (collection metadata cannot be rewritten
+either: modify(metadata=...) refuses anything carrying hnsw:space), so
+there recreate_for_bulk() leaves the defaults alone and bulk mode only
+saves the per-call commits.
+"""
+
+from __future__ import annotations
+
+import inspect
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+
+BULK_HNSW_BATCH_SIZE = 10000
+BULK_HNSW_SYNC_THRESHOLD = 100000
+# Chroma's own defaults, restored after the load.
+DEFAULT_HNSW_BATCH_SIZE = 100
+DEFAULT_HNSW_SYNC_THRESHOLD = 1000
+BULK_KEYS = ("hnsw:batch_size", "hnsw:sync_threshold")
+DEFAULT_WRITE_BATCH = 5000
+
+
+def bulk_hnsw_config(
+    batch_size: int = BULK_HNSW_BATCH_SIZE,
+    sync_threshold: int = BULK_HNSW_SYNC_THRESHOLD,
+) -> Dict[str, int]:
+    return {"batch_size": int(batch_size), "sync_threshold": max(int(sync_threshold), int(batch_size))}
+
+
+def strip_bulk_metadata(metadata: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    """Collection metadata without batch/sync settings (collections bulk-loaded by older builds carried them)."""
+    return {k: v for k, v in (metadata or {}).items() if k not in BULK_KEYS}
+
+
+def set_hnsw_config(collection, batch_size: int, sync_threshold: int) -> bool:
+    """Change batch_size / sync_threshold in place; False when this Chroma cannot (< 1.0)."""
+    if "configuration" not in inspect.signature(collection.modify).parameters:
+        return False
+    collection.modify(configuration={"hnsw": {"batch_size": int(batch_size), "sync_threshold": int(sync_threshold)}})
+    return True
+
+
+def _client_of(collection, persist_dir: Optional[str]):
+    client = getattr(collection, "_client", None)
+    if client is not None:
+        return client
+    if not persist_dir:
+        raise ValueError("recreating a collection needs its Chroma client or an explicit persist_dir")
+    from chromadb import PersistentClient  # pylint: disable=import-outside-toplevel
+
+    return PersistentClient(path=str(persist_dir))
+
+
+def recreate_with_metadata(collection, extra: Dict[str, Any], persist_dir: Optional[str] = None):
+    """Drop an empty collection and recreate it with extra metadata (hnsw:* is creation-time only)."""
+    if collection.count():
+        raise RuntimeError(f"expected an empty collection; {collection.name} has {collection.count()} records")
+    client = _client_of(collection, persist_dir)
+    metadata = {k: v for k, v in strip_bulk_metadata(collection.metadata).items() if k not in extra}
+    metadata.update(extra)
+    client.delete_collection(name=collection.name)
+    created = client.create_collection(name=collection.name, metadata=metadata)
+    if hasattr(created, "upsert"):
+        return created
+    # collection._client is the server API on Chroma >= 0.5, which returns the bare model.
+    from chromadb.api.models.Collection import Collection  # pylint: disable=import-outside-toplevel
+
+    return Collection(client=client, model=created)
+
+
+def recreate_for_bulk(
+    collection, persist_dir: Optional[str] = None, extra: Optional[Dict[str, Any]] = None, **hnsw: int
+) -> "BulkWriter":
+    """Recreate the empty target with extra metadata, switch it to bulk HNSW settings; returns its writer."""
+    target = recreate_with_metadata(collection, extra or {}, persist_dir)
+    bulk = bulk_hnsw_config(**hnsw)
+    if not set_hnsw_config(target, **bulk):
+        print("[chroma_bulk] this Chroma cannot change hnsw batch/sync settings after creation; loading with defaults")
+        return BulkWriter(target)
+    return BulkWriter(target, restore=True)
+
+
+def _max_batch_size(collection) -> int:
+    client = getattr(collection, "_client", None)
+    getter = getattr(client, "get_max_batch_size", None)
+    if callable(getter):
+        try:
+            return int(getter())
+        except Exception:
+            pass
+    return DEFAULT_WRITE_BATCH
+
+
+class BulkWriter:
+    """Buffer upserts and write them in large chunks; last write per id wins.
+
+    restore: the collection runs under bulk HNSW settings that finalize()
+    puts back to Chroma's defaults.
+    """
+
+    def __init__(self, collection, write_batch: Optional[int] = None, restore: bool = False):
+        self.collection = collection
+        self.restore = restore
+        self.write_batch = write_batch or _max_batch_size(collection)
+        self.written = 0
+        self._rows: Dict[str, int] = {}
+        self._ids: List[str] = []
+        self._docs: List[str] = []
+        self._metas: List[Dict[str, Any]] = []
+        self._embeds: List[np.ndarray] = []
+
+    def add(self, ids: Sequence[str], documents: Sequence[str], embeddings, metadatas: Sequence[Dict[str, Any]]) -> None:
+        embeddings = np.asarray(embeddings, dtype=np.float32)
+        for i, doc_id in enumerate(ids):
+            row = self._rows.get(doc_id)
+            if row is None:
+                self._rows[doc_id] = len(self._ids)
+                self._ids.append(doc_id)
+                self._docs.append(documents[i])
+                self._metas.append(metadatas[i])
+                self._embeds.append(embeddings[i])
+            else:
+                self._docs[row] = documents[i]
+                self._metas[row] = metadatas[i]
+                self._embeds[row] = embeddings[i]
+        if len(self._ids) >= self.write_batch:
+            self._flush()
+
+    def _flush(self) -> None:
+        for start in range(0, len(self._ids), self.write_batch):
+            end = start + self.write_batch
+            self.collection.upsert(
+                ids=self._ids[start:end],
+                documents=self._docs[start:end],
+                embeddings=np.stack(self._embeds[start:end]),
+                metadatas=self._metas[start:end],
+            )
+        self.written += len(self._ids)
+        self._rows = {}
+        self._ids, self._docs, self._metas, self._embeds = [], [], [], []
+
+    def finalize(self) -> int:
+        """Flush the tail, restore normal HNSW settings, load the index once with a probe query; returns the count."""
+        probe = self._embeds[0] if self._embeds else None
+        if self._ids:
+            self._flush()
+        if self.restore:
+            set_hnsw_config(self.collection, DEFAULT_HNSW_BATCH_SIZE, DEFAULT_HNSW_SYNC_THRESHOLD)
+            self.restore = False
+        count = self.collection.count()
+        if count:
+            if probe is None:
+                probe = np.asarray(self.collection.get(limit=1, include=["embeddings"])["embeddings"][0], dtype=np.float32)
+            self.collection.query(query_embeddings=[probe], n_results=1)
+        return count
@@ -0,0 +1,301 @@
+#!/usr/bin/env python
+"""
+Export/import Chroma collections as portable, checksummed snapshots.
+
+A fresh container can load prebuilt collections in seconds instead of
+rerunning the reindexers (no re-embedding, no graph parsing).
+
+Snapshot layout (one directory per collection):
+  <snapshot-dir>/<collection>/
+    manifest.json     collection name/metadata, count, dim, sha256 per file
+    records.jsonl     {"id", "document", "metadata"} per line, embedding order
+    embeddings.npy    float32 [count, dim], row i belongs to records.jsonl line i
+
+Export pages through collection.get() and streams embeddings into a memmapped
+.npy, so memory stays flat for large collections. Import verifies checksums,
+recreates the collection with its original metadata (hnsw:space, embedding
+model id, ...) and writes with collection.add() in max-size batches.
+
+Usage:
+  python scripts/chroma_snapshot.py export
+  python scripts/chroma_snapshot.py export --collections domain_tarot --snapshot-dir /tmp/snap
+  python scripts/chroma_snapshot.py import --persist-dir /data/chromadb
+  python scripts/chroma_snapshot.py import --replace
+  python scripts/chroma_snapshot.py verify
+"""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import sys
+import time
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+from chroma_bulk import strip_bulk_metadata
+from pipeline_profiling import run_profiled, stage
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+DEFAULT_PERSIST_DIR = REPO_ROOT / "backend_ai" / "data" / "chromadb"
+DEFAULT_SNAPSHOT_DIR = REPO_ROOT / "backend_ai" / "data" / "chroma_snapshots"
+DEFAULT_COLLECTIONS = ("saju_astro_graph_nodes_v1", "saju_astro_cross_v1", "domain_tarot")
+FORMAT_VERSION = 1
+EXPORT_PAGE_SIZE = 2000
+DEFAULT_ADD_BATCH = 5000
+
+MANIFEST_NAME = "manifest.json"
+RECORDS_NAME = "records.jsonl"
+EMBEDDINGS_NAME = "embeddings.npy"
+
+
+class SnapshotError(RuntimeError):
+    pass
+
+
+def open_client(persist_dir: Path):
+    from chromadb import PersistentClient  # pylint: disable=import-outside-toplevel
+    from chromadb.config import Settings  # pylint: disable=import-outside-toplevel
+
+    persist_dir.mkdir(parents=True, exist_ok=True)
+    return PersistentClient(
+        path=str(persist_dir),
+        settings=Settings(anonymized_telemetry=False, allow_reset=True),
+    )
+
+
+def _max_batch_size(client) -> int:
+    getter = getattr(client, "get_max_batch_size", None)
+    if callable(getter):
+        try:
+            return int(getter())
+        except Exception:
+            pass
+    return int(getattr(client, "max_batch_size", 0) or DEFAULT_ADD_BATCH)
+
+
+def _sha256(path: Path) -> str:
+    h = hashlib.sha256()
+    with path.open("rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def export_collection(client, name: str, out_dir: Path, page_size: int = EXPORT_PAGE_SIZE) -> Dict:
+    collection = client.get_collection(name)
+    count = collection.count()
+    if count == 0:
+        raise SnapshotError(f"collection {name} is empty; refusing to export")
+
+    out_dir.mkdir(parents=True, exist_ok=True)
+    records_path = out_dir / RECORDS_NAME
+    embeddings_path = out_dir / EMBEDDINGS_NAME
+    matrix: Optional[np.ndarray] = None
+    written = 0
+    with records_path.open("w", encoding="utf-8", newline="\n") as records:
+        for offset in range(0, count, page_size):
+            page = collection.get(
+                limit=page_size,
+                offset=offset,
+                include=["documents", "embeddings", "metadatas"],
+            )
+            ids = page.get("ids") or []
+            if not ids:
+                break
+            vecs = np.asarray(page["embeddings"], dtype=np.float32)
+            if matrix is None:
+                matrix = np.lib.format.open_memmap(
+                    embeddings_path, mode="w+", dtype=np.float32, shape=(count, vecs.shape[1])
+                )
+            matrix[written:written + len(ids)] = vecs
+            docs = page.get("documents") or [None] * len(ids)
+            metas = page.get("metadatas") or [None] * len(ids)
+            for doc_id, doc, meta in zip(ids, docs, metas):
+                records.write(json.dumps({"id": doc_id, "document": doc, "metadata": meta}, ensure_ascii=False) + "\n")
+            written += len(ids)
+    if matrix is None or written != count:
+        raise SnapshotError(f"collection {name} changed during export (count={count} exported={written})")
+    dim = int(matrix.shape[1])
+    matrix.flush()
+    del matrix
+
+    manifest = {
+        "format_version": FORMAT_VERSION,
+        "collection": name,
+        "collection_metadata": strip_bulk_metadata(collection.metadata),
+        "count": written,
+        "dim": dim,
+        "dtype": "float32",
+        "created_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "files": {
+            RECORDS_NAME: _sha256(records_path),
+            EMBEDDINGS_NAME: _sha256(embeddings_path),
+        },
+    }
+    (out_dir / MANIFEST_NAME).write_text(json.dumps(manifest, ensure_ascii=False, indent=2), encoding="utf-8")
+    return manifest
+
+
+def load_manifest(snap_dir: Path, verify: bool = True) -> Dict:
+    manifest_path = snap_dir / MANIFEST_NAME
+    if not manifest_path.exists():
+        raise SnapshotError(f"missing {manifest_path}")
+    manifest = json.loads(manifest_path.read_text(encoding="utf-8"))
+    if manifest.get("format_version") != FORMAT_VERSION:
+        raise SnapshotError(f"{snap_dir}: unsupported format_version={manifest.get('format_version')}")
+    if verify:
+        for file_name, expected in manifest["files"].items():
+            actual = _sha256(snap_dir / file_name)
+            if actual != expected:
+                raise SnapshotError(f"{snap_dir / file_name}: sha256 mismatch (expected {expected[:12]}, got {actual[:12]})")
+    return manifest
+
+
+def _iter_record_batches(records_path: Path, batch_size: int) -> Iterator[Tuple[List[str], List[str], List[Dict]]]:
+    ids: List[str] = []
+    docs: List[str] = []
+    metas: List[Dict] = []
+    with records_path.open("r", encoding="utf-8") as f:
+        for line in f:
+            if not line.strip():
+                continue
+            row = json.loads(line)
+            ids.append(row["id"])
+            docs.append(row.get("document") or "")
+            metas.append(row.get("metadata") or None)
+            if len(ids) >= batch_size:
+                yield ids, docs, metas
+                ids, docs, metas = [], [], []
+    if ids:
+        yield ids, docs, metas
+
+
+def import_collection(client, snap_dir: Path, replace: bool = False, verify: bool = True) -> Dict:
+    manifest = load_manifest(snap_dir, verify=verify)
+    name = manifest["collection"]
+    existing = {c if isinstance(c, str) else c.name for c in client.list_collections()}
+    if name in existing:
+        if not replace:
+            raise SnapshotError(f"collection {name} already exists (pass --replace to overwrite)")
+        client.delete_collection(name=name)
+
+    embeddings = np.load(snap_dir / EMBEDDINGS_NAME, mmap_mode="r")
+    if embeddings.shape != (manifest["count"], manifest["dim"]):
+        raise SnapshotError(f"{snap_dir}: embeddings shape {embeddings.shape} does not match manifest")
+
+    collection = client.create_collection(name=name, metadata=strip_bulk_metadata(manifest.get("collection_metadata")) or None)
+    batch_size = _max_batch_size(client)
+    start = 0
+    for ids, docs, metas in _iter_record_batches(snap_dir / RECORDS_NAME, batch_size):
+        end = start + len(ids)
+        collection.add(
+            ids=ids,
+            documents=docs,
+            embeddings=np.ascontiguousarray(embeddings[start:end]),
+            metadatas=metas if any(m is not None for m in metas) else None,
+        )
+        start = end
+    if start != manifest["count"] or collection.count() != manifest["count"]:
+        raise SnapshotError(f"collection {name}: imported {collection.count()} of {manifest['count']} records")
+    return manifest
+
+
+def read_collection_vectors(collection, page_size: int = EXPORT_PAGE_SIZE) -> Tuple[List[str], np.ndarray]:
+    """(ids, float32 [count, dim]) for a live collection, paged like export."""
+    ids: List[str] = []
+    pages: List[np.ndarray] = []
+    for offset in range(0, collection.count(), page_size):
+        page = collection.get(limit=page_size, offset=offset, include=["embeddings"])
+        if not page.get("ids"):
+            break
+        ids.extend(page["ids"])
+        pages.append(np.asarray(page["embeddings"], dtype=np.float32))
+    matrix = np.concatenate(pages) if pages else np.empty((0, 0), dtype=np.float32)
+    return ids, np.ascontiguousarray(matrix)
+
+
+def load_collection_vectors(
+    name: str,
+    persist_dir: Path = DEFAULT_PERSIST_DIR,
+    snapshot_dir: Optional[Path] = DEFAULT_SNAPSHOT_DIR,
+) -> Tuple[List[str], np.ndarray, Dict]:
+    """(ids, float32 vectors, collection metadata), from a snapshot when one exists."""
+    snap_dir = Path(snapshot_dir) / name if snapshot_dir else None
+    if snap_dir is not None and (snap_dir / MANIFEST_NAME).exists():
+        manifest = load_manifest(snap_dir)
+        with (snap_dir / RECORDS_NAME).open("r", encoding="utf-8") as f:
+            ids = [json.loads(line)["id"] for line in f if line.strip()]
+        vectors = np.ascontiguousarray(np.load(snap_dir / EMBEDDINGS_NAME), dtype=np.float32)
+        return ids, vectors, manifest.get("collection_metadata") or {}
+    collection = open_client(Path(persist_dir)).get_collection(name)
+    ids, vectors = read_collection_vectors(collection)
+    return ids, vectors, collection.metadata or {}
+
+
+def _collections_arg(value: str) -> List[str]:
+    return [c.strip() for c in value.split(",") if c.strip()]
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Export/import Chroma collections as portable snapshots.")
+    parser.add_argument("command", choices=["export", "import", "verify"])
+    parser.add_argument("--persist-dir", type=Path, default=DEFAULT_PERSIST_DIR)
+    parser.add_argument("--snapshot-dir", type=Path, default=DEFAULT_SNAPSHOT_DIR)
+    parser.add_argument(
+        "--collections",
+        type=_collections_arg,
+        default=None,
+        help="Comma-separated names (default: export the Saju/Astro + tarot collections, import/verify every snapshot found).",
+    )
+    parser.add_argument("--replace", action="store_true", help="import: drop existing collections of the same name.")
+    parser.add_argument("--skip-verify", action="store_true", help="import: skip sha256 checks.")
+    return parser.parse_args()
+
+
+def _snapshot_names(args) -> List[str]:
+    if args.collections:
+        return args.collections
+    if args.command == "export":
+        return list(DEFAULT_COLLECTIONS)
+    return sorted(p.parent.name for p in args.snapshot_dir.glob(f"*/{MANIFEST_NAME}"))
+
+
+def main() -> int:
+    args = parse_args()
+    names = _snapshot_names(args)
+    if not names:
+        print(f"[snapshot] no snapshots under {args.snapshot_dir}")
+        return 1
+
+    failures = 0
+    client = None if args.command == "verify" else open_client(args.persist_dir)
+    for name in names:
+        snap_dir = args.snapshot_dir / name
+        started = time.perf_counter()
+        try:
+            if args.command == "export":
+                with stage("write"):
+                    manifest = export_collection(client, name, snap_dir)
+            elif args.command == "import":
+                with stage("write"):
+                    manifest = import_collection(client, snap_dir, replace=args.replace, verify=not args.skip_verify)
+            else:
+                with stage("load"):
+                    manifest = load_manifest(snap_dir)
+        except Exception as exc:
+            failures += 1
+            print(f"[snapshot] {args.command} {name} FAILED: {exc}", file=sys.stderr)
+            continue
+        print(
+            f"[snapshot] {args.command} {name} count={manifest['count']} dim={manifest['dim']} "
+            f"sec={time.perf_counter() - started:.2f}"
+        )
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(run_profiled("chroma_snapshot", main))
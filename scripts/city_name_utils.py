@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""
+도시 이름 정규화 공용 모듈 — city 스크립트들이 같이 쓴다.
+
+배경
+----
+filter-cities-to-translated.py / build-city-names-kr-geonames.py /
+translate-cities-kr.py 가 capitalize_words · norm · fold · strip_quotes 를
+각자 복사해 두고, 142k 도시를 여러 pass 돌 때마다 같은 이름을 다시 정규화했다.
+여기서 한 번만 정의하고 lru_cache 로 memoize 한다. 도시 이름은 중복이 많아
+(동명 도시, pass 간 재조회) 캐시 hit 가 대부분이다.
+
+정규화 키 테이블
+----------------
+cities.min.json 각 행의 (key, norm, fold) 를 미리 계산한 sidecar 를
+.cache/city-keys/ 에 저장한다. 파일명에 원본 sha256 앞 12자를 넣어, 원본이
+바뀌면 자동으로 새로 만든다. public/data 는 그대로 배포되는 정적 폴더라
+sidecar 를 그 옆에 두지 않는다.
+
+사용
+----
+  from city_name_utils import capitalize_words, kr_lookup_key, load_key_table
+"""
+
+import hashlib
+import json
+import re
+import unicodedata
+from functools import lru_cache
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+KEY_TABLE_DIR = ROOT / ".cache" / "city-keys"
+
+_WS = re.compile(r"\s+")
+
+
+@lru_cache(maxsize=None)
+def capitalize_words(s: str) -> str:
+    """formatter.ts 의 capitalizeWords 와 동일 — city-names-kr.json 키 형태."""
+    return " ".join(w[:1].upper() + w[1:].lower() for w in s.lower().split(" ") if w)
+
+
+@lru_cache(maxsize=None)
+def norm(s: str) -> str:
+    """매칭용 정규화: 소문자 + 공백/구분 정리."""
+    return _WS.sub(" ", s.strip().lower())
+
+
+@lru_cache(maxsize=None)
+def fold(s: str) -> str:
+    """악센트 제거 + 소문자 (Córdoba/Cordoba 를 같게 본다)."""
+    nfkd = unicodedata.normalize("NFKD", s)
+    return "".join(c for c in nfkd if not unicodedata.combining(c)).lower().strip()
+
+
+def strip_quotes(k: str) -> str:
+    return k[1:-1] if k.startswith("'") and k.endswith("'") else k
+
+
+@lru_cache(maxsize=None)
+def kr_lookup_key(k: str) -> str:
+    """city-names-kr.json 키를 formatter 가 조회하는 형태로 정규화."""
+    return capitalize_words(strip_quotes(k))
+
+
+def cache_stats() -> dict[str, str]:
+    """각 memoized 정규화 함수의 hit/miss (벤치마크/디버그 출력용)."""
+    out = {}
+    for fn in (capitalize_words, norm, fold, kr_lookup_key):
+        info = fn.cache_info()
+        out[fn.__name__] = f"hits={info.hits} misses={info.misses} size={info.currsize}"
+    return out
+
+
+def clear_caches() -> None:
+    for fn in (capitalize_words, norm, fold, kr_lookup_key):
+        fn.cache_clear()
+
+
+# ────────────────────────────────── 정규화 키 테이블 (sidecar)
+
+
+def build_key_table(cities: list[dict]) -> list[tuple[str, str, str]]:
+    """행 순서대로 (capitalize_words, norm, fold) 튜플 리스트."""
+    rows = []
+    for c in cities:
+        name = c.get("name") or ""
+        rows.append((capitalize_words(name), norm(name), fold(name)))
+    return rows
+
+
+def _key_table_path(cities_path: Path, digest: str) -> Path:
+    return KEY_TABLE_DIR / f"{cities_path.stem}.{digest[:12]}.keys.json"
+
+
+def load_key_table(cities_path: Path, cities: list[dict]) -> list[tuple[str, str, str]]:
+    """sidecar 가 원본과 같으면 읽고, 아니면 계산해서 저장 후 반환.
+
+    cities 는 cities_path 를 그대로 읽은 리스트여야 한다(행 정렬이 같아야 함).
+    """
+    digest = hashlib.sha256(cities_path.read_bytes()).hexdigest()
+    path = _key_table_path(cities_path, digest)
+    try:
+        data = json.loads(path.read_text(encoding="utf-8"))
+        if data.get("source_sha256") == digest and len(data.get("rows", [])) == len(cities):
+            return [tuple(r) for r in data["rows"]]
+    except (OSError, json.JSONDecodeError, AttributeError):
+        pass
+
+    rows = build_key_table(cities)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    for stale in path.parent.glob(f"{cities_path.stem}.*.keys.json"):
+        stale.unlink(missing_ok=True)
+    path.write_text(
+        json.dumps({"source_sha256": digest, "columns": ["key", "norm", "fold"], "rows": rows},
+                   ensure_ascii=False, separators=(",", ":")),
+        encoding="utf-8",
+    )
+    return rows
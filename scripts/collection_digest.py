@@ -0,0 +1,222 @@
+#!/usr/bin/env python
+"""
+Bucketed Merkle digest of collection contents for drift detection.
+
+Every (id, sha256(document)) pair is assigned to one of BUCKETS buckets by a
+hash of its id. A bucket's leaf is the sha256 of its sorted pairs, and leaves
+are hashed pairwise up to a single root. reindex_saju_astro_cross and
+tarot_rebuild_chroma write the digest (root + leaves) to
+backend_ai/data/collection_digests/<collection>.json after a build, next to
+the collection_stats sidecar.
+
+verify recomputes the digest from the source corpus and compares:
+
+- against the stored digest (default): no Chroma access, tells whether the
+  sources changed since the build and which buckets moved
+- against the live collection (--live): pages ids + documents out of
+  Chroma, then diffs ids only inside the differing buckets; --manifest-out
+  writes {"upsert": [...], "delete": [...]} for --resync-manifest on the
+  indexer, which re-embeds just those ids instead of rebuilding
+
+Usage:
+  python scripts/collection_digest.py verify --collection saju_astro_cross_v1
+  python scripts/collection_digest.py verify --collection domain_tarot --live --manifest-out /tmp/tarot_drift.json
+  python scripts/tarot_rebuild_chroma.py --resync-manifest /tmp/tarot_drift.json
+"""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import time
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from pipeline_profiling import run_profiled, stage
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+DEFAULT_DIGEST_DIR = REPO_ROOT / "backend_ai" / "data" / "collection_digests"
+DEFAULT_PERSIST_DIR = REPO_ROOT / "backend_ai" / "data" / "chromadb"
+DEFAULT_GRAPH_ROOT = REPO_ROOT / "backend_ai" / "data" / "graph"
+CROSS_COLLECTION = "saju_astro_cross_v1"
+FORMAT_VERSION = 1
+# Power of two so the tree is balanced.
+BUCKETS = 256
+PAGE_SIZE = 1000
+
+
+def content_hash(document: str) -> str:
+    return hashlib.sha256((document or "").encode("utf-8")).hexdigest()
+
+
+def bucket_of(doc_id: str, buckets: int = BUCKETS) -> int:
+    return int.from_bytes(hashlib.sha256(doc_id.encode("utf-8")).digest()[:4], "big") % buckets
+
+
+def _pair(left: str, right: str) -> str:
+    return hashlib.sha256(bytes.fromhex(left) + bytes.fromhex(right)).hexdigest()
+
+
+def merkle_root(leaves: Sequence[str]) -> str:
+    level = list(leaves)
+    while len(level) > 1:
+        if len(level) % 2:
+            level.append(level[-1])
+        level = [_pair(level[i], level[i + 1]) for i in range(0, len(level), 2)]
+    return level[0] if level else content_hash("")
+
+
+def hash_pairs(ids: Sequence[str], docs: Sequence[str]) -> Dict[str, str]:
+    return {doc_id: content_hash(doc) for doc_id, doc in zip(ids, docs)}
+
+
+def compute_digest(collection: str, pairs: Dict[str, str], buckets: int = BUCKETS) -> Dict[str, object]:
+    """Digest of id -> content hash pairs (see hash_pairs)."""
+    grouped: List[List[str]] = [[] for _ in range(buckets)]
+    for doc_id, digest in pairs.items():
+        grouped[bucket_of(doc_id, buckets)].append(f"{doc_id}\t{digest}\n")
+    leaves = [hashlib.sha256("".join(sorted(lines)).encode("utf-8")).hexdigest() for lines in grouped]
+    return {
+        "format_version": FORMAT_VERSION,
+        "collection": collection,
+        "count": len(pairs),
+        "built_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "buckets": buckets,
+        "root": merkle_root(leaves),
+        "leaves": leaves,
+    }
+
+
+def digest_path(collection: str, digest_dir: Path = DEFAULT_DIGEST_DIR) -> Path:
+    return Path(digest_dir) / f"{collection}.json"
+
+
+def write_digest(digest: Dict[str, object], digest_dir: Path = DEFAULT_DIGEST_DIR) -> Path:
+    target = digest_path(str(digest["collection"]), digest_dir)
+    target.parent.mkdir(parents=True, exist_ok=True)
+    target.write_text(json.dumps(digest, indent=1) + "\n", encoding="utf-8")
+    return target
+
+
+def load_digest(collection: str, digest_dir: Path = DEFAULT_DIGEST_DIR) -> Optional[Dict[str, object]]:
+    target = digest_path(collection, digest_dir)
+    if not target.exists():
+        return None
+    try:
+        digest = json.loads(target.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return None
+    return digest if digest.get("format_version") == FORMAT_VERSION else None
+
+
+def diff_buckets(left: Dict[str, object], right: Dict[str, object]) -> List[int]:
+    """Bucket numbers whose leaves differ; [] when the roots match."""
+    if left["buckets"] != right["buckets"]:
+        raise ValueError(f"bucket counts differ: {left['buckets']} vs {right['buckets']}")
+    if left["root"] == right["root"]:
+        return []
+    return [i for i, (a, b) in enumerate(zip(left["leaves"], right["leaves"])) if a != b]
+
+
+def resync_plan(
+    source: Dict[str, str], live: Dict[str, str], buckets: Iterable[int], n_buckets: int = BUCKETS
+) -> Tuple[List[str], List[str]]:
+    """(ids to upsert, ids to delete) restricted to the given buckets."""
+    wanted = set(buckets)
+    upsert = sorted(i for i, h in source.items() if bucket_of(i, n_buckets) in wanted and live.get(i) != h)
+    delete = sorted(i for i in live if i not in source and bucket_of(i, n_buckets) in wanted)
+    return upsert, delete
+
+
+def load_manifest(path: Path) -> Tuple[str, set, List[str]]:
+    """(collection, ids to upsert, ids to delete) from a verify --manifest-out file."""
+    manifest = json.loads(Path(path).read_text(encoding="utf-8"))
+    return manifest["collection"], set(manifest.get("upsert", [])), list(manifest.get("delete", []))
+
+
+def live_pairs(collection) -> Dict[str, str]:
+    """id -> content hash for every document in a Chroma collection."""
+    pairs: Dict[str, str] = {}
+    total = collection.count()
+    for offset in range(0, total, PAGE_SIZE):
+        page = collection.get(limit=PAGE_SIZE, offset=offset, include=["documents"])
+        pairs.update(hash_pairs(page.get("ids") or [], page.get("documents") or []))
+    return pairs
+
+
+def source_pairs(collection: str, corpus_path: Optional[Path], graph_root: Path) -> Dict[str, str]:
+    """Recompute id -> content hash from the corpus the collection is built from."""
+    # pylint: disable=import-outside-toplevel
+    if collection == CROSS_COLLECTION:
+        from reindex_saju_astro_cross import collect_docs
+
+        ids, docs, _metas = collect_docs(graph_root)
+        return hash_pairs(ids, docs)
+
+    from tarot_pipeline_utils import DEFAULT_CORPUS_PATH, load_jsonl_records
+    from tarot_rebuild_chroma import collect_payloads
+
+    primary, combo = collect_payloads(load_jsonl_records(Path(corpus_path or DEFAULT_CORPUS_PATH)))
+    ids, docs, _metas = combo if collection.endswith("_combo") else primary
+    return hash_pairs(ids, docs)
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Verify a collection's Merkle digest against its source corpus.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    verify = sub.add_parser("verify")
+    verify.add_argument("--collection", required=True, help="saju_astro_cross_v1, domain_tarot or domain_tarot_combo.")
+    verify.add_argument("--graph-root", type=Path, default=DEFAULT_GRAPH_ROOT)
+    verify.add_argument("--corpus-path", type=Path, default=None, help="Tarot JSONL corpus (default: pipeline default).")
+    verify.add_argument("--live", action="store_true", help="Compare against the live Chroma collection.")
+    verify.add_argument("--persist-dir", type=Path, default=DEFAULT_PERSIST_DIR)
+    verify.add_argument("--digest-dir", type=Path, default=DEFAULT_DIGEST_DIR)
+    verify.add_argument("--manifest-out", type=Path, default=None, help="With --live: write upsert/delete ids here.")
+    return parser.parse_args()
+
+
+def main() -> int:
+    args = parse_args()
+    name = args.collection
+    with stage("parse"):
+        source = source_pairs(name, args.corpus_path, args.graph_root)
+        source_digest = compute_digest(name, source)
+    print(f"[digest] {name}: source count={source_digest['count']} root={source_digest['root'][:16]}")
+
+    live: Dict[str, str] = {}
+    if args.live:
+        from chroma_snapshot import open_client  # pylint: disable=import-outside-toplevel
+
+        with stage("query"):
+            live = live_pairs(open_client(args.persist_dir).get_collection(name))
+        other = compute_digest(name, live)
+        label = "live"
+    else:
+        other = load_digest(name, args.digest_dir)
+        if other is None:
+            print(f"[digest] {name}: no stored digest in {args.digest_dir}")
+            return 1
+        label = f"stored ({other['built_at']})"
+    print(f"[digest] {name}: {label} count={other['count']} root={other['root'][:16]}")
+
+    drifted = diff_buckets(source_digest, other)
+    if not drifted:
+        print(f"[digest] {name}: in sync")
+        return 0
+    print(f"[digest] {name}: DRIFT buckets={len(drifted)}/{source_digest['buckets']} {drifted[:32]}")
+    if args.live:
+        upsert, delete = resync_plan(source, live, drifted)
+        print(f"[digest] {name}: resync upsert={len(upsert)} delete={len(delete)}")
+        if args.manifest_out:
+            args.manifest_out.parent.mkdir(parents=True, exist_ok=True)
+            args.manifest_out.write_text(
+                json.dumps({"collection": name, "buckets": drifted, "upsert": upsert, "delete": delete}, ensure_ascii=False, indent=1) + "\n",
+                encoding="utf-8",
+            )
+            print(f"[digest] manifest={args.manifest_out}")
+    return 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(run_profiled("collection_digest", main))
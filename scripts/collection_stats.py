@@ -0,0 +1,235 @@
+#!/usr/bin/env python
+"""
+Per-collection statistics sidecars written at index time.
+
+The Saju+Astro reindexers and tarot_rebuild_chroma write
+backend_ai/data/collection_stats/<collection>.json after a successful build:
+
+  count                   documents described (the build's id set)
+  embedding_model_id      model the vectors came from
+  doc_length              min/mean/p50/p95/max chars + histogram
+  short_docs              docs under SHORT_DOC_CHARS stripped chars
+  metadata_completeness   non-empty ratio per metadata key (+ "theme_or_axis")
+  source_manifest_sha256  sha256 over (relative path, size, content sha256)
+                          of the source files the build read (paths
+                          relative to the repo root)
+  collection_version      prefetch_cache.collection_version of just this
+                          collection after the write (Chroma id, count,
+                          highest write seq_id)
+
+self_check.health_check reads the sidecar and only pays for a count and one
+read-only query on chroma.sqlite3; it falls back to sampling documents when
+the sidecar is missing or stale: the live collection_version differs, so
+any write since the build (--no-reset upsert, resync, in-place edit) counts,
+even when the record count is unchanged. `verify` recomputes the source manifest hash to tell
+whether the sources changed since the build.
+
+Usage:
+  python scripts/collection_stats.py show --collections saju_astro_cross_v1
+  python scripts/collection_stats.py verify --collection domain_tarot --sources src/lib/Tarot/data/corpus.jsonl
+"""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import statistics
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from pipeline_profiling import percentile, run_profiled
+from prefetch_cache import DEFAULT_PERSIST_DIR, collection_version
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+DEFAULT_STATS_DIR = REPO_ROOT / "backend_ai" / "data" / "collection_stats"
+FORMAT_VERSION = 2
+# Same threshold self_check has always used for "empty" documents.
+SHORT_DOC_CHARS = 30
+LENGTH_BUCKETS = (0, 30, 100, 300, 1000, 3000)
+
+
+def _sha256_file(path: Path) -> str:
+    digest = hashlib.sha256()
+    with path.open("rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def source_manifest_hash(paths: Iterable[Path], root: Path = REPO_ROOT) -> str:
+    digest = hashlib.sha256()
+    for path in sorted({Path(p).resolve() for p in paths}):
+        try:
+            rel = path.relative_to(root).as_posix()
+        except ValueError:
+            rel = path.as_posix()
+        digest.update(f"{rel}\0{path.stat().st_size}\0{_sha256_file(path)}\n".encode("utf-8"))
+    return digest.hexdigest()
+
+
+def _histogram(lengths: Sequence[int]) -> Dict[str, int]:
+    edges = list(LENGTH_BUCKETS) + [None]
+    hist: Dict[str, int] = {}
+    for low, high in zip(edges, edges[1:]):
+        label = f"{low}-{high - 1}" if high is not None else f"{low}+"
+        hist[label] = sum(1 for n in lengths if n >= low and (high is None or n < high))
+    return hist
+
+
+def _filled(value: Any) -> bool:
+    return value not in (None, "", [], {})
+
+
+def compute_stats(
+    collection: str,
+    docs: Sequence[str],
+    metas: Sequence[Dict[str, Any]],
+    embedding_model_id: str,
+    source_files: Iterable[Path] = (),
+    persist_dir: Optional[Path] = None,
+) -> Dict[str, Any]:
+    """Call after the collection's last write; persist_dir None means the default Chroma dir."""
+    lengths = sorted(len((doc or "").strip()) for doc in docs)
+    count = len(docs)
+    keys = sorted({key for meta in metas for key in (meta or {})})
+    completeness = {key: sum(1 for meta in metas if _filled((meta or {}).get(key))) for key in keys}
+    completeness["theme_or_axis"] = sum(
+        1 for meta in metas if _filled((meta or {}).get("theme")) or _filled((meta or {}).get("axis"))
+    )
+    files = sorted({Path(p) for p in source_files})
+    return {
+        "format_version": FORMAT_VERSION,
+        "collection": collection,
+        "count": count,
+        "built_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "embedding_model_id": embedding_model_id,
+        "doc_length": {
+            "min": lengths[0] if lengths else 0,
+            "mean": round(float(statistics.mean(lengths)), 1) if lengths else 0.0,
+            "p50": percentile(lengths, 50),
+            "p95": percentile(lengths, 95),
+            "max": lengths[-1] if lengths else 0,
+            "histogram": _histogram(lengths),
+        },
+        "short_docs": sum(1 for n in lengths if n < SHORT_DOC_CHARS),
+        "metadata_completeness": {key: round(n / count, 4) if count else 0.0 for key, n in completeness.items()},
+        "source_files": len(files),
+        "source_manifest_sha256": source_manifest_hash(files),
+        "collection_version": collection_version(Path(persist_dir or DEFAULT_PERSIST_DIR), (collection,)),
+    }
+
+
+def stats_path(collection: str, stats_dir: Path = DEFAULT_STATS_DIR) -> Path:
+    return Path(stats_dir) / f"{collection}.json"
+
+
+def write_stats(stats: Dict[str, Any], stats_dir: Path = DEFAULT_STATS_DIR) -> Path:
+    target = stats_path(stats["collection"], stats_dir)
+    target.parent.mkdir(parents=True, exist_ok=True)
+    target.write_text(json.dumps(stats, ensure_ascii=False, indent=2) + "\n", encoding="utf-8")
+    return target
+
+
+def load_stats(collection: str, stats_dir: Path = DEFAULT_STATS_DIR) -> Optional[Dict[str, Any]]:
+    target = stats_path(collection, stats_dir)
+    if not target.exists():
+        return None
+    try:
+        stats = json.loads(target.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return None
+    return stats if stats.get("format_version") == FORMAT_VERSION else None
+
+
+def is_fresh(stats: Optional[Dict[str, Any]], live_count: int, persist_dir: Optional[Path] = None) -> bool:
+    """True when the collection has not been written since the sidecar was computed."""
+    if not stats or int(stats.get("count", -1)) != int(live_count):
+        return False
+    live = collection_version(Path(persist_dir or DEFAULT_PERSIST_DIR), (stats["collection"],))
+    return live != "missing" and stats.get("collection_version") == live
+
+
+def indexed_model_id(collection, stats_dir: Path = DEFAULT_STATS_DIR) -> Optional[str]:
+    """Model a live collection's vectors came from: its embedding_model_id metadata, else the sidecar's."""
+    model_id = (collection.metadata or {}).get("embedding_model_id")
+    if model_id:
+        return str(model_id)
+    stats = load_stats(collection.name, stats_dir)
+    return stats.get("embedding_model_id") if stats else None
+
+
+def read_collection(collection, page_size: int = 1000) -> Tuple[List[str], List[str], List[Dict[str, Any]]]:
+    """(ids, documents, metadatas) of every record in a live collection."""
+    ids: List[str] = []
+    docs: List[str] = []
+    metas: List[Dict[str, Any]] = []
+    for offset in range(0, collection.count(), page_size):
+        page = collection.get(limit=page_size, offset=offset, include=["documents", "metadatas"])
+        page_ids = page.get("ids") or []
+        ids.extend(page_ids)
+        docs.extend(page.get("documents") or [""] * len(page_ids))
+        metas.extend(m or {} for m in (page.get("metadatas") or [None] * len(page_ids)))
+    return ids, docs, metas
+
+
+def missing_count(stats: Dict[str, Any], key: str) -> int:
+    """Documents whose metadata lacks key, from the completeness ratio."""
+    ratio = float(stats.get("metadata_completeness", {}).get(key, 0.0))
+    return int(round(stats.get("count", 0) * (1.0 - ratio)))
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Show or verify collection statistics sidecars.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    show = sub.add_parser("show")
+    show.add_argument("--collections", default="saju_astro_graph_nodes_v1,saju_astro_cross_v1,domain_tarot")
+    show.add_argument("--stats-dir", type=Path, default=DEFAULT_STATS_DIR)
+    verify = sub.add_parser("verify")
+    verify.add_argument("--collection", required=True)
+    verify.add_argument("--sources", required=True, nargs="+", type=Path, help="Source files or directories (recursed).")
+    verify.add_argument("--stats-dir", type=Path, default=DEFAULT_STATS_DIR)
+    return parser.parse_args()
+
+
+def _expand(paths: List[Path]) -> List[Path]:
+    out: List[Path] = []
+    for path in paths:
+        if path.is_dir():
+            out.extend(p for p in path.rglob("*") if p.is_file())
+        else:
+            out.append(path)
+    return out
+
+
+def main() -> int:
+    args = parse_args()
+    if args.command == "show":
+        for name in [c.strip() for c in args.collections.split(",") if c.strip()]:
+            stats = load_stats(name, args.stats_dir)
+            if stats is None:
+                print(f"[collection_stats] {name}: no sidecar")
+                continue
+            length = stats["doc_length"]
+            print(
+                f"[collection_stats] {name}: count={stats['count']} model={stats['embedding_model_id']} "
+                f"built_at={stats['built_at']} len_p50={length['p50']} len_p95={length['p95']} "
+                f"short_docs={stats['short_docs']} sources={stats['source_files']}"
+            )
+        return 0
+
+    stats = load_stats(args.collection, args.stats_dir)
+    if stats is None:
+        print(f"[collection_stats] {args.collection}: no sidecar")
+        return 1
+    current = source_manifest_hash(_expand(args.sources))
+    if current != stats["source_manifest_sha256"]:
+        print(f"[collection_stats] {args.collection}: sources CHANGED since {stats['built_at']}")
+        return 1
+    print(f"[collection_stats] {args.collection}: sources match build of {stats['built_at']}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(run_profiled("collection_stats", main))
@@ -0,0 +1,83 @@
+"""
+Batched build_cross_summary for scripts that run many cross queries.
+
+build_cross_summary (backend_ai/app/rag/cross_store.py) embeds its query and
+searches saju_astro_cross_v1 once per call. build_cross_summaries() takes the
+whole list of items up front and:
+
+- drops duplicate items (same query, seeds and chart JSON) and computes each
+  distinct one once
+- loads the shared query model (saju_astro_rag.get_model(prefer_multilingual=True),
+  the model the cross collection is indexed with) once, before the workers
+  start, so they do not race to load it
+- runs the per-item embed + retrieval + grouping on a small thread pool, so
+  the Chroma searches overlap instead of running back to back
+
+build_cross_summary embeds inside cross_store, which takes no precomputed
+vector, so those encodes do not go through query_embedding_cache.
+
+Retrieval, ranking and grouping stay in cross_store, so results are the ones
+the per-item loop produced.
+"""
+
+from __future__ import annotations
+
+import json
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+
+from pipeline_profiling import stage
+from query_embedding_cache import load_query_model
+
+DEFAULT_WORKERS = 4
+
+
+@dataclass
+class CrossItem:
+    query: str
+    saju_seed: List[str] = field(default_factory=list)
+    astro_seed: List[str] = field(default_factory=list)
+    saju_json: Optional[Dict[str, Any]] = None
+    astro_json: Optional[Dict[str, Any]] = None
+
+    def identity(self) -> str:
+        return json.dumps(
+            [self.query, self.saju_seed, self.astro_seed, self.saju_json, self.astro_json],
+            ensure_ascii=False,
+            sort_keys=True,
+            default=str,
+        )
+
+
+def build_cross_summaries(items: List[CrossItem], workers: int = DEFAULT_WORKERS, **kwargs: Any) -> List[Any]:
+    """build_cross_summary(item..., **kwargs) for every item, in input order."""
+    from backend_ai.app.rag.cross_store import build_cross_summary  # pylint: disable=import-outside-toplevel
+
+    slots: Dict[str, int] = {}
+    distinct: List[CrossItem] = []
+    order: List[int] = []
+    for item in items:
+        identity = item.identity()
+        if identity not in slots:
+            slots[identity] = len(distinct)
+            distinct.append(item)
+        order.append(slots[identity])
+
+    def _one(item: CrossItem) -> Any:
+        extra = dict(kwargs)
+        if item.saju_json is not None:
+            extra["saju_json"] = item.saju_json
+        if item.astro_json is not None:
+            extra["astro_json"] = item.astro_json
+        return build_cross_summary(item.query, saju_seed=item.saju_seed, astro_seed=item.astro_seed, **extra)
+
+    with stage("load"):
+        load_query_model()
+    with stage("query"):
+        if workers <= 1 or len(distinct) <= 1:
+            results = [_one(item) for item in distinct]
+        else:
+            with ThreadPoolExecutor(max_workers=min(workers, len(distinct))) as pool:
+                results = list(pool.map(_one, distinct))
+    return [results[slot] for slot in order]
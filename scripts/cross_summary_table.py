@@ -0,0 +1,415 @@
+#!/usr/bin/env python
+"""
+Materialized build_cross_summary results for the discrete chart key space.
+
+Cross retrieval only sees a handful of discrete chart fields (see
+audit_cross_advanced._build_query / _extract_seeds):
+
+  theme x daymaster stem (element follows) x dominant element
+        x dominant ten-god x sun x moon x ascendant sign
+
+`build` enumerates that space (8 x 10 x 5 x 10 x 12^3 keys by default; narrow
+it with --themes / --stems / --dominant-elements / --ten-gods or split it with
+--shard), runs build_cross_summary for every key in a process pool and stores
+zlib-compressed {"summary", "grouped"} JSON in a single SQLite file:
+
+  backend_ai/data/cross_summary_table.sqlite   (override: RAG_CROSS_TABLE_PATH)
+    summaries(key TEXT PRIMARY KEY, payload BLOB) WITHOUT ROWID
+    meta(name TEXT PRIMARY KEY, value TEXT)       top_k, max_groups, collection counts, ...
+
+Reruns skip keys that are already stored, so an interrupted build resumes
+where it stopped and shards can be built on separate machines into the same
+file.
+
+Serving: cross_summary() maps a chart to its key and returns the stored
+result (one primary-key read) when the caller's query is the one the key was
+built with. Charts outside the vocabulary, custom queries, a missing table,
+a table built with different top_k / max_groups, or one whose cross
+collections changed since the build (prefetch_cache.collection_version over
+CROSS_COLLECTIONS, checked once when the table is opened) fall back to live
+build_cross_summary. The table is built with CROSS_ADVANCED=0 and is not
+served when CROSS_ADVANCED=1, because advanced links depend on chart fields
+beyond the key.
+
+Usage:
+  python scripts/cross_summary_table.py build --workers 8
+  python scripts/cross_summary_table.py build --themes life_path,love --shard 0/4
+  python scripts/cross_summary_table.py stats
+"""
+
+from __future__ import annotations
+
+import argparse
+import itertools
+import json
+import os
+import sqlite3
+import time
+import zlib
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from audit_cross_advanced import DAYMASTERS, SIGNS, TEN_GODS, THEMES, _build_query, _extract_seeds
+from chroma_snapshot import DEFAULT_PERSIST_DIR, open_client
+from pipeline_profiling import run_profiled, stage
+from prefetch_cache import collection_version
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+DEFAULT_TABLE_PATH = REPO_ROOT / "backend_ai" / "data" / "cross_summary_table.sqlite"
+TABLE_PATH_ENV = "RAG_CROSS_TABLE_PATH"
+ELEMENTS = ["목", "화", "토", "금", "수"]
+CROSS_COLLECTIONS = ("saju_astro_graph_nodes_v1", "saju_astro_cross_v1")
+KEY_SCHEMA = 1
+DEFAULT_TOP_K = 12
+DEFAULT_MAX_GROUPS = 3
+CHUNK_KEYS = 64
+
+STEM_ELEMENT = dict(DAYMASTERS)
+
+Key = Tuple[str, str, str, str, str, str, str]  # theme, stem, dominant element, ten-god, sun, moon, asc
+
+
+def table_path(path: Optional[Path] = None) -> Path:
+    return Path(path or os.getenv(TABLE_PATH_ENV) or DEFAULT_TABLE_PATH)
+
+
+def key_string(key: Key) -> str:
+    return "|".join(key)
+
+
+def chart_for_key(key: Key) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+    """Minimal saju/astro JSON carrying exactly the fields the key covers."""
+    _theme, stem, dominant_element, ten_god, sun, moon, asc = key
+    saju = {
+        "dayMaster": {"name": stem, "heavenlyStem": stem, "element": STEM_ELEMENT[stem]},
+        "dominantElement": dominant_element,
+        "tenGods": {"dominant": ten_god},
+    }
+    astro = {"sun": {"sign": sun}, "moon": {"sign": moon}, "ascendant": {"sign": asc}}
+    return saju, astro
+
+
+def chart_key(theme: str, saju_data: Dict[str, Any], astro_data: Dict[str, Any]) -> Optional[Key]:
+    """Key for a real chart, or None when any field is missing or outside the enumerated vocabulary."""
+    if not isinstance(saju_data, dict) or not isinstance(astro_data, dict):
+        return None
+    if not (astro_data.get("ascendant") or astro_data.get("rising")):
+        return None
+    saju_seed, astro_seed = _extract_seeds(saju_data, astro_data)
+    if len(saju_seed) != 4 or len(astro_seed) != 3:
+        return None
+    stem, element, dominant_element, ten_god = saju_seed
+    if STEM_ELEMENT.get(stem) != element or dominant_element not in ELEMENTS or ten_god not in TEN_GODS:
+        return None
+    if theme not in THEMES or any(sign not in SIGNS for sign in astro_seed):
+        return None
+    return (theme, stem, dominant_element, ten_god, *astro_seed)
+
+
+def iter_keys(
+    themes: Sequence[str],
+    stems: Sequence[str],
+    dominant_elements: Sequence[str],
+    ten_gods: Sequence[str],
+    shard: Tuple[int, int] = (0, 1),
+) -> Iterator[Key]:
+    index, count = shard
+    space = itertools.product(themes, stems, dominant_elements, ten_gods, SIGNS, SIGNS, SIGNS)
+    for i, key in enumerate(space):
+        if i % count == index:
+            yield key
+
+
+def _encode(summary: str, grouped: List[Tuple[str, List[Dict[str, Any]]]]) -> bytes:
+    payload = {"summary": summary, "grouped": [[axis, items] for axis, items in grouped]}
+    return zlib.compress(json.dumps(payload, ensure_ascii=False, default=str).encode("utf-8"), 6)
+
+
+def _decode(blob: bytes) -> Tuple[str, List[Tuple[str, List[Dict[str, Any]]]]]:
+    payload = json.loads(zlib.decompress(blob).decode("utf-8"))
+    return payload["summary"], [(axis, items) for axis, items in payload["grouped"]]
+
+
+def _connect(path: Path) -> sqlite3.Connection:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    conn = sqlite3.connect(str(path))
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("CREATE TABLE IF NOT EXISTS summaries (key TEXT PRIMARY KEY, payload BLOB NOT NULL) WITHOUT ROWID")
+    conn.execute("CREATE TABLE IF NOT EXISTS meta (name TEXT PRIMARY KEY, value TEXT NOT NULL)")
+    return conn
+
+
+def _read_meta(conn: sqlite3.Connection) -> Dict[str, Any]:
+    return {name: json.loads(value) for name, value in conn.execute("SELECT name, value FROM meta")}
+
+
+def _write_meta(conn: sqlite3.Connection, values: Dict[str, Any]) -> None:
+    conn.executemany(
+        "INSERT OR REPLACE INTO meta (name, value) VALUES (?, ?)",
+        [(name, json.dumps(value, ensure_ascii=False)) for name, value in values.items()],
+    )
+
+
+class CrossSummaryTable:
+    """Read-only view of a built table; get() is a single primary-key lookup."""
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self._conn = sqlite3.connect(f"file:{self.path}?mode=ro", uri=True, check_same_thread=False)
+        self.meta = _read_meta(self._conn)
+        self.hits = 0
+        self.misses = 0
+
+    @classmethod
+    def open(cls, path: Optional[Path] = None) -> Optional["CrossSummaryTable"]:
+        target = table_path(path)
+        if not target.exists():
+            return None
+        try:
+            return cls(target)
+        except sqlite3.Error as exc:
+            print(f"[cross_table] ignoring unreadable {target}: {exc}")
+            return None
+
+    def stale_reason(self, persist_dir: Path = DEFAULT_PERSIST_DIR) -> Optional[str]:
+        """Why the table no longer matches the live cross collections, or None."""
+        built = self.meta.get("collections_version")
+        if not built:
+            return "built without a collections version"
+        live = collection_version(persist_dir, CROSS_COLLECTIONS)
+        if live != built:
+            return f"collections changed since build (built={built} live={live})"
+        return None
+
+    def serves(self, top_k: int, max_groups: int) -> bool:
+        if os.getenv("CROSS_ADVANCED", "0") == "1":
+            return False
+        return (
+            self.meta.get("key_schema") == KEY_SCHEMA
+            and self.meta.get("top_k") == top_k
+            and self.meta.get("max_groups") == max_groups
+        )
+
+    def get(self, key: Key) -> Optional[Tuple[str, List[Tuple[str, List[Dict[str, Any]]]]]]:
+        row = self._conn.execute("SELECT payload FROM summaries WHERE key = ?", (key_string(key),)).fetchone()
+        if row is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return _decode(row[0])
+
+    def count(self) -> int:
+        return int(self._conn.execute("SELECT COUNT(*) FROM summaries").fetchone()[0])
+
+
+_TABLES: Dict[Path, Optional[CrossSummaryTable]] = {}
+
+
+def cross_summary(
+    theme: str,
+    saju_data: Dict[str, Any],
+    astro_data: Dict[str, Any],
+    top_k: int = DEFAULT_TOP_K,
+    max_groups: int = DEFAULT_MAX_GROUPS,
+    query: Optional[str] = None,
+    path: Optional[Path] = None,
+) -> Tuple[str, List[Tuple[str, List[Dict[str, Any]]]]]:
+    """build_cross_summary(..., return_meta=True) served from the table when the chart is covered."""
+    target = table_path(path)
+    if target not in _TABLES:
+        table = CrossSummaryTable.open(target)
+        reason = table.stale_reason() if table is not None else None
+        if reason:
+            print(f"[cross_table] not serving {target}: {reason}")
+            table = None
+        _TABLES[target] = table
+    table = _TABLES[target]
+    if table is not None and table.serves(top_k, max_groups):
+        key = chart_key(theme, saju_data, astro_data)
+        # Stored results were retrieved with the key chart's query; anything else runs live.
+        if key and (query or _build_query(theme, saju_data, astro_data)) == _build_query(theme, *chart_for_key(key)):
+            found = table.get(key)
+            if found is not None:
+                return found
+
+    from backend_ai.app.rag.cross_store import build_cross_summary  # pylint: disable=import-outside-toplevel
+
+    saju_seed, astro_seed = _extract_seeds(saju_data, astro_data)
+    return build_cross_summary(
+        query or _build_query(theme, saju_data, astro_data),
+        saju_seed=saju_seed,
+        astro_seed=astro_seed,
+        saju_json=saju_data if isinstance(saju_data, dict) else {},
+        astro_json=astro_data if isinstance(astro_data, dict) else {},
+        top_k=top_k,
+        max_groups=max_groups,
+        return_meta=True,
+    )
+
+
+def _compute_chunk(keys: List[Key], top_k: int, max_groups: int) -> List[Tuple[str, bytes]]:
+    from backend_ai.app.rag.cross_store import build_cross_summary  # pylint: disable=import-outside-toplevel
+
+    rows: List[Tuple[str, bytes]] = []
+    for key in keys:
+        saju, astro = chart_for_key(key)
+        saju_seed, astro_seed = _extract_seeds(saju, astro)
+        summary, grouped = build_cross_summary(
+            _build_query(key[0], saju, astro),
+            saju_seed=saju_seed,
+            astro_seed=astro_seed,
+            saju_json=saju,
+            astro_json=astro,
+            top_k=top_k,
+            max_groups=max_groups,
+            return_meta=True,
+        )
+        rows.append((key_string(key), _encode(summary, grouped)))
+    return rows
+
+
+def _collection_counts(persist_dir: Path) -> Dict[str, int]:
+    try:
+        client = open_client(persist_dir)
+        return {name: client.get_collection(name).count() for name in CROSS_COLLECTIONS}
+    except Exception as exc:
+        print(f"[cross_table] collection counts unavailable: {exc}")
+        return {}
+
+
+def _chunks(keys: Iterator[Key], size: int) -> Iterator[List[Key]]:
+    while True:
+        chunk = list(itertools.islice(keys, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def build(args) -> int:
+    os.environ["USE_CHROMADB"] = "1"
+    os.environ["EXCLUDE_NON_SAJU_ASTRO"] = "1"
+    os.environ["CROSS_ADVANCED"] = "0"
+
+    target = table_path(args.table)
+    conn = _connect(target)
+    meta = _read_meta(conn)
+    for name, value in (("top_k", args.top_k), ("max_groups", args.max_groups), ("key_schema", KEY_SCHEMA)):
+        if name in meta and meta[name] != value:
+            raise SystemExit(f"{target} was built with {name}={meta[name]}; pass --table for a new file or delete it")
+    with stage("load"):
+        done = {row[0] for row in conn.execute("SELECT key FROM summaries")}
+    pending = (
+        key
+        for key in iter_keys(args.themes, args.stems, args.dominant_elements, args.ten_gods, args.shard)
+        if key_string(key) not in done
+    )
+
+    started = time.perf_counter()
+    written = 0
+    chunks_done = 0
+    with ProcessPoolExecutor(max_workers=args.workers) as pool, stage("query"):
+        chunks = _chunks(pending, args.chunk_keys)
+        in_flight = set()
+        while True:
+            while len(in_flight) < args.workers * 2:
+                chunk = next(chunks, None)
+                if chunk is None:
+                    break
+                in_flight.add(pool.submit(_compute_chunk, chunk, args.top_k, args.max_groups))
+            if not in_flight:
+                break
+            finished, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+            with stage("write"):
+                for future in finished:
+                    rows = future.result()
+                    conn.executemany("INSERT OR REPLACE INTO summaries (key, payload) VALUES (?, ?)", rows)
+                    written += len(rows)
+                    chunks_done += 1
+                conn.commit()
+            if chunks_done % 50 == 0:
+                rate = written / max(time.perf_counter() - started, 1e-9)
+                print(f"[cross_table] written={written} rate={rate:.1f} keys/s")
+
+    with stage("write"):
+        _write_meta(
+            conn,
+            {
+                "key_schema": KEY_SCHEMA,
+                "top_k": args.top_k,
+                "max_groups": args.max_groups,
+                "collections": _collection_counts(Path(args.persist_dir)),
+                "collections_version": collection_version(Path(args.persist_dir), CROSS_COLLECTIONS),
+                "built_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            },
+        )
+        conn.commit()
+        total = int(conn.execute("SELECT COUNT(*) FROM summaries").fetchone()[0])
+        conn.close()
+    print(f"[cross_table] new={written} skipped={len(done)} total={total} -> {target}")
+    return 0
+
+
+def stats(args) -> int:
+    target = table_path(args.table)
+    table = CrossSummaryTable.open(target)
+    if table is None:
+        print(f"[cross_table] no table at {target}")
+        return 1
+    size_mb = target.stat().st_size / (1024 * 1024)
+    print(f"[cross_table] {target} keys={table.count()} size={size_mb:.1f}MB")
+    for name, value in sorted(table.meta.items()):
+        print(f"[cross_table] meta {name}={value}")
+    reason = table.stale_reason(Path(args.persist_dir))
+    if reason:
+        print(f"[cross_table] STALE: {reason}")
+        return 1
+    return 0
+
+
+def _list_arg(allowed: Sequence[str]):
+    def parse(value: str) -> List[str]:
+        items = [v.strip() for v in value.split(",") if v.strip()]
+        unknown = [v for v in items if v not in allowed]
+        if unknown:
+            raise argparse.ArgumentTypeError(f"unknown values: {', '.join(unknown)}")
+        return items
+
+    return parse
+
+
+def _shard_arg(value: str) -> Tuple[int, int]:
+    index, _, count = value.partition("/")
+    shard = (int(index), int(count or 1))
+    if not 0 <= shard[0] < shard[1]:
+        raise argparse.ArgumentTypeError("expected INDEX/COUNT with 0 <= INDEX < COUNT")
+    return shard
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Precompute build_cross_summary over the chart key space.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    for name in ("build", "stats"):
+        p = sub.add_parser(name)
+        p.add_argument("--table", type=Path, default=None, help="Default: $RAG_CROSS_TABLE_PATH or backend_ai/data/cross_summary_table.sqlite")
+        p.add_argument("--persist-dir", default=str(DEFAULT_PERSIST_DIR))
+    p = sub.choices["build"]
+    p.add_argument("--themes", type=_list_arg(THEMES), default=list(THEMES))
+    p.add_argument("--stems", type=_list_arg(list(STEM_ELEMENT)), default=list(STEM_ELEMENT))
+    p.add_argument("--dominant-elements", type=_list_arg(ELEMENTS), default=list(ELEMENTS))
+    p.add_argument("--ten-gods", type=_list_arg(TEN_GODS), default=list(TEN_GODS))
+    p.add_argument("--shard", type=_shard_arg, default=(0, 1), help="INDEX/COUNT: only every COUNT-th key starting at INDEX.")
+    p.add_argument("--workers", type=int, default=max(1, (os.cpu_count() or 2) - 1))
+    p.add_argument("--chunk-keys", type=int, default=CHUNK_KEYS, help="Keys per worker task.")
+    p.add_argument("--top-k", type=int, default=DEFAULT_TOP_K)
+    p.add_argument("--max-groups", type=int, default=DEFAULT_MAX_GROUPS)
+    return parser.parse_args()
+
+
+def main() -> int:
+    args = parse_args()
+    return build(args) if args.command == "build" else stats(args)
+
+
+if __name__ == "__main__":
+    raise SystemExit(run_profiled("cross_summary_table", main))
@@ -10,12 +10,14 @@ Checks:
 
 from __future__ import annotations
 
-import asyncio
+import argparse
 import os
 import sys
 from pathlib import Path
 from typing import Dict, List
 
+from pipeline_profiling import run_profiled, stage
+
 
 os.environ["USE_CHROMADB"] = "1"
 os.environ["EXCLUDE_NON_SAJU_ASTRO"] = "1"
@@ -107,10 +109,17 @@ async def _run_one(query: str) -> Dict:
 
 
 async def main() -> int:
+    from query_embedding_cache import load_query_model
+
+    argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter).parse_args()
+
     failures: List[str] = []
+    with stage("load"):
+        load_query_model()  # load the backend's shared model once, outside the query stage
 
     for idx, query in enumerate(QUERIES, start=1):
-        result = await _run_one(query)
+        with stage("query"):
+            result = await _run_one(query)
 
         collections = ["saju_astro_graph_nodes_v1", "saju_astro_cross_v1"]
         print(f"[{idx:02d}] {query}")
@@ -148,4 +157,4 @@ async def main() -> int:
 
 
 if __name__ == "__main__":
-    sys.exit(asyncio.run(main()))
+    sys.exit(run_profiled("e2e_rag_smoke", main))
@@ -0,0 +1,267 @@
+"""
+Pluggable embedder backends for indexing/eval scripts.
+
+Backends:
+- model (default): the real SentenceTransformer / model_manager embedder.
+- onnx: ONNX Runtime with dynamic int8 quantization for minilm, e5-large
+  and bge-m3 (see onnx_embedder). CPU-only hosts; exported once and cached.
+- fake: deterministic hash embedder, no model download, no torch. Meant for
+  offline benchmarks and regression runs of parsing, batching, Chroma writes
+  and backfill on air-gapped CI. Vectors are L2-normalized like the real
+  models, and texts sharing tokens land close together so smoke queries
+  still return plausible neighbours.
+
+Select with the RAG_EMBEDDER_BACKEND env var or a script's --embedder flag.
+The fake dimension follows the real model it stands in for (see
+KNOWN_MODEL_DIMS) unless RAG_FAKE_EMBED_DIM is set. Collections built with
+the fake backend should be tagged with fake_model_id(dim) so they are never
+mistaken for real indexes.
+
+Every backend returns contiguous float32 NumPy arrays (see as_float32), so
+callers slice batches straight into Chroma without per-float Python objects.
+
+encode_docs / encode_bucketed schedule document encoding by token length:
+texts are sorted longest-first and packed into batches under a padded-token
+budget (batch rows x longest row), so short card docs no longer pad up to
+1600-char cross descriptions. Output rows come back in input order.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import os
+import re
+from functools import lru_cache
+from typing import Any, Callable, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+from pipeline_profiling import stage
+
+BACKEND_ENV = "RAG_EMBEDDER_BACKEND"
+FAKE_DIM_ENV = "RAG_FAKE_EMBED_DIM"
+BACKENDS = ("model", "onnx", "fake")
+FAKE_MODEL_PREFIX = "fake-hash"
+
+# Output dims of the models the scripts load, so fake vectors fit existing collections.
+KNOWN_MODEL_DIMS = {
+    "minilm": 384,
+    "e5-large": 1024,
+    "bge-m3": 1024,
+}
+DEFAULT_FAKE_DIM = 384
+# Padded tokens per encode() call; ~64 rows of 128 tokens.
+DEFAULT_TOKEN_BUDGET = 8192
+MAX_BUCKET_BATCH = 256
+
+_TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+
+def resolve_backend(backend: Optional[str] = None) -> str:
+    value = (backend or os.getenv(BACKEND_ENV) or "model").strip().lower()
+    if value not in BACKENDS:
+        raise ValueError(f"Unknown embedder backend {value!r} (expected one of {', '.join(BACKENDS)})")
+    return value
+
+
+def fake_dim_for(model_id: Optional[str] = None) -> int:
+    env_dim = os.getenv(FAKE_DIM_ENV)
+    if env_dim:
+        return int(env_dim)
+    if model_id and model_id.startswith(FAKE_MODEL_PREFIX):
+        return int(model_id.rsplit("-", 1)[-1])
+    return KNOWN_MODEL_DIMS.get((model_id or "").lower(), DEFAULT_FAKE_DIM)
+
+
+def fake_model_id(dim: int) -> str:
+    return f"{FAKE_MODEL_PREFIX}-{dim}"
+
+
+def is_fake_model_id(model_id: Optional[str]) -> bool:
+    return bool(model_id) and model_id.startswith(FAKE_MODEL_PREFIX)
+
+
+def model_identity(model) -> str:
+    """Best-effort stable id for an encoder (model_id / model_key / tokenizer name / class).
+
+    A precision attribute (OnnxEmbedder int8 vs fp32) is appended as "@<precision>".
+    """
+    identity = ""
+    for attr in ("model_id", "model_key"):
+        value = getattr(model, attr, None)
+        if value:
+            identity = str(value)
+            break
+    if not identity:
+        name = getattr(getattr(model, "tokenizer", None), "name_or_path", None)
+        identity = str(name) if name else type(model).__name__
+    precision = getattr(model, "precision", None)
+    return f"{identity}@{precision}" if precision else identity
+
+
+def backend_identity(model_id: str, backend: Optional[str] = None) -> str:
+    """model_identity() of the encoder backend would load for model_id, without loading it."""
+    resolved = resolve_backend(backend)
+    if resolved == "fake" or is_fake_model_id(model_id):
+        return fake_model_id(fake_dim_for(model_id))
+    if resolved == "onnx":
+        from onnx_embedder import PRECISION_ENV, resolve_model_key  # pylint: disable=import-outside-toplevel
+
+        return f"{resolve_model_key(model_id)}@{(os.getenv(PRECISION_ENV) or 'int8').lower()}"
+    return model_id
+
+
+@lru_cache(maxsize=200_000)
+def _bucket(feature: str, dim: int) -> Tuple[int, float]:
+    h = int.from_bytes(hashlib.blake2b(feature.encode("utf-8"), digest_size=8).digest(), "little")
+    return h % dim, (1.0 if (h >> 63) & 1 else -1.0)
+
+
+def as_float32(embeds) -> np.ndarray:
+    """Contiguous float32 array from encoder output (torch tensor, ndarray or lists).
+
+    No copy when the input is already a contiguous float32 CPU array/tensor.
+    """
+    if hasattr(embeds, "detach"):
+        embeds = embeds.detach().cpu().numpy()
+    return np.ascontiguousarray(embeds, dtype=np.float32)
+
+
+def _features(text: str) -> List[Tuple[str, float]]:
+    feats: List[Tuple[str, float]] = []
+    for token in _TOKEN_RE.findall(text.lower()):
+        feats.append((f"w:{token}", 1.0))
+        # Char trigrams keep Korean morphology (조사/어미 variants) roughly similar.
+        padded = f"<{token}>"
+        for i in range(len(padded) - 2):
+            feats.append((f"c:{padded[i:i + 3]}", 0.5))
+    return feats
+
+
+class HashEmbedder:
+    """Deterministic stand-in for SentenceTransformer.encode (same call shape)."""
+
+    def __init__(self, dim: int = DEFAULT_FAKE_DIM):
+        self.dim = int(dim)
+        self.model_id = fake_model_id(self.dim)
+
+    def get_sentence_embedding_dimension(self) -> int:
+        return self.dim
+
+    def _embed_into(self, out: np.ndarray, text: str) -> None:
+        feats = _features(text or "")
+        if not feats:
+            feats = [("empty", 1.0)]
+        for feature, weight in feats:
+            idx, sign = _bucket(feature, self.dim)
+            out[idx] += sign * weight
+
+    def encode(
+        self,
+        sentences: Union[str, Sequence[str]],
+        batch_size: int = 32,
+        convert_to_tensor: bool = False,
+        normalize_embeddings: bool = True,
+        show_progress_bar: bool = False,
+        **_kwargs: Any,
+    ) -> np.ndarray:
+        single = isinstance(sentences, str)
+        texts = [sentences] if single else list(sentences)
+        out = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for row, text in zip(out, texts):
+            self._embed_into(row, text)
+        if normalize_embeddings and len(texts):
+            norms = np.linalg.norm(out, axis=1, keepdims=True)
+            norms[norms == 0] = 1.0
+            out /= norms
+        return out[0] if single else out
+
+
+def _token_lengths(texts: Sequence[str], tokenizer=None, max_length: int = 512) -> np.ndarray:
+    if tokenizer is not None:
+        ids = tokenizer(list(texts), add_special_tokens=True, truncation=True, max_length=max_length)["input_ids"]
+        return np.fromiter((len(row) for row in ids), dtype=np.int64, count=len(texts))
+    # No tokenizer (fake backend): ~3 chars per subword token is close enough to bucket.
+    return np.fromiter((min(max_length, len(t or "") // 3 + 2) for t in texts), dtype=np.int64, count=len(texts))
+
+
+def encode_bucketed(
+    encode_fn: Callable[[List[str], int], Any],
+    texts: Sequence[str],
+    token_budget: int = DEFAULT_TOKEN_BUDGET,
+    tokenizer=None,
+    max_length: int = 512,
+    max_batch: int = MAX_BUCKET_BATCH,
+    guard=None,
+) -> np.ndarray:
+    """Run encode_fn(batch_texts, batch_size) over length buckets; rows in input order.
+
+    Texts go longest-first, each batch sized so rows x longest row stays under
+    token_budget. A batch_autotune.MemoryGuard shrinks the budget between
+    batches when memory runs short.
+    """
+    texts = list(texts)
+    out: Optional[np.ndarray] = None
+    lengths = _token_lengths(texts, tokenizer, max_length)
+    order = np.argsort(-lengths, kind="stable")
+    start = 0
+    while start < len(order):
+        budget = token_budget
+        if guard is not None:
+            guard.check()
+            budget = guard.scaled(token_budget, floor=max_length)
+        longest = max(1, int(lengths[order[start]]))
+        idx = order[start:start + max(1, min(max_batch, budget // longest))]
+        vecs = as_float32(encode_fn([texts[i] for i in idx], len(idx)))
+        if out is None:
+            out = np.empty((len(texts), vecs.shape[1]), dtype=np.float32)
+        out[idx] = vecs
+        start += len(idx)
+    return out if out is not None else np.empty((0, 0), dtype=np.float32)
+
+
+def encode_docs(
+    model,
+    texts: Sequence[str],
+    token_budget: int = DEFAULT_TOKEN_BUDGET,
+    guard=None,
+    **encode_kwargs: Any,
+) -> np.ndarray:
+    """Normalized float32 document embeddings from any backend's encode().
+
+    token_budget <= 0 keeps the old fixed 64-row batches in source order.
+    """
+    kwargs = {"convert_to_numpy": True, "normalize_embeddings": True, "show_progress_bar": False}
+    kwargs.update(encode_kwargs)
+    with stage("embed"):
+        if token_budget <= 0:
+            return as_float32(model.encode(list(texts), batch_size=min(64, max(1, len(texts))), **kwargs))
+        return encode_bucketed(
+            lambda batch, size: model.encode(batch, batch_size=size, **kwargs),
+            texts,
+            token_budget=token_budget,
+            tokenizer=getattr(model, "tokenizer", None),
+            max_length=int(getattr(model, "max_seq_length", None) or 512),
+            guard=guard,
+        )
+
+
+def load_embedder(load_model: Callable[[], Any], backend: Optional[str] = None, model_id: Optional[str] = None):
+    """Return an object with SentenceTransformer-style encode().
+
+    load_model is only called for the real backend, so the fake path never
+    imports torch or touches the network. The onnx backend uses model_id (a
+    model key) or $RAG_EMBEDDING_MODEL, defaulting to minilm.
+    """
+    resolved = resolve_backend(backend)
+    if resolved == "fake":
+        embedder = HashEmbedder(fake_dim_for(model_id))
+        print(f"[embedder] backend=fake dim={embedder.dim}")
+        return embedder
+    if resolved == "onnx":
+        from onnx_embedder import OnnxEmbedder  # pylint: disable=import-outside-toplevel
+
+        embedder = OnnxEmbedder(model_id)
+        print(f"[embedder] backend=onnx model={embedder.model_key} precision={embedder.precision}")
+        return embedder
+    return load_model()
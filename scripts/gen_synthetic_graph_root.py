@@ -0,0 +1,250 @@
+#!/usr/bin/env python
+"""
+Generate a synthetic backend_ai/data/graph tree for scale-testing the
+Saju+Astro reindexers.
+
+Emits the three layouts the reindexers read:
+- graph_nodes*.jsonl                 -> reindex_saju_astro_graph_nodes.py
+- cross_analysis/cross_*.csv         -> reindex_saju_astro_cross.py
+- fusion/saju_astro_*.json (nested)  -> reindex_saju_astro_cross.py
+
+Field distributions mimic the real data: EL_/SAJU_/ASTRO_ id prefixes,
+planets/signs/houses/stems/branches/ten gods, Korean+English descriptions
+with long-tailed lengths, life_areas dicts for axis inference, and a share of
+cross rows without explicit refs so the similarity backfill path is exercised.
+Output is deterministic for a given --seed.
+
+Usage:
+  python scripts/gen_synthetic_graph_root.py --scale 10
+  python scripts/gen_synthetic_graph_root.py --scale 100 --out .cache/synthetic-graph/x100
+"""
+
+from __future__ import annotations
+
+import argparse
+import csv
+import json
+import random
+import sys
+from pathlib import Path
+from typing import Dict, List
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+
+# Base sizes at --scale 1 (roughly today's tree).
+BASE_GRAPH_NODES = 6000
+BASE_CROSS_ROWS_PER_FILE = 250
+BASE_FUSION_RECORDS_PER_FILE = 150
+
+CROSS_SOURCES = (
+    "cross_relations_aspects",
+    "cross_synastry_gunghap",
+    "cross_branch_house",
+    "cross_geokguk_house",
+    "cross_shinsal_asteroids",
+    "cross_sipsin_planets",
+    "cross_60ganji_harmonic",
+    "cross_luck_progression",
+    "cross_draconic_karma",
+    "cross_electional_taegil",
+    "cross_rectification",
+    "cross_system_validation",
+)
+FUSION_FILES = (
+    "saju_astro_fusion_core",
+    "saju_astro_fusion_timing",
+    "saju_astro_fusion_relationship",
+    "saju_astro_fusion_career",
+    "cross_saju_astro_health",
+    "saju_astro_fusion_wealth",
+)
+
+PLANETS = ["Sun", "Moon", "Mercury", "Venus", "Mars", "Jupiter", "Saturn", "Uranus", "Neptune", "Pluto", "Chiron"]
+SIGNS = [
+    "Aries", "Taurus", "Gemini", "Cancer", "Leo", "Virgo",
+    "Libra", "Scorpio", "Sagittarius", "Capricorn", "Aquarius", "Pisces",
+]
+HOUSES = [f"H{i}" for i in range(1, 13)]
+ASPECTS = ["conjunction", "opposition", "trine", "square", "sextile", "quincunx"]
+STEMS = ["갑", "을", "병", "정", "무", "기", "경", "신", "임", "계"]
+BRANCHES = ["자", "축", "인", "묘", "진", "사", "오", "미", "신", "유", "술", "해"]
+ELEMENTS = ["wood", "fire", "earth", "metal", "water"]
+SIPSIN = ["비견", "겁재", "식신", "상관", "편재", "정재", "편관", "정관", "편인", "정인"]
+SHINSAL = ["역마", "도화", "화개", "천을귀인", "양인", "백호"]
+LIFE_AREAS = {
+    "relationship": ["연애와 결혼에서 관계의 균형", "partner compatibility and trust"],
+    "career": ["직업과 커리어 방향", "work style and vocation"],
+    "wealth": ["재물 흐름과 돈 관리", "money and finance habits"],
+    "health": ["건강과 회복 리듬", "healing and stress"],
+    "emotion": ["감정과 마음의 결", "mood and inner life"],
+    "timing": ["대운과 세운의 시기", "timing of progression"],
+    "identity": ["성격과 자아 정체성", "personality core"],
+}
+PHRASES_KO = [
+    "기운이 강하게 드러나며", "균형을 잡는 것이 중요하다", "새로운 시작의 에너지가 있다",
+    "관계 속에서 배움이 깊어진다", "인내가 결실로 이어진다", "변화의 흐름을 읽어야 한다",
+    "내면의 목소리에 귀 기울일 때", "재물운이 서서히 열린다", "직업적 전환점이 다가온다",
+]
+PHRASES_EN = [
+    "emphasizes steady growth", "brings tension that asks for balance", "opens a karmic lesson",
+    "supports creative expression", "highlights responsibility and structure", "invites emotional honesty",
+    "marks a timing window for change", "connects identity with purpose",
+]
+
+
+def _text(rng: random.Random, min_phrases: int = 2) -> str:
+    # Long-tailed length: most records are short, a few are paragraphs.
+    n = min(40, min_phrases + int(rng.paretovariate(1.6)))
+    parts = []
+    for _ in range(n):
+        pool = PHRASES_KO if rng.random() < 0.6 else PHRASES_EN
+        parts.append(rng.choice(pool))
+    return ". ".join(parts) + "."
+
+
+def _saju_ref(rng: random.Random) -> str:
+    kind = rng.random()
+    if kind < 0.35:
+        return f"EL_{rng.choice(ELEMENTS).upper()}"
+    if kind < 0.6:
+        return f"SIPSIN_{rng.randrange(10):02d}"
+    if kind < 0.8:
+        return f"GAN_{rng.choice(STEMS)}{rng.choice(BRANCHES)}"
+    return f"SHINSAL_{rng.randrange(len(SHINSAL)):02d}"
+
+
+def _astro_ref(rng: random.Random) -> str:
+    return rng.choice([f"ASTRO_{rng.choice(PLANETS).upper()}", rng.choice(SIGNS), rng.choice(HOUSES)])
+
+
+def _graph_node(rng: random.Random, idx: int) -> Dict:
+    source = rng.choices(["saju", "saju_literary", "astro", "astro_database"], weights=[4, 1, 4, 1])[0]
+    if source.startswith("saju"):
+        node_id = f"SAJU_{idx:07d}"
+        label = f"{rng.choice(STEMS)}{rng.choice(BRANCHES)} {rng.choice(SIPSIN)}"
+        keywords = [rng.choice(SIPSIN), rng.choice(ELEMENTS), rng.choice(SHINSAL)]
+        node_type = rng.choice(["ganji", "sipsin", "shinsal", "ohaeng"])
+    else:
+        node_id = f"ASTRO_{idx:07d}"
+        label = f"{rng.choice(PLANETS)} in {rng.choice(SIGNS)}"
+        keywords = [rng.choice(PLANETS), rng.choice(SIGNS), rng.choice(HOUSES)]
+        node_type = rng.choice(["planet_sign", "house", "aspect"])
+    node: Dict = {"id": node_id, "label": label, "source": source, "type": node_type}
+    desc = _text(rng)
+    # Real nodes keep their text under a handful of different keys, sometimes nested in raw.
+    desc_key = rng.choice(["description", "desc", "content", "meaning", "summary"])
+    if rng.random() < 0.15:
+        node["raw"] = {desc_key: desc}
+    else:
+        node[desc_key] = desc
+    if rng.random() < 0.4:
+        node["cross_hint"] = f"{_saju_ref(rng)} ~ {_astro_ref(rng)}"
+    node["keywords"] = keywords if rng.random() < 0.5 else ", ".join(keywords)
+    if rng.random() < 0.02:
+        node.pop(desc_key, None)  # unusable record, skipped by the reindexer
+        node.pop("raw", None)
+    return node
+
+
+def _cross_row(rng: random.Random, source: str, idx: int) -> Dict[str, str]:
+    with_refs = rng.random() < 0.7
+    return {
+        "id": f"{source.upper()}_{idx:07d}",
+        "label": f"{rng.choice(STEMS)}{rng.choice(BRANCHES)} x {rng.choice(PLANETS)} {rng.choice(ASPECTS)}",
+        "planet": rng.choice(PLANETS),
+        "sign": rng.choice(SIGNS),
+        "house": rng.choice(HOUSES),
+        "element": rng.choice(ELEMENTS),
+        "branch": rng.choice(BRANCHES),
+        "relation": rng.choice(ASPECTS),
+        "description": _text(rng),
+        "saju_refs": ", ".join(_saju_ref(rng) for _ in range(rng.randint(1, 3))) if with_refs else "",
+        "astro_refs": ", ".join(_astro_ref(rng) for _ in range(rng.randint(1, 3))) if with_refs else "",
+    }
+
+
+def _fusion_record(rng: random.Random, idx: int) -> Dict:
+    areas = rng.sample(list(LIFE_AREAS), k=rng.randint(1, 3))
+    record: Dict = {
+        "id": f"FUSION_{idx:07d}",
+        "name": f"{rng.choice(SIPSIN)} + {rng.choice(PLANETS)}",
+        "korean": f"{rng.choice(STEMS)}{rng.choice(BRANCHES)}",
+        "interaction_type": rng.choice(["harmony", "clash", "support", "transform"]),
+        "harmony_score": str(round(rng.uniform(-1, 1), 2)),
+        "life_areas": {area: rng.choice(LIFE_AREAS[area]) + " " + _text(rng, 1) for area in areas},
+        "life_themes": {"core_theme": _text(rng, 1), "shadow": _text(rng, 1)},
+    }
+    if rng.random() < 0.5:
+        record["saju"] = _saju_ref(rng)
+        record["astro"] = _astro_ref(rng)
+    return record
+
+
+def _fusion_document(rng: random.Random, count: int, start: int) -> Dict:
+    # Nested like the real fusion files: metadata + category dicts of record lists.
+    categories: Dict[str, Dict[str, List[Dict]]] = {}
+    for i in range(count):
+        cat = rng.choice(["daymaster", "sun_sign", "moon_sign", "ascendant"])
+        sub = rng.choice(STEMS) if cat == "daymaster" else rng.choice(SIGNS).lower()
+        categories.setdefault(cat, {}).setdefault(sub, []).append(_fusion_record(rng, start + i))
+    # No top-level string values, otherwise the whole file parses as one record.
+    return {"$meta": {"generator": "gen_synthetic_graph_root", "version": "1"}, "categories": categories}
+
+
+def generate(out: Path, scale: float, seed: int) -> Dict[str, int]:
+    rng = random.Random(seed)
+    out.mkdir(parents=True, exist_ok=True)
+    counts = {"graph_nodes": 0, "cross_rows": 0, "fusion_records": 0}
+
+    n_nodes = int(BASE_GRAPH_NODES * scale)
+    shards = max(1, n_nodes // 50_000 + 1)
+    per_shard = -(-n_nodes // shards)
+    for shard in range(shards):
+        path = out / f"graph_nodes_{shard:03d}.jsonl"
+        with path.open("w", encoding="utf-8", newline="\n") as f:
+            for i in range(shard * per_shard, min(n_nodes, (shard + 1) * per_shard)):
+                f.write(json.dumps(_graph_node(rng, i), ensure_ascii=False) + "\n")
+                counts["graph_nodes"] += 1
+
+    cross_dir = out / "cross_analysis"
+    cross_dir.mkdir(exist_ok=True)
+    rows_per_file = int(BASE_CROSS_ROWS_PER_FILE * scale)
+    for source in CROSS_SOURCES:
+        rows = [_cross_row(rng, source, i) for i in range(rows_per_file)]
+        with (cross_dir / f"{source}.csv").open("w", encoding="utf-8", newline="") as f:
+            writer = csv.DictWriter(f, fieldnames=list(rows[0]) if rows else ["id"])
+            writer.writeheader()
+            writer.writerows(rows)
+        counts["cross_rows"] += len(rows)
+
+    fusion_dir = out / "fusion"
+    fusion_dir.mkdir(exist_ok=True)
+    per_fusion = int(BASE_FUSION_RECORDS_PER_FILE * scale)
+    for i, name in enumerate(FUSION_FILES):
+        doc = _fusion_document(rng, per_fusion, start=i * per_fusion)
+        (fusion_dir / f"{name}.json").write_text(json.dumps(doc, ensure_ascii=False), encoding="utf-8")
+        counts["fusion_records"] += per_fusion
+
+    return counts
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Generate a synthetic Saju+Astro graph root for scale tests.")
+    parser.add_argument("--scale", type=float, default=1.0, help="Multiplier over today's approximate data size.")
+    parser.add_argument("--out", type=Path, default=None, help="Output dir (default: .cache/synthetic-graph/x<scale>).")
+    parser.add_argument("--seed", type=int, default=20240601)
+    args = parser.parse_args()
+
+    out = args.out or REPO_ROOT / ".cache" / "synthetic-graph" / f"x{args.scale:g}"
+    if out.resolve() == (REPO_ROOT / "backend_ai" / "data" / "graph").resolve():
+        print("[synthetic] refusing to overwrite the real graph root", file=sys.stderr)
+        return 2
+    counts = generate(out, args.scale, args.seed)
+    print(f"[synthetic] out={out}")
+    for key, value in counts.items():
+        print(f"[synthetic] {key}={value}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
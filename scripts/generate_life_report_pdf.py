@@ -18,6 +18,8 @@ from pathlib import Path
 from typing import Dict, List, Tuple
 from urllib import request, error
 
+from pipeline_profiling import run_profiled, stage
+
 
 REPO_ROOT = Path(__file__).resolve().parents[1]
 BACKEND_AI_ROOT = REPO_ROOT / "backend_ai"
@@ -87,39 +89,27 @@ def _build_query(theme: str, saju_data: Dict, astro_data: Dict) -> str:
     return " ".join([p for p in parts if p])
 
 
-def _extract_seeds(saju_data: Dict, astro_data: Dict) -> Tuple[List[str], List[str]]:
-    dm = saju_data.get("dayMaster", {}) if isinstance(saju_data, dict) else {}
-    ten = saju_data.get("tenGods", {}) if isinstance(saju_data, dict) else {}
-    dominant = ten.get("dominant", "") if isinstance(ten, dict) else ""
-    if isinstance(dominant, dict):
-        dominant = dominant.get("name", "") or dominant.get("ko", "")
-    saju_seed = [
-        _safe(dm.get("heavenlyStem") or dm.get("name")),
-        _safe(dm.get("element")),
-        _safe(saju_data.get("dominantElement")),
-        _safe(dominant),
-    ]
-    astro_seed = [
-        _safe(astro_data.get("sun", {}).get("sign")),
-        _safe(astro_data.get("moon", {}).get("sign")),
-        _safe(astro_data.get("rising", {}).get("sign")),
-    ]
-    return [s for s in saju_seed if s], [a for a in astro_seed if a]
-
-
-def _query_graph_evidence(query: str, top_k: int = 10) -> List[Dict]:
+def _query_graph_evidence(queries: List[str], top_k: int = 10) -> List[List[Dict]]:
     from backend_ai.app.rag.vector_store import VectorStoreManager
-    from backend_ai.app.saju_astro_rag import get_model
+    from query_embedding_cache import encode_queries, load_query_model
 
-    model = get_model(prefer_multilingual=True)
-    emb = model.encode(query, convert_to_tensor=False, normalize_embeddings=True, show_progress_bar=False)
-    vec = emb.tolist() if hasattr(emb, "tolist") else emb
+    # RAG_EMBEDDER_BACKEND=fake runs the report offline (evidence quality is meaningless then).
+    with stage("load"):
+        model = load_query_model()
+    # One encode call for every theme query.
+    with stage("embed"):
+        embs = encode_queries(model, queries, convert_to_tensor=False, normalize_embeddings=True, show_progress_bar=False)
 
     vs = VectorStoreManager(collection_name="saju_astro_graph_nodes_v1")
-    hits = vs.search(query_embedding=vec, top_k=top_k, min_score=0.1, where={"domain": "saju_astro"})
-    if not hits:
-        hits = vs.search(query_embedding=vec, top_k=top_k, min_score=0.1)
-    return hits
+    results: List[List[Dict]] = []
+    with stage("query"):
+        for emb in embs:
+            vec = emb.tolist() if hasattr(emb, "tolist") else emb
+            hits = vs.search(query_embedding=vec, top_k=top_k, min_score=0.1, where={"domain": "saju_astro"})
+            if not hits:
+                hits = vs.search(query_embedding=vec, top_k=top_k, min_score=0.1)
+            results.append(hits)
+    return results
 
 
 def _build_cross_cards(grouped: List[Tuple[str, List[Dict]]]) -> List[Dict]:
@@ -393,33 +383,21 @@ def _fetch_destiny_matrix_summary(
 
 
 async def _collect_payload(saju_data: Dict, astro_data: Dict, user_name: str, locale: str) -> Dict:
-    from backend_ai.app.rag_manager import prefetch_all_rag_data_async
-    from backend_ai.app.rag.cross_store import build_cross_summary
+    from cross_summary_table import cross_summary
+    from prefetch_cache import cached_prefetch
 
     themes = ["life_path", "love", "career", "wealth", "health"]
     results_by_theme: Dict[str, Dict] = {}
     for theme in themes:
-        results_by_theme[theme] = await prefetch_all_rag_data_async(saju_data, astro_data, theme=theme, locale=locale)
+        results_by_theme[theme] = await cached_prefetch(saju_data, astro_data, theme=theme, locale=locale)
 
-    saju_seed, astro_seed = _extract_seeds(saju_data, astro_data)
     base_query = _build_query("life_path", saju_data, astro_data)
-    cross_text, grouped = build_cross_summary(
-        base_query,
-        saju_seed=saju_seed,
-        astro_seed=astro_seed,
-        saju_json=saju_data if isinstance(saju_data, dict) else {},
-        astro_json=astro_data if isinstance(astro_data, dict) else {},
-        top_k=12,
-        max_groups=3,
-        return_meta=True,
-    )
+    cross_text, grouped = cross_summary("life_path", saju_data, astro_data, top_k=12, max_groups=3, query=base_query)
     cross_cards = _build_cross_cards(grouped)
     advanced_highlights = _extract_advanced_highlights(grouped, limit=6)
 
-    graph_hits_by_theme: Dict[str, List[Dict]] = {}
-    for theme in themes:
-        query = _build_query(theme, saju_data, astro_data)
-        graph_hits_by_theme[theme] = _query_graph_evidence(query, top_k=10)
+    graph_queries = [_build_query(theme, saju_data, astro_data) for theme in themes]
+    graph_hits_by_theme: Dict[str, List[Dict]] = dict(zip(themes, _query_graph_evidence(graph_queries, top_k=10)))
 
     theme_scores: Dict[str, float] = {}
     for axis, items in grouped:
@@ -513,25 +491,28 @@ def main() -> int:
     args = parser.parse_args()
 
     _ensure_env()
-    saju_data = _load_json_arg(args.saju_file, args.saju_json, _default_saju())
-    astro_data = _load_json_arg(args.astro_file, args.astro_json, _default_astro())
-
-    from backend_ai.reporting.saju_astro_life_report import (
-        count_pdf_pages,
-        create_assets,
-        render_life_report_pdf,
-    )
+    with stage("load"):
+        saju_data = _load_json_arg(args.saju_file, args.saju_json, _default_saju())
+        astro_data = _load_json_arg(args.astro_file, args.astro_json, _default_astro())
+
+        from backend_ai.reporting.saju_astro_life_report import (
+            count_pdf_pages,
+            create_assets,
+            render_life_report_pdf,
+        )
 
-    payload = asyncio.run(_collect_payload(saju_data, astro_data, args.name, args.locale))
+    with stage("collect"):
+        payload = asyncio.run(_collect_payload(saju_data, astro_data, args.name, args.locale))
 
     out_pdf = Path(args.out)
-    out_pdf.parent.mkdir(parents=True, exist_ok=True)
-    payload_path = out_pdf.parent / "report_payload.json"
-    payload_path.write_text(json.dumps(payload, ensure_ascii=False, indent=2), encoding="utf-8")
+    with stage("write"):
+        out_pdf.parent.mkdir(parents=True, exist_ok=True)
+        payload_path = out_pdf.parent / "report_payload.json"
+        payload_path.write_text(json.dumps(payload, ensure_ascii=False, indent=2), encoding="utf-8")
 
-    assets_dir = out_pdf.parent / "life_report_assets"
-    assets = create_assets(payload, assets_dir)
-    render_life_report_pdf(payload, out_pdf, assets)
+        assets_dir = out_pdf.parent / "life_report_assets"
+        assets = create_assets(payload, assets_dir)
+        render_life_report_pdf(payload, out_pdf, assets)
 
     page_count = count_pdf_pages(out_pdf)
     image_count = len([p for p in assets_dir.glob("*.png") if p.is_file()])
@@ -549,5 +530,5 @@ def main() -> int:
 
 
 if __name__ == "__main__":
-    raise SystemExit(main())
+    raise SystemExit(run_profiled("generate_life_report_pdf", main, REPO_ROOT / "out"))
 
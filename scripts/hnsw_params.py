@@ -0,0 +1,64 @@
+"""
+Per-collection HNSW parameters recommended by scripts/hnsw_sweep.py.
+
+The sweep writes backend_ai/data/hnsw_params.json:
+  {"collections": {"<name>": {"M": 16, "construction_ef": 200, "search_ef": 40,
+                               "recall_at_k": 0.991, "k": 10, "p99_ms": 0.41, ...}}}
+
+The rebuild/reindex scripts call hnsw_metadata(name) when they create a
+collection and merge the result into its Chroma metadata. Collections that
+were never swept get {} and keep Chroma's defaults. Override the file with
+RAG_HNSW_PARAMS_PATH.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+DEFAULT_PARAMS_PATH = REPO_ROOT / "backend_ai" / "data" / "hnsw_params.json"
+PARAMS_PATH_ENV = "RAG_HNSW_PARAMS_PATH"
+
+# params file key -> Chroma collection metadata key
+METADATA_KEYS = {
+    "M": "hnsw:M",
+    "construction_ef": "hnsw:construction_ef",
+    "search_ef": "hnsw:search_ef",
+}
+
+
+def params_path(path: Optional[Path] = None) -> Path:
+    return Path(path or os.getenv(PARAMS_PATH_ENV) or DEFAULT_PARAMS_PATH)
+
+
+def load_params(path: Optional[Path] = None) -> Dict[str, Dict[str, Any]]:
+    target = params_path(path)
+    if not target.exists():
+        return {}
+    try:
+        data = json.loads(target.read_text(encoding="utf-8"))
+    except (OSError, ValueError) as exc:
+        print(f"[hnsw_params] ignoring unreadable {target}: {exc}")
+        return {}
+    return dict(data.get("collections") or {})
+
+
+def save_params(updates: Dict[str, Dict[str, Any]], path: Optional[Path] = None) -> Path:
+    """Merge per-collection entries into the params file (other collections are kept)."""
+    target = params_path(path)
+    collections = load_params(target)
+    collections.update(updates)
+    target.parent.mkdir(parents=True, exist_ok=True)
+    target.write_text(
+        json.dumps({"collections": dict(sorted(collections.items()))}, ensure_ascii=False, indent=2) + "\n",
+        encoding="utf-8",
+    )
+    return target
+
+
+def hnsw_metadata(collection_name: str, path: Optional[Path] = None) -> Dict[str, int]:
+    entry = load_params(path).get(collection_name) or {}
+    return {meta_key: int(entry[key]) for key, meta_key in METADATA_KEYS.items() if entry.get(key)}
@@ -0,0 +1,241 @@
+#!/usr/bin/env python
+"""
+HNSW parameter sweep per collection: recall@k vs exact search and latency.
+
+For each collection it loads the stored vectors (chroma_snapshot artifact if
+present, else straight from the Chroma persist dir), holds out --queries of
+them as queries, and builds hnswlib indexes (the library Chroma uses) over
+the rest for every M x ef_construction pair. Every ef_search value is then
+measured on each index:
+- recall@k against exact brute-force top-k (cosine / l2 / ip, per the
+  collection's hnsw:space)
+- p50/p99 single-query latency (one thread, like a request handler)
+- build_sec and an approximate index size
+
+Recommendation per collection: among configs reaching --target-recall, the
+lowest p99 (ties: smaller M, then faster build); if none reaches it, the
+highest recall. Chroma's defaults (M=16, construction_ef=100, search_ef=10)
+are always measured too for comparison. Recommendations are merged into
+backend_ai/data/hnsw_params.json (see hnsw_params.py), which
+tarot_rebuild_chroma and the Saju+Astro reindexers apply the next time they
+create the collection. The full grid goes to .cache/hnsw-sweep/.
+
+Usage:
+  python scripts/hnsw_sweep.py
+  python scripts/hnsw_sweep.py --collections domain_tarot --target-recall 0.99
+  python scripts/hnsw_sweep.py --M 8,16,32 --ef-search 10,20,40,80 --dry-run
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import random
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from chroma_snapshot import DEFAULT_COLLECTIONS, DEFAULT_PERSIST_DIR, DEFAULT_SNAPSHOT_DIR, load_collection_vectors
+from hnsw_params import params_path, save_params
+from pipeline_profiling import run_profiled, stage
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+SWEEP_DIR = REPO_ROOT / ".cache" / "hnsw-sweep"
+CHROMA_DEFAULTS = {"M": 16, "construction_ef": 100, "search_ef": 10}
+
+
+def _int_list(value: str) -> List[int]:
+    return sorted({int(v) for v in value.split(",") if v.strip()})
+
+
+def _load_vectors(name: str, args) -> Tuple[np.ndarray, str]:
+    """Return (float32 [n, dim], hnsw space) for a collection."""
+    _ids, vectors, metadata = load_collection_vectors(name, Path(args.persist_dir), Path(args.snapshot_dir))
+    return vectors, metadata.get("hnsw:space", "l2")
+
+
+def exact_topk(data: np.ndarray, queries: np.ndarray, k: int, space: str, chunk: int = 256) -> np.ndarray:
+    """Brute-force top-k labels (row indices into data) for each query."""
+    if space == "cosine":
+        data = data / np.clip(np.linalg.norm(data, axis=1, keepdims=True), 1e-12, None)
+        queries = queries / np.clip(np.linalg.norm(queries, axis=1, keepdims=True), 1e-12, None)
+    k = min(k, data.shape[0])
+    sq_norms = (data * data).sum(axis=1) if space == "l2" else None
+    out = np.empty((queries.shape[0], k), dtype=np.int64)
+    for start in range(0, queries.shape[0], chunk):
+        q = queries[start:start + chunk]
+        scores = q @ data.T
+        if sq_norms is not None:
+            scores = 2 * scores - sq_norms  # -(||q-d||^2) up to a per-query constant
+        idx = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+        order = np.take_along_axis(scores, idx, axis=1).argsort(axis=1)[:, ::-1]
+        out[start:start + len(q)] = np.take_along_axis(idx, order, axis=1)
+    return out
+
+
+def recall_at_k(found: np.ndarray, truth: np.ndarray) -> float:
+    k = truth.shape[1]
+    return float(np.mean([len(set(a) & set(b)) / k for a, b in zip(found.tolist(), truth.tolist())]))
+
+
+def _measure(index, queries: np.ndarray, truth: np.ndarray, ef_search: int) -> Dict[str, float]:
+    index.set_ef(max(ef_search, truth.shape[1]))
+    found = np.empty_like(truth)
+    latencies: List[float] = []
+    for i, q in enumerate(queries):
+        started = time.perf_counter()
+        labels, _ = index.knn_query(q, k=truth.shape[1], num_threads=1)
+        latencies.append((time.perf_counter() - started) * 1000)
+        found[i] = labels[0]
+    return {
+        "recall_at_k": round(recall_at_k(found, truth), 4),
+        "p50_ms": round(float(np.percentile(latencies, 50)), 4),
+        "p99_ms": round(float(np.percentile(latencies, 99)), 4),
+    }
+
+
+def sweep_collection(
+    data: np.ndarray,
+    queries: np.ndarray,
+    space: str,
+    k: int,
+    ms: Sequence[int],
+    ef_constructions: Sequence[int],
+    ef_searches: Sequence[int],
+    threads: int,
+) -> List[Dict]:
+    import hnswlib  # pylint: disable=import-outside-toplevel
+
+    truth = exact_topk(data, queries, k, space)
+    grid = {(m, efc) for m in ms for efc in ef_constructions}
+    grid.add((CHROMA_DEFAULTS["M"], CHROMA_DEFAULTS["construction_ef"]))
+    rows: List[Dict] = []
+    for m, efc in sorted(grid):
+        index = hnswlib.Index(space=space, dim=data.shape[1])
+        index.init_index(max_elements=data.shape[0], ef_construction=efc, M=m)
+        index.set_num_threads(threads)
+        started = time.perf_counter()
+        index.add_items(data, np.arange(data.shape[0]))
+        build_sec = time.perf_counter() - started
+        # vectors + level-0 links (2M) + upper layers (~M/ln(M) per node, small)
+        index_mb = data.shape[0] * (data.shape[1] * 4 + 2 * m * 4 + 16) / (1024 * 1024)
+        efs_values = set(ef_searches)
+        if (m, efc) == (CHROMA_DEFAULTS["M"], CHROMA_DEFAULTS["construction_ef"]):
+            efs_values.add(CHROMA_DEFAULTS["search_ef"])
+        for efs in sorted(efs_values):
+            row = {
+                "M": m,
+                "construction_ef": efc,
+                "search_ef": efs,
+                "build_sec": round(build_sec, 3),
+                "index_mb": round(index_mb, 1),
+            }
+            row.update(_measure(index, queries, truth, efs))
+            rows.append(row)
+            print(
+                f"[hnsw_sweep]   M={m} efc={efc} efs={efs} recall@{k}={row['recall_at_k']:.4f} "
+                f"p50={row['p50_ms']:.3f}ms p99={row['p99_ms']:.3f}ms build={build_sec:.1f}s"
+            )
+    return rows
+
+
+def recommend(rows: List[Dict], target_recall: float) -> Dict:
+    passing = [r for r in rows if r["recall_at_k"] >= target_recall]
+    if passing:
+        return min(passing, key=lambda r: (r["p99_ms"], r["M"], r["build_sec"]))
+    return max(rows, key=lambda r: (r["recall_at_k"], -r["p99_ms"]))
+
+
+def _default_row(rows: List[Dict]) -> Optional[Dict]:
+    for r in rows:
+        if all(r[key] == value for key, value in CHROMA_DEFAULTS.items()):
+            return r
+    return None
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Sweep HNSW parameters per Chroma collection.")
+    parser.add_argument("--collections", default=",".join(DEFAULT_COLLECTIONS))
+    parser.add_argument("--persist-dir", default=str(DEFAULT_PERSIST_DIR))
+    parser.add_argument("--snapshot-dir", default=str(DEFAULT_SNAPSHOT_DIR), help="Prefer chroma_snapshot vectors when present.")
+    parser.add_argument("--M", dest="ms", type=_int_list, default=_int_list("8,16,32,48"))
+    parser.add_argument("--ef-construction", type=_int_list, default=_int_list("64,100,200,400"))
+    parser.add_argument("--ef-search", type=_int_list, default=_int_list("10,20,40,80,160"))
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--queries", type=int, default=500, help="Held-out vectors used as queries.")
+    parser.add_argument("--target-recall", type=float, default=0.98)
+    parser.add_argument("--threads", type=int, default=4, help="hnswlib build threads.")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--params-path", type=Path, default=None, help="Default: $RAG_HNSW_PARAMS_PATH or backend_ai/data/hnsw_params.json")
+    parser.add_argument("--dry-run", action="store_true", help="Report only; do not update the params file.")
+    return parser.parse_args()
+
+
+def main() -> int:
+    args = parse_args()
+    report: Dict[str, Dict] = {}
+    recommended: Dict[str, Dict] = {}
+    for name in [c.strip() for c in args.collections.split(",") if c.strip()]:
+        with stage("load"):
+            try:
+                vectors, space = _load_vectors(name, args)
+            except Exception as exc:
+                print(f"[hnsw_sweep] {name}: skipped ({exc})")
+                continue
+        if vectors.shape[0] < 2 * args.k:
+            print(f"[hnsw_sweep] {name}: skipped (only {vectors.shape[0]} vectors)")
+            continue
+        n_queries = min(args.queries, vectors.shape[0] // 5)
+        held_out = set(random.Random(args.seed).sample(range(vectors.shape[0]), n_queries))
+        mask = np.array([i not in held_out for i in range(vectors.shape[0])])
+        data, queries = np.ascontiguousarray(vectors[mask]), np.ascontiguousarray(vectors[~mask])
+        print(f"[hnsw_sweep] {name}: vectors={data.shape[0]} dim={data.shape[1]} space={space} queries={len(queries)}")
+
+        with stage("query"):
+            rows = sweep_collection(
+                data, queries, space, args.k, args.ms, args.ef_construction, args.ef_search, args.threads
+            )
+        best = recommend(rows, args.target_recall)
+        baseline = _default_row(rows)
+        report[name] = {"vectors": int(data.shape[0]), "dim": int(data.shape[1]), "space": space, "rows": rows}
+        recommended[name] = {
+            **{key: best[key] for key in ("M", "construction_ef", "search_ef")},
+            "k": args.k,
+            "recall_at_k": best["recall_at_k"],
+            "p50_ms": best["p50_ms"],
+            "p99_ms": best["p99_ms"],
+            "target_recall": args.target_recall,
+            "vectors": int(data.shape[0]),
+            "swept_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        }
+        baseline_note = (
+            f" (chroma default recall={baseline['recall_at_k']:.4f} p99={baseline['p99_ms']:.3f}ms)" if baseline else ""
+        )
+        print(
+            f"[hnsw_sweep] {name}: recommend M={best['M']} construction_ef={best['construction_ef']} "
+            f"search_ef={best['search_ef']} recall@{args.k}={best['recall_at_k']:.4f} p99={best['p99_ms']:.3f}ms"
+            + baseline_note
+        )
+
+    if not report:
+        print("[hnsw_sweep] nothing swept")
+        return 1
+    with stage("write"):
+        SWEEP_DIR.mkdir(parents=True, exist_ok=True)
+        output = SWEEP_DIR / f"sweep_{time.strftime('%Y%m%d_%H%M%S')}.json"
+        output.write_text(
+            json.dumps({"k": args.k, "target_recall": args.target_recall, "collections": report, "recommended": recommended}, indent=2),
+            encoding="utf-8",
+        )
+        print(f"[hnsw_sweep] wrote: {output}")
+        if args.dry_run:
+            print(f"[hnsw_sweep] dry run: {params_path(args.params_path)} not updated")
+        else:
+            print(f"[hnsw_sweep] wrote: {save_params(recommended, args.params_path)}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(run_profiled("hnsw_sweep", main))
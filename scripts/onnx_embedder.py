@@ -0,0 +1,226 @@
+"""
+ONNX Runtime embedder with dynamic int8 quantization (CPU inference).
+
+Supported model keys mirror backend_ai model_manager: minilm, e5-large, bge-m3.
+On first use the HuggingFace model is exported to ONNX with torch, quantized
+with onnxruntime.quantization.quantize_dynamic (int8 weights), and cached with
+its tokenizer under .cache/onnx-embedders/<key>/ (override with
+RAG_ONNX_CACHE_DIR). Later runs only need onnxruntime + transformers'
+tokenizer: no torch import at inference time.
+
+Pooling and e5 query/passage prefixes follow model_manager so vectors stay
+comparable with collections built by the PyTorch path; check agreement with
+scripts/bench_onnx_embedder.py before mixing backends on one collection.
+
+Env:
+- RAG_ONNX_CACHE_DIR   export cache root
+- RAG_ONNX_PRECISION   int8 (default) or fp32 (exported graph, no quantization)
+- RAG_ONNX_THREADS     intra-op threads (default: onnxruntime picks)
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Union
+
+import numpy as np
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+DEFAULT_CACHE_DIR = REPO_ROOT / ".cache" / "onnx-embedders"
+CACHE_DIR_ENV = "RAG_ONNX_CACHE_DIR"
+PRECISION_ENV = "RAG_ONNX_PRECISION"
+THREADS_ENV = "RAG_ONNX_THREADS"
+PRECISIONS = ("int8", "fp32")
+OPSET = 14
+
+
+@dataclass(frozen=True)
+class OnnxModelSpec:
+    hf_name: str
+    dim: int
+    pooling: str  # "mean" | "cls"
+    max_length: int = 512
+    query_prefix: str = ""
+    passage_prefix: str = ""
+
+
+ONNX_MODEL_SPECS: Dict[str, OnnxModelSpec] = {
+    "minilm": OnnxModelSpec(
+        hf_name="sentence-transformers/paraphrase-multilingual-MiniLM-L12-v2",
+        dim=384,
+        pooling="mean",
+        max_length=128,
+    ),
+    "e5-large": OnnxModelSpec(
+        hf_name="intfloat/multilingual-e5-large",
+        dim=1024,
+        pooling="mean",
+        query_prefix="query: ",
+        passage_prefix="passage: ",
+    ),
+    "bge-m3": OnnxModelSpec(
+        hf_name="BAAI/bge-m3",
+        dim=1024,
+        pooling="cls",
+    ),
+}
+
+
+def resolve_model_key(model_id: Optional[str]) -> str:
+    key = (model_id or os.getenv("RAG_EMBEDDING_MODEL") or "minilm").strip().lower()
+    if key not in ONNX_MODEL_SPECS:
+        raise ValueError(
+            f"ONNX backend supports model keys {', '.join(ONNX_MODEL_SPECS)}; got {model_id!r}"
+        )
+    return key
+
+
+def cache_dir_for(model_key: str) -> Path:
+    return Path(os.getenv(CACHE_DIR_ENV) or DEFAULT_CACHE_DIR) / model_key
+
+
+def _export(spec: OnnxModelSpec, out_dir: Path) -> Path:
+    import torch  # pylint: disable=import-outside-toplevel
+    from transformers import AutoModel, AutoTokenizer  # pylint: disable=import-outside-toplevel
+
+    class _LastHidden(torch.nn.Module):
+        def __init__(self, model):
+            super().__init__()
+            self.model = model
+
+        def forward(self, input_ids, attention_mask, token_type_ids=None):
+            kwargs = {"input_ids": input_ids, "attention_mask": attention_mask}
+            if token_type_ids is not None:
+                kwargs["token_type_ids"] = token_type_ids
+            return self.model(**kwargs).last_hidden_state
+
+    out_dir.mkdir(parents=True, exist_ok=True)
+    tokenizer = AutoTokenizer.from_pretrained(spec.hf_name)
+    tokenizer.save_pretrained(str(out_dir))
+    model = _LastHidden(AutoModel.from_pretrained(spec.hf_name)).eval()
+
+    sample = tokenizer(["export sample sentence", "두 번째 예시 문장"], padding=True, return_tensors="pt")
+    input_names = [n for n in ("input_ids", "attention_mask", "token_type_ids") if n in sample]
+    dynamic_axes = {name: {0: "batch", 1: "seq"} for name in input_names}
+    dynamic_axes["last_hidden_state"] = {0: "batch", 1: "seq"}
+
+    fp32_path = out_dir / "model.fp32.onnx"
+    with torch.no_grad():
+        torch.onnx.export(
+            model,
+            tuple(sample[name] for name in input_names),
+            str(fp32_path),
+            input_names=input_names,
+            output_names=["last_hidden_state"],
+            dynamic_axes=dynamic_axes,
+            opset_version=OPSET,
+            do_constant_folding=True,
+        )
+    return fp32_path
+
+
+def _quantize(fp32_path: Path, int8_path: Path) -> None:
+    from onnxruntime.quantization import QuantType, quantize_dynamic  # pylint: disable=import-outside-toplevel
+
+    quantize_dynamic(str(fp32_path), str(int8_path), weight_type=QuantType.QInt8)
+
+
+def ensure_exported(model_key: str, precision: str = "int8") -> Path:
+    """Return the cached ONNX graph for model_key, exporting/quantizing if missing."""
+    spec = ONNX_MODEL_SPECS[model_key]
+    out_dir = cache_dir_for(model_key)
+    manifest_path = out_dir / "export.json"
+    fp32_path = out_dir / "model.fp32.onnx"
+    int8_path = out_dir / "model.int8.onnx"
+
+    manifest: Dict[str, Any] = {}
+    if manifest_path.exists():
+        manifest = json.loads(manifest_path.read_text(encoding="utf-8"))
+    if manifest.get("hf_name") != spec.hf_name or not fp32_path.exists():
+        started = time.perf_counter()
+        print(f"[onnx] exporting {spec.hf_name} -> {out_dir}")
+        _export(spec, out_dir)
+        int8_path.unlink(missing_ok=True)
+        manifest = {"hf_name": spec.hf_name, "opset": OPSET, "export_sec": round(time.perf_counter() - started, 1)}
+    if precision == "int8" and not int8_path.exists():
+        started = time.perf_counter()
+        print(f"[onnx] quantizing {model_key} (dynamic int8)")
+        _quantize(fp32_path, int8_path)
+        manifest["quantize_sec"] = round(time.perf_counter() - started, 1)
+    manifest_path.write_text(json.dumps(manifest, indent=2), encoding="utf-8")
+    return int8_path if precision == "int8" else fp32_path
+
+
+def _pool(hidden: np.ndarray, attention_mask: np.ndarray, pooling: str) -> np.ndarray:
+    if pooling == "cls":
+        return hidden[:, 0]
+    mask = attention_mask[..., None].astype(np.float32)
+    return (hidden * mask).sum(axis=1) / np.clip(mask.sum(axis=1), 1e-9, None)
+
+
+class OnnxEmbedder:
+    """SentenceTransformer.encode-compatible embedder backed by onnxruntime."""
+
+    def __init__(self, model_id: Optional[str] = None, precision: Optional[str] = None, threads: Optional[int] = None):
+        import onnxruntime as ort  # pylint: disable=import-outside-toplevel
+        from transformers import AutoTokenizer  # pylint: disable=import-outside-toplevel
+
+        self.model_key = resolve_model_key(model_id)
+        self.spec = ONNX_MODEL_SPECS[self.model_key]
+        self.precision = (precision or os.getenv(PRECISION_ENV) or "int8").lower()
+        if self.precision not in PRECISIONS:
+            raise ValueError(f"Unknown ONNX precision {self.precision!r} (expected one of {', '.join(PRECISIONS)})")
+        self.dim = self.spec.dim
+        self.max_seq_length = self.spec.max_length
+        self.model_id = self.model_key
+
+        model_path = ensure_exported(self.model_key, self.precision)
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        threads = threads if threads is not None else int(os.getenv(THREADS_ENV) or 0)
+        if threads:
+            options.intra_op_num_threads = threads
+        self.session = ort.InferenceSession(str(model_path), options, providers=["CPUExecutionProvider"])
+        self.input_names = [i.name for i in self.session.get_inputs()]
+        self.tokenizer = AutoTokenizer.from_pretrained(str(model_path.parent))
+
+    def get_sentence_embedding_dimension(self) -> int:
+        return self.dim
+
+    def _run(self, texts: List[str]) -> np.ndarray:
+        enc = self.tokenizer(
+            texts,
+            padding=True,
+            truncation=True,
+            max_length=self.spec.max_length,
+            return_tensors="np",
+        )
+        feeds = {name: enc[name].astype(np.int64) for name in self.input_names if name in enc}
+        hidden = self.session.run(None, feeds)[0]
+        return _pool(hidden, enc["attention_mask"], self.spec.pooling)
+
+    def encode(
+        self,
+        sentences: Union[str, Sequence[str]],
+        batch_size: int = 32,
+        convert_to_tensor: bool = False,
+        normalize_embeddings: bool = True,
+        show_progress_bar: bool = False,
+        is_query: bool = False,
+        **_kwargs: Any,
+    ) -> np.ndarray:
+        single = isinstance(sentences, str)
+        prefix = self.spec.query_prefix if is_query else self.spec.passage_prefix
+        texts = [prefix + (t or "") for t in ([sentences] if single else sentences)]
+        out = np.empty((len(texts), self.dim), dtype=np.float32)
+        step = max(1, batch_size)
+        for start in range(0, len(texts), step):
+            batch = texts[start:start + step]
+            out[start:start + len(batch)] = self._run(batch)
+        if normalize_embeddings and len(texts):
+            out /= np.clip(np.linalg.norm(out, axis=1, keepdims=True), 1e-12, None)
+        return out[0] if single else out
@@ -0,0 +1,223 @@
+"""
+Shared --profile instrumentation for the pipeline scripts.
+
+Every pipeline script's entry point goes through run_profiled(), which
+understands these flags (stripped before the script's own argparse runs):
+
+  --profile               write <name>.timing.json next to the script's artifacts
+  --profile-cprofile      also capture cProfile (<name>.pstats + top functions in the JSON)
+  --profile-tracemalloc   also capture tracemalloc peak and top allocation sites
+  --profile-output PATH   explicit timing JSON path
+
+Code marks work with `with stage("embed"):`; it is a no-op unless a profile
+is active. Canonical stage names: load, parse, embed, write, query (others
+are allowed). Stages accumulate across calls and threads; nested stages are
+counted in both, and wall time not covered by any stage is reported as
+unaccounted_sec. Child processes are not included.
+
+Modules with their own counters (caches) register them with
+add_counters(name, fn); fn() is called when the profile stops and its dict
+lands under "counters" in the JSON.
+
+Since the flags never reach the script's parser, run_profiled() prints them
+after the script's own -h/--help output.
+
+Scripts not wrapped, on purpose:
+  tarot_pipeline.py            runs every step as a subprocess, which a profile does not follow
+  tarot_e2e_smoke.py           has its own cProfile/tracemalloc reporting
+  bench_reindex_saju_astro.py, bench_onnx_embedder.py, bench-city-names-normalize.py
+                               timing harnesses themselves
+  gen_synthetic_graph_root.py  writes a benchmark fixture; nothing to time
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import contextlib
+import cProfile
+import json
+import math
+import pstats
+import sys
+import threading
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+DEFAULT_PROFILE_DIR = PROJECT_ROOT / "artifacts"
+STAGES = ("load", "parse", "embed", "write", "query")
+TOP_N = 25
+PROFILE_HELP = """
+profiling (handled by pipeline_profiling, any script):
+  --profile               write <name>.timing.json under artifacts/
+  --profile-cprofile      also capture cProfile (<name>.pstats + top functions)
+  --profile-tracemalloc   also capture tracemalloc peak and top allocation sites
+  --profile-output PATH   explicit timing JSON path"""
+
+_ACTIVE: Optional["Profile"] = None
+_COUNTERS: Dict[str, Callable[[], Dict[str, Any]]] = {}
+
+
+def peak_rss_mb() -> float:
+    try:
+        import resource  # pylint: disable=import-outside-toplevel
+    except ImportError:  # Windows
+        return float("nan")
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports KiB, macOS bytes.
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def percentile(values: Sequence[float], pct: float) -> float:
+    """Nearest-rank percentile (pct in 0-100); 0 for no values."""
+    if not values:
+        return 0
+    ordered = sorted(values)
+    return ordered[max(1, math.ceil(pct / 100.0 * len(ordered))) - 1]
+
+
+class Profile:
+    def __init__(self, name: str, cprofile: bool = False, trace_malloc: bool = False):
+        self.name = name
+        self.stages: Dict[str, Dict[str, float]] = {}
+        self._lock = threading.Lock()
+        self._cprofile = cProfile.Profile() if cprofile else None
+        self._trace_malloc = trace_malloc
+        self._started = 0.0
+        self._started_at = ""
+
+    def start(self) -> None:
+        self._started_at = time.strftime("%Y-%m-%dT%H:%M:%S")
+        if self._trace_malloc:
+            tracemalloc.start(25)
+        if self._cprofile:
+            self._cprofile.enable()
+        self._started = time.perf_counter()
+
+    @contextlib.contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - started
+            with self._lock:
+                entry = self.stages.setdefault(name, {"sec": 0.0, "calls": 0})
+                entry["sec"] += elapsed
+                entry["calls"] += 1
+
+    def stop(self, output: Path, exit_code: Any) -> Dict[str, Any]:
+        wall = time.perf_counter() - self._started
+        if self._cprofile:
+            self._cprofile.disable()
+        report: Dict[str, Any] = {
+            "script": self.name,
+            "argv": sys.argv[1:],
+            "started_at": self._started_at,
+            "exit_code": exit_code,
+            "wall_sec": round(wall, 4),
+            "stages": {k: {"sec": round(v["sec"], 4), "calls": int(v["calls"])} for k, v in self.stages.items()},
+            "unaccounted_sec": round(max(0.0, wall - sum(v["sec"] for v in self.stages.values())), 4),
+            "peak_rss_mb": round(peak_rss_mb(), 1),
+        }
+        if _COUNTERS:
+            report["counters"] = {name: fn() for name, fn in _COUNTERS.items()}
+        if self._trace_malloc:
+            _current, peak = tracemalloc.get_traced_memory()
+            top = tracemalloc.take_snapshot().statistics("lineno")[:TOP_N]
+            tracemalloc.stop()
+            report["tracemalloc"] = {
+                "peak_mb": round(peak / (1024 * 1024), 2),
+                "top": [{"site": str(s.traceback), "size_kb": round(s.size / 1024, 1), "count": s.count} for s in top],
+            }
+        output.parent.mkdir(parents=True, exist_ok=True)
+        if self._cprofile:
+            pstats_path = output.with_suffix(".pstats")
+            self._cprofile.dump_stats(str(pstats_path))
+            report["cprofile"] = {"pstats": str(pstats_path), "top_cumulative": _top_functions(self._cprofile)}
+        output.write_text(json.dumps(report, ensure_ascii=False, indent=2), encoding="utf-8")
+        return report
+
+
+def _top_functions(profiler: cProfile.Profile) -> List[Dict[str, Any]]:
+    stats = pstats.Stats(profiler)
+    rows = sorted(stats.stats.items(), key=lambda item: item[1][3], reverse=True)[:TOP_N]
+    return [
+        {
+            "function": f"{filename}:{line}({func})",
+            "calls": nc,
+            "tottime": round(tt, 4),
+            "cumtime": round(ct, 4),
+        }
+        for (filename, line, func), (_cc, nc, tt, ct, _callers) in rows
+    ]
+
+
+def stage(name: str):
+    """Time a block under the active profile (no-op when profiling is off)."""
+    if _ACTIVE is None:
+        return contextlib.nullcontext()
+    return _ACTIVE.stage(name)
+
+
+def add_counters(name: str, fn: Callable[[], Dict[str, Any]]) -> None:
+    """Report fn() under counters[name] in every profile written by this process."""
+    _COUNTERS[name] = fn
+
+
+def add_profile_args(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument("--profile", action="store_true")
+    parser.add_argument("--profile-cprofile", action="store_true")
+    parser.add_argument("--profile-tracemalloc", action="store_true")
+    parser.add_argument("--profile-output", type=Path, default=None)
+
+
+def _call(main: Callable[[], Any]) -> Any:
+    result = main()
+    if asyncio.iscoroutine(result):
+        result = asyncio.run(result)
+    return result
+
+
+def run_profiled(name: str, main: Callable[[], Any], output_dir: Path | str = DEFAULT_PROFILE_DIR) -> Any:
+    """Run a script's main() with optional profiling; returns main()'s result."""
+    global _ACTIVE  # pylint: disable=global-statement
+
+    pre = argparse.ArgumentParser(add_help=False)
+    add_profile_args(pre)
+    opts, rest = pre.parse_known_args(sys.argv[1:])
+    sys.argv[1:] = rest
+    if "-h" in rest or "--help" in rest:
+        try:
+            return _call(main)
+        finally:
+            print(PROFILE_HELP)
+    enabled = opts.profile or opts.profile_cprofile or opts.profile_tracemalloc or opts.profile_output
+    if not enabled:
+        return _call(main)
+
+    output = opts.profile_output or Path(output_dir) / f"{name}.timing.json"
+    profile = Profile(name, cprofile=opts.profile_cprofile, trace_malloc=opts.profile_tracemalloc)
+    _ACTIVE = profile
+    exit_code: Any = None
+    profile.start()
+    try:
+        exit_code = _call(main)
+        return exit_code
+    except SystemExit as exc:
+        exit_code = exc.code
+        raise
+    except BaseException:
+        exit_code = "exception"
+        raise
+    finally:
+        _ACTIVE = None
+        report = profile.stop(Path(output), exit_code)
+        summary = " ".join(f"{k}={v['sec']:.2f}s" for k, v in report["stages"].items())
+        print(f"[profile] {name} wall={report['wall_sec']:.2f}s {summary} peak_rss={report['peak_rss_mb']:.0f}MB")
+        for counter, values in report.get("counters", {}).items():
+            print(f"[profile] {counter} " + " ".join(f"{k}={v}" for k, v in values.items()))
+        print(f"[profile] wrote: {output}")
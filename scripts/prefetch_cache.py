@@ -0,0 +1,313 @@
+"""
+Two-tier cache for prefetch_all_rag_data_async results.
+
+The life report prefetches five themes per chart and users regenerate
+reports for the same chart, so identical (chart, theme, locale) calls
+repeat. Regression gates (audit_cross_advanced, the leak check, e2e smoke)
+call the backend directly. cached_prefetch() wraps the backend call:
+
+- key: sha256 of the canonical chart fingerprint (saju/astro JSON with keys
+  sorted, empty values and request-volatile fields dropped, floats rounded)
+  plus theme, locale and the env flags that change routing
+- tier 1: in-process LRU (RAG_PREFETCH_CACHE_SIZE entries, default 256)
+- tier 2: SQLite at .cache/prefetch_cache.sqlite (RAG_PREFETCH_CACHE_PATH),
+  zlib-compressed JSON, shared by every script on the machine
+- entries expire after RAG_PREFETCH_CACHE_TTL_SEC (default 7 days) and are
+  invalidated when a collection prefetch reads (PREFETCH_COLLECTIONS)
+  changes: the version token hashes each one's Chroma id, record count and
+  highest write seq_id, read from chroma.sqlite3. Writes to other
+  collections (e.g. a tarot rebuild) leave the cache alone; the token is
+  only re-read when chroma.sqlite3 or its WAL changed
+- RAG_PREFETCH_CACHE=0 bypasses both tiers
+
+Hit/miss counts and latencies accumulate in the SQLite stats table at exit;
+self_check.py prints them via cache_stats().
+"""
+
+from __future__ import annotations
+
+import atexit
+import copy
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+DEFAULT_CACHE_PATH = REPO_ROOT / ".cache" / "prefetch_cache.sqlite"
+DEFAULT_PERSIST_DIR = REPO_ROOT / "backend_ai" / "data" / "chromadb"
+DEFAULT_MAX_ENTRIES = 256
+DEFAULT_TTL_SEC = 7 * 24 * 3600
+KEY_SCHEMA = 1
+
+# Fields that identify a request rather than a chart.
+VOLATILE_KEYS = {"generatedAt", "timestamp", "createdAt", "updatedAt", "requestId", "userId", "userName", "sessionId"}
+# Env flags read by the prefetch routing.
+ROUTING_ENV = ("USE_CHROMADB", "EXCLUDE_NON_SAJU_ASTRO", "CROSS_ADVANCED")
+# Collections prefetch_all_rag_data_async reads (graph, cross and the
+# non-Saju/Astro domains it includes unless EXCLUDE_NON_SAJU_ASTRO=1).
+PREFETCH_COLLECTIONS = (
+    "saju_astro_graph_nodes_v1",
+    "saju_astro_cross_v1",
+    "domain_dream",
+    "domain_persona",
+    "domain_destiny_map",
+    "graph_nodes",
+    "corpus_nodes",
+)
+STAT_NAMES = ("memory_hits", "disk_hits", "misses", "expired", "hit_ms", "miss_ms")
+
+
+def _normalize(value: Any) -> Any:
+    if isinstance(value, dict):
+        out = {}
+        for key in sorted(value, key=str):
+            if key in VOLATILE_KEYS:
+                continue
+            item = _normalize(value[key])
+            if item not in (None, "", [], {}):
+                out[str(key)] = item
+        return out
+    if isinstance(value, (list, tuple)):
+        return [_normalize(v) for v in value]
+    if isinstance(value, float):
+        return round(value, 4)
+    if isinstance(value, str):
+        return value.strip()
+    return value
+
+
+def chart_fingerprint(saju_data: Dict[str, Any], astro_data: Dict[str, Any], theme: str, locale: str) -> str:
+    canonical = {
+        "v": KEY_SCHEMA,
+        "saju": _normalize(saju_data or {}),
+        "astro": _normalize(astro_data or {}),
+        "theme": theme,
+        "locale": locale,
+        "env": {name: os.getenv(name, "") for name in ROUTING_ENV},
+    }
+    blob = json.dumps(canonical, ensure_ascii=False, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(blob.encode("utf-8")).hexdigest()
+
+
+_VERSION_MEMO: Dict[str, tuple] = {}
+
+
+def _file_token(persist_dir: Path) -> str:
+    parts = []
+    for name in ("chroma.sqlite3", "chroma.sqlite3-wal"):
+        try:
+            st = (Path(persist_dir) / name).stat()
+        except OSError:
+            continue
+        parts.append(f"{st.st_size}:{st.st_mtime_ns}")
+    return "/".join(parts) or "missing"
+
+
+def _collections_token(persist_dir: Path, collections) -> str:
+    names = sorted(collections)
+    conn = sqlite3.connect(f"file:{Path(persist_dir) / 'chroma.sqlite3'}?mode=ro", uri=True)
+    try:
+        rows = conn.execute(
+            "SELECT c.name, c.id, COUNT(e.id), MAX(e.seq_id) FROM collections c "
+            "LEFT JOIN segments s ON s.collection = c.id "
+            "LEFT JOIN embeddings e ON e.segment_id = s.id "
+            f"WHERE c.name IN ({','.join('?' * len(names))}) GROUP BY c.id ORDER BY c.name",
+            names,
+        ).fetchall()
+    finally:
+        conn.close()
+    blob = json.dumps([[str(v) for v in row] for row in rows])
+    return hashlib.sha256(blob.encode("utf-8")).hexdigest()[:32]
+
+
+def collection_version(persist_dir: Path = DEFAULT_PERSIST_DIR, collections=PREFETCH_COLLECTIONS) -> str:
+    """Version token of the collections prefetch reads; falls back to the whole sqlite file."""
+    file_token = _file_token(persist_dir)
+    memo_key = f"{persist_dir}|{','.join(collections)}"
+    memo = _VERSION_MEMO.get(memo_key)
+    if memo is not None and memo[0] == file_token:
+        return memo[1]
+    if file_token == "missing":
+        return file_token
+    try:
+        version = _collections_token(persist_dir, collections)
+    except sqlite3.Error:
+        version = f"file:{file_token}"  # unknown Chroma schema: any write invalidates
+    _VERSION_MEMO[memo_key] = (file_token, version)
+    return version
+
+
+class PrefetchCache:
+    def __init__(
+        self,
+        path: Path = DEFAULT_CACHE_PATH,
+        max_entries: int = DEFAULT_MAX_ENTRIES,
+        ttl_sec: float = DEFAULT_TTL_SEC,
+        persist_dir: Path = DEFAULT_PERSIST_DIR,
+    ):
+        self.path = Path(path)
+        self.max_entries = max_entries
+        self.ttl_sec = ttl_sec
+        self.persist_dir = Path(persist_dir)
+        self.stats: Dict[str, float] = {name: 0 for name in STAT_NAMES}
+        self._memory: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+
+    def _db(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(str(self.path), check_same_thread=False, timeout=10)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS entries (key TEXT PRIMARY KEY, version TEXT NOT NULL, "
+                "created_at REAL NOT NULL, payload BLOB NOT NULL) WITHOUT ROWID"
+            )
+            conn.execute("CREATE TABLE IF NOT EXISTS stats (name TEXT PRIMARY KEY, value REAL NOT NULL)")
+            self._conn = conn
+        return self._conn
+
+    def _fresh(self, version: str, created_at: float, current: str) -> bool:
+        return version == current and time.time() - created_at < self.ttl_sec
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        current = collection_version(self.persist_dir)
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                if self._fresh(entry[0], entry[1], current):
+                    self._memory.move_to_end(key)
+                    self.stats["memory_hits"] += 1
+                    return copy.deepcopy(entry[2])
+                del self._memory[key]
+            try:
+                row = self._db().execute("SELECT version, created_at, payload FROM entries WHERE key = ?", (key,)).fetchone()
+            except sqlite3.Error as exc:
+                print(f"[prefetch_cache] disk tier unavailable: {exc}")
+                row = None
+            if row is None:
+                return None
+            if not self._fresh(row[0], row[1], current):
+                self._db().execute("DELETE FROM entries WHERE key = ?", (key,))
+                self._db().commit()
+                self.stats["expired"] += 1
+                return None
+            value = json.loads(zlib.decompress(row[2]).decode("utf-8"))
+            self._remember(key, (row[0], row[1], value))
+            self.stats["disk_hits"] += 1
+            return copy.deepcopy(value)
+
+    def put(self, key: str, value: Dict[str, Any]) -> None:
+        entry = (collection_version(self.persist_dir), time.time(), copy.deepcopy(value))
+        with self._lock:
+            self._remember(key, entry)
+            try:
+                payload = zlib.compress(json.dumps(value, ensure_ascii=False).encode("utf-8"), 6)
+            except (TypeError, ValueError):
+                return  # not JSON-serializable: memory tier only
+            try:
+                self._db().execute(
+                    "INSERT OR REPLACE INTO entries (key, version, created_at, payload) VALUES (?, ?, ?, ?)",
+                    (key, entry[0], entry[1], payload),
+                )
+                self._db().commit()
+            except sqlite3.Error as exc:
+                print(f"[prefetch_cache] disk tier unavailable: {exc}")
+
+    def _remember(self, key: str, entry: tuple) -> None:
+        self._memory[key] = entry
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+    def flush_stats(self) -> None:
+        """Add this process's counters to the persisted totals and reset them."""
+        with self._lock:
+            if not any(self.stats.values()):
+                return
+            try:
+                conn = self._db()
+                conn.executemany(
+                    "INSERT INTO stats (name, value) VALUES (?, ?) "
+                    "ON CONFLICT(name) DO UPDATE SET value = value + excluded.value",
+                    list(self.stats.items()),
+                )
+                conn.commit()
+            except sqlite3.Error as exc:
+                print(f"[prefetch_cache] stats not saved: {exc}")
+                return
+            self.stats = {name: 0 for name in STAT_NAMES}
+
+
+_CACHE: Optional[PrefetchCache] = None
+
+
+def enabled() -> bool:
+    return os.getenv("RAG_PREFETCH_CACHE", "1") != "0"
+
+
+def get_cache() -> PrefetchCache:
+    global _CACHE
+    if _CACHE is None:
+        _CACHE = PrefetchCache(
+            Path(os.getenv("RAG_PREFETCH_CACHE_PATH") or DEFAULT_CACHE_PATH),
+            max_entries=int(os.getenv("RAG_PREFETCH_CACHE_SIZE", DEFAULT_MAX_ENTRIES)),
+            ttl_sec=float(os.getenv("RAG_PREFETCH_CACHE_TTL_SEC", DEFAULT_TTL_SEC)),
+        )
+        atexit.register(_CACHE.flush_stats)
+    return _CACHE
+
+
+async def cached_prefetch(saju_data: Dict[str, Any], astro_data: Dict[str, Any], theme: str, locale: str) -> Dict[str, Any]:
+    """prefetch_all_rag_data_async() through the two-tier cache."""
+    from backend_ai.app.rag_manager import prefetch_all_rag_data_async  # pylint: disable=import-outside-toplevel
+
+    if not enabled():
+        return await prefetch_all_rag_data_async(saju_data, astro_data, theme=theme, locale=locale)
+    cache = get_cache()
+    started = time.perf_counter()
+    key = chart_fingerprint(saju_data, astro_data, theme, locale)
+    found = cache.get(key)
+    if found is not None:
+        cache.stats["hit_ms"] += (time.perf_counter() - started) * 1000
+        return found
+    result = await prefetch_all_rag_data_async(saju_data, astro_data, theme=theme, locale=locale)
+    cache.put(key, result)
+    cache.stats["misses"] += 1
+    cache.stats["miss_ms"] += (time.perf_counter() - started) * 1000
+    return result
+
+
+def cache_stats(path: Optional[Path] = None) -> Dict[str, float]:
+    """Persisted totals plus this process's unflushed counters, with derived rates."""
+    target = Path(path or os.getenv("RAG_PREFETCH_CACHE_PATH") or DEFAULT_CACHE_PATH)
+    totals: Dict[str, float] = {name: 0 for name in STAT_NAMES}
+    entries = 0
+    if target.exists():
+        try:
+            conn = sqlite3.connect(f"file:{target}?mode=ro", uri=True)
+            try:
+                for name, value in conn.execute("SELECT name, value FROM stats"):
+                    totals[name] = totals.get(name, 0) + value
+                entries = int(conn.execute("SELECT COUNT(*) FROM entries").fetchone()[0])
+            finally:
+                conn.close()
+        except sqlite3.Error as exc:
+            print(f"[prefetch_cache] stats unavailable: {exc}")
+    if _CACHE is not None and _CACHE.path == target:
+        for name, value in _CACHE.stats.items():
+            totals[name] += value
+    hits = totals["memory_hits"] + totals["disk_hits"]
+    lookups = hits + totals["misses"]
+    totals["entries"] = entries
+    totals["hit_rate"] = hits / lookups if lookups else 0.0
+    totals["avg_hit_ms"] = totals["hit_ms"] / hits if hits else 0.0
+    totals["avg_miss_ms"] = totals["miss_ms"] / totals["misses"] if totals["misses"] else 0.0
+    return totals
@@ -0,0 +1,221 @@
+#!/usr/bin/env python
+"""
+Reduced-precision vector sidecars: quantized first-stage search + float rescoring.
+
+Chroma only stores float32 vectors, so the reduced-precision copy lives next to
+the collection instead of inside it:
+
+  backend_ai/data/vector_sidecars/<collection>/
+    manifest.json   collection, precision, space, count, dim
+    ids.json        row -> Chroma id
+    codes.npy       int8 (per-dimension symmetric scale) or float16 vectors
+    scale.npy       int8 only: float32 [dim] dequantization scale
+    norms.npy       l2 space only: squared norms of the float vectors
+    full.npy        float32 vectors, memory-mapped and read only for rescoring
+
+Search scores the compact codes for every row (4x / 2x less RAM than float32),
+keeps the top k * oversample candidates and rescores them against full.npy, so
+only candidate rows of the float matrix are ever paged in. Cosine collections
+are stored unit-normalized.
+
+The Saju+Astro reindexers build sidecars with --vector-sidecar int8|float16;
+scripts/quantized_recall_check.py gates adoption on recall@10 against full
+precision for the golden queries.
+
+Usage:
+  python scripts/quantized_index.py --collections saju_astro_graph_nodes_v1,saju_astro_cross_v1
+  python scripts/quantized_index.py --collections domain_tarot --precision float16
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import time
+from pathlib import Path
+from typing import List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from chroma_snapshot import DEFAULT_PERSIST_DIR, DEFAULT_SNAPSHOT_DIR, load_collection_vectors, read_collection_vectors
+from pipeline_profiling import run_profiled, stage
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+DEFAULT_SIDECAR_DIR = REPO_ROOT / "backend_ai" / "data" / "vector_sidecars"
+DEFAULT_COLLECTIONS = ("saju_astro_graph_nodes_v1", "saju_astro_cross_v1")
+PRECISIONS = ("int8", "float16")
+DEFAULT_OVERSAMPLE = 4
+SCORE_CHUNK_ROWS = 8192
+
+
+def _normalize(vectors: np.ndarray) -> np.ndarray:
+    return vectors / np.clip(np.linalg.norm(vectors, axis=-1, keepdims=True), 1e-12, None)
+
+
+def quantize(vectors: np.ndarray, precision: str) -> Tuple[np.ndarray, Optional[np.ndarray]]:
+    """(codes, scale); int8 uses one symmetric scale per dimension."""
+    if precision == "float16":
+        return vectors.astype(np.float16), None
+    if precision != "int8":
+        raise ValueError(f"Unknown precision {precision!r} (expected one of {', '.join(PRECISIONS)})")
+    scale = np.abs(vectors).max(axis=0) / 127.0
+    scale[scale == 0] = 1.0
+    codes = np.clip(np.rint(vectors / scale), -127, 127).astype(np.int8)
+    return codes, scale.astype(np.float32)
+
+
+class QuantizedIndex:
+    def __init__(
+        self,
+        ids: Sequence[str],
+        codes: np.ndarray,
+        scale: Optional[np.ndarray],
+        full: np.ndarray,
+        precision: str,
+        space: str = "cosine",
+        norms: Optional[np.ndarray] = None,
+    ):
+        self.ids = list(ids)
+        self.codes = codes
+        self.scale = scale
+        self.full = full
+        self.precision = precision
+        self.space = space
+        self.norms = norms
+
+    @classmethod
+    def build(cls, ids: Sequence[str], vectors: np.ndarray, precision: str, space: str = "cosine") -> "QuantizedIndex":
+        vectors = np.ascontiguousarray(vectors, dtype=np.float32)
+        if space == "cosine":
+            vectors = _normalize(vectors)
+        codes, scale = quantize(vectors, precision)
+        norms = (vectors * vectors).sum(axis=1) if space == "l2" else None
+        return cls(ids, codes, scale, vectors, precision, space, norms)
+
+    @property
+    def code_mb(self) -> float:
+        extra = (self.scale.nbytes if self.scale is not None else 0) + (self.norms.nbytes if self.norms is not None else 0)
+        return (self.codes.nbytes + extra) / (1024 * 1024)
+
+    @property
+    def full_mb(self) -> float:
+        return self.full.shape[0] * self.full.shape[1] * 4 / (1024 * 1024)
+
+    def _scores(self, queries: np.ndarray, rows: slice) -> np.ndarray:
+        q = queries * self.scale if self.scale is not None else queries
+        scores = q @ self.codes[rows].astype(np.float32).T
+        if self.norms is not None:
+            scores = 2 * scores - self.norms[rows]  # -(||q-d||^2) up to a per-query constant
+        return scores
+
+    def _prepare(self, queries) -> np.ndarray:
+        queries = np.atleast_2d(np.asarray(queries, dtype=np.float32))
+        return _normalize(queries) if self.space == "cosine" else queries
+
+    def approximate_topk(self, queries, k: int) -> np.ndarray:
+        """First stage only: top-k rows by quantized score."""
+        queries = self._prepare(queries)
+        k = min(k, len(self.ids))
+        best_rows: Optional[np.ndarray] = None
+        best_scores: Optional[np.ndarray] = None
+        # Score in row chunks so only one chunk of codes is widened to float32 at a time.
+        for start in range(0, len(self.ids), SCORE_CHUNK_ROWS):
+            scores = self._scores(queries, slice(start, start + SCORE_CHUNK_ROWS))
+            rows = np.broadcast_to(np.arange(start, start + scores.shape[1]), scores.shape)
+            if best_rows is not None:
+                scores = np.concatenate([best_scores, scores], axis=1)
+                rows = np.concatenate([best_rows, rows], axis=1)
+            keep = np.argpartition(-scores, min(k, scores.shape[1]) - 1, axis=1)[:, :k]
+            best_rows = np.take_along_axis(rows, keep, axis=1)
+            best_scores = np.take_along_axis(scores, keep, axis=1)
+        order = np.argsort(-best_scores, axis=1)
+        return np.take_along_axis(best_rows, order, axis=1)
+
+    def search(self, queries, k: int = 10, oversample: int = DEFAULT_OVERSAMPLE, rescore: bool = True) -> List[List[Tuple[str, float]]]:
+        """[(id, score)] per query; score is the similarity (cosine/ip) or -squared L2."""
+        queries = self._prepare(queries)
+        rows = self.approximate_topk(queries, k * oversample if rescore else k)
+        out: List[List[Tuple[str, float]]] = []
+        for q, cand in zip(queries, rows):
+            cand = np.sort(cand)  # ascending rows: sequential reads from the memmap
+            vecs = np.asarray(self.full[cand], dtype=np.float32)
+            scores = -((vecs - q) ** 2).sum(axis=1) if self.space == "l2" else vecs @ q
+            top = np.argsort(-scores)[:k]
+            out.append([(self.ids[int(cand[i])], float(scores[i])) for i in top])
+        return out
+
+    def save(self, out_dir: Path, collection: str) -> Path:
+        out_dir.mkdir(parents=True, exist_ok=True)
+        np.save(out_dir / "codes.npy", self.codes)
+        np.save(out_dir / "full.npy", np.ascontiguousarray(self.full, dtype=np.float32))
+        if self.scale is not None:
+            np.save(out_dir / "scale.npy", self.scale)
+        if self.norms is not None:
+            np.save(out_dir / "norms.npy", self.norms)
+        (out_dir / "ids.json").write_text(json.dumps(self.ids, ensure_ascii=False), encoding="utf-8")
+        manifest = {
+            "collection": collection,
+            "precision": self.precision,
+            "space": self.space,
+            "count": len(self.ids),
+            "dim": int(self.codes.shape[1]),
+            "code_mb": round(self.code_mb, 2),
+            "full_mb": round(self.full_mb, 2),
+            "built_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        }
+        (out_dir / "manifest.json").write_text(json.dumps(manifest, indent=2), encoding="utf-8")
+        return out_dir
+
+    @classmethod
+    def load(cls, sidecar_dir: Path) -> "QuantizedIndex":
+        manifest = json.loads((sidecar_dir / "manifest.json").read_text(encoding="utf-8"))
+        ids = json.loads((sidecar_dir / "ids.json").read_text(encoding="utf-8"))
+        scale_path = sidecar_dir / "scale.npy"
+        norms_path = sidecar_dir / "norms.npy"
+        return cls(
+            ids,
+            np.load(sidecar_dir / "codes.npy"),
+            np.load(scale_path) if scale_path.exists() else None,
+            np.load(sidecar_dir / "full.npy", mmap_mode="r"),
+            manifest["precision"],
+            manifest["space"],
+            np.load(norms_path) if norms_path.exists() else None,
+        )
+
+
+def build_sidecar(collection, precision: str, sidecar_root: Path = DEFAULT_SIDECAR_DIR) -> QuantizedIndex:
+    """Quantize a live Chroma collection into <sidecar_root>/<name>/."""
+    ids, vectors = read_collection_vectors(collection)
+    space = (collection.metadata or {}).get("hnsw:space", "l2")
+    index = QuantizedIndex.build(ids, vectors, precision, space)
+    index.save(Path(sidecar_root) / collection.name, collection.name)
+    return index
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Build reduced-precision vector sidecars for Chroma collections.")
+    parser.add_argument("--collections", default=",".join(DEFAULT_COLLECTIONS))
+    parser.add_argument("--precision", choices=PRECISIONS, default="int8")
+    parser.add_argument("--persist-dir", default=str(DEFAULT_PERSIST_DIR))
+    parser.add_argument("--snapshot-dir", default=str(DEFAULT_SNAPSHOT_DIR), help="Prefer chroma_snapshot vectors when present.")
+    parser.add_argument("--sidecar-dir", default=str(DEFAULT_SIDECAR_DIR))
+    return parser.parse_args()
+
+
+def main() -> int:
+    args = parse_args()
+    for name in [c.strip() for c in args.collections.split(",") if c.strip()]:
+        with stage("load"):
+            ids, vectors, metadata = load_collection_vectors(name, Path(args.persist_dir), Path(args.snapshot_dir))
+        with stage("write"):
+            index = QuantizedIndex.build(ids, vectors, args.precision, metadata.get("hnsw:space", "l2"))
+            out_dir = index.save(Path(args.sidecar_dir) / name, name)
+        print(
+            f"[sidecar] {name} precision={args.precision} count={len(ids)} "
+            f"codes={index.code_mb:.1f}MB float32={index.full_mb:.1f}MB -> {out_dir}"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(run_profiled("quantized_index", main))
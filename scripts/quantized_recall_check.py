@@ -0,0 +1,169 @@
+#!/usr/bin/env python
+"""
+Recall@k gate for reduced-precision vector sidecars (quantized_index.py).
+
+Golden queries:
+- saju_astro_graph_nodes_v1 / saju_astro_cross_v1: self_check.QUALITY_QUERIES
+- domain_tarot: the tarot eval sets (eval_auto + eval_realstyle_draws)
+
+Each query is embedded once with the collection's embedding model. The
+reference is exact float32 top-k over the stored vectors. For each
+--precisions entry we report recall@k of the quantized first stage alone
+and after float rescoring (k * --oversample candidates), plus the resident
+vector footprint. The check exits 1 when any rescored recall is below
+--min-recall.
+
+Usage:
+  python scripts/quantized_recall_check.py
+  python scripts/quantized_recall_check.py --collections domain_tarot --precisions int8 --min-recall 0.995
+  python scripts/quantized_recall_check.py --embedder fake   # offline plumbing check on fake-embedded indexes
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import time
+from pathlib import Path
+from typing import Dict, List
+
+import numpy as np
+
+from chroma_snapshot import DEFAULT_PERSIST_DIR, DEFAULT_SNAPSHOT_DIR, load_collection_vectors
+from embedding_backends import BACKENDS
+from hnsw_sweep import exact_topk, recall_at_k
+from pipeline_profiling import run_profiled, stage
+from quantized_index import DEFAULT_OVERSAMPLE, PRECISIONS, QuantizedIndex
+from tarot_pipeline_utils import load_jsonl_records
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+TAROT_EVAL_DIR = REPO_ROOT / "tests" / "fixtures" / "tarot-eval"
+DEFAULT_OUTPUT_DIR = REPO_ROOT / "reports" / "quality" / "quantized-recall"
+SAJU_ASTRO_COLLECTIONS = ("saju_astro_graph_nodes_v1", "saju_astro_cross_v1")
+TAROT_COLLECTION = "domain_tarot"
+TAROT_EVAL_SETS = ("eval_auto.jsonl", "eval_realstyle_draws.jsonl")
+
+
+def golden_queries(collection: str, max_queries: int) -> List[str]:
+    if collection == TAROT_COLLECTION:
+        queries: List[str] = []
+        for name in TAROT_EVAL_SETS:
+            queries.extend(str(r.get("query") or "") for r in load_jsonl_records(TAROT_EVAL_DIR / name))
+    else:
+        from self_check import QUALITY_QUERIES  # pylint: disable=import-outside-toplevel
+
+        queries = list(QUALITY_QUERIES)
+    unique = [q for q in dict.fromkeys(q.strip() for q in queries) if q]
+    return unique[:max_queries] if max_queries > 0 else unique
+
+
+def _embed(queries: List[str], model_id: str, backend: str | None) -> np.ndarray:
+    from tarot_rebuild_chroma import _load_embedder  # pylint: disable=import-outside-toplevel
+
+    with stage("load"):
+        encode = _load_embedder(model_id, is_query=True, backend=backend)
+    with stage("embed"):
+        return np.ascontiguousarray(encode(queries), dtype=np.float32)
+
+
+def check_collection(name: str, args) -> Dict:
+    with stage("load"):
+        ids, vectors, metadata = load_collection_vectors(name, Path(args.persist_dir), Path(args.snapshot_dir))
+    space = metadata.get("hnsw:space", "l2")
+    model_id = args.embedding_model_id or str(metadata.get("embedding_model_id") or "") or os.getenv("RAG_EMBEDDING_MODEL", "minilm")
+    queries = golden_queries(name, args.max_queries)
+    query_vecs = _embed(queries, model_id, args.embedder)
+    if query_vecs.shape[1] != vectors.shape[1]:
+        raise RuntimeError(
+            f"{name}: query dim {query_vecs.shape[1]} != collection dim {vectors.shape[1]} "
+            f"(model {model_id}); pass --embedding-model-id / --embedder matching the index"
+        )
+
+    with stage("query"):
+        truth = exact_topk(vectors, query_vecs, args.k, space)
+        row_of = {doc_id: i for i, doc_id in enumerate(ids)}
+        rows = []
+        for precision in args.precisions:
+            index = QuantizedIndex.build(ids, vectors, precision, space)
+            first_stage = index.approximate_topk(query_vecs, args.k)
+            rescored = np.array(
+                [[row_of[doc_id] for doc_id, _ in hits] for hits in index.search(query_vecs, args.k, args.oversample)]
+            )
+            rows.append(
+                {
+                    "precision": precision,
+                    "recall_first_stage": round(recall_at_k(first_stage, truth), 4),
+                    "recall_rescored": round(recall_at_k(rescored, truth), 4),
+                    "resident_mb": round(index.code_mb, 2),
+                    "float32_mb": round(index.full_mb, 2),
+                }
+            )
+    return {
+        "collection": name,
+        "model_id": model_id,
+        "space": space,
+        "vectors": int(vectors.shape[0]),
+        "queries": len(queries),
+        "k": args.k,
+        "oversample": args.oversample,
+        "results": rows,
+    }
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Recall gate for quantized vector sidecars vs full precision.")
+    parser.add_argument("--collections", default=",".join((*SAJU_ASTRO_COLLECTIONS, TAROT_COLLECTION)))
+    parser.add_argument("--precisions", default=",".join(PRECISIONS), type=lambda v: [p.strip() for p in v.split(",") if p.strip()])
+    parser.add_argument("--persist-dir", default=str(DEFAULT_PERSIST_DIR))
+    parser.add_argument("--snapshot-dir", default=str(DEFAULT_SNAPSHOT_DIR), help="Prefer chroma_snapshot vectors when present.")
+    parser.add_argument("--embedding-model-id", default=None, help="Default: collection metadata, then RAG_EMBEDDING_MODEL/minilm")
+    parser.add_argument("--embedder", choices=BACKENDS, default=None)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--oversample", type=int, default=DEFAULT_OVERSAMPLE)
+    parser.add_argument("--max-queries", type=int, default=500, help="Per collection (0 = all).")
+    parser.add_argument("--min-recall", type=float, default=0.99, help="Gate on rescored recall@k.")
+    parser.add_argument("--output-json", default=None)
+    return parser.parse_args()
+
+
+def main() -> int:
+    args = parse_args()
+    unknown = sorted(set(args.precisions) - set(PRECISIONS))
+    if unknown:
+        raise SystemExit(f"unknown --precisions: {', '.join(unknown)}")
+
+    reports: List[Dict] = []
+    failures: List[str] = []
+    for name in [c.strip() for c in args.collections.split(",") if c.strip()]:
+        try:
+            report = check_collection(name, args)
+        except Exception as exc:
+            failures.append(f"{name}: {exc}")
+            print(f"[quantized_recall] {name} FAILED: {exc}")
+            continue
+        reports.append(report)
+        for row in report["results"]:
+            ok = row["recall_rescored"] >= args.min_recall
+            if not ok:
+                failures.append(f"{name} {row['precision']} recall_rescored={row['recall_rescored']:.4f}")
+            print(
+                f"[quantized_recall] {name} {row['precision']:<7} queries={report['queries']} "
+                f"recall@{args.k} first_stage={row['recall_first_stage']:.4f} rescored={row['recall_rescored']:.4f} "
+                f"resident={row['resident_mb']:.1f}MB float32={row['float32_mb']:.1f}MB {'PASS' if ok else 'FAIL'}"
+            )
+
+    output = Path(args.output_json) if args.output_json else DEFAULT_OUTPUT_DIR / f"quantized_recall_{time.strftime('%Y%m%d_%H%M%S')}.json"
+    with stage("write"):
+        output.parent.mkdir(parents=True, exist_ok=True)
+        output.write_text(
+            json.dumps({"min_recall": args.min_recall, "collections": reports, "failures": failures}, ensure_ascii=False, indent=2),
+            encoding="utf-8",
+        )
+    print(f"[quantized_recall] wrote: {output}")
+    print(f"[quantized_recall] {'FAIL' if failures else 'PASS'} min_recall={args.min_recall}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(run_profiled("quantized_recall_check", main))
@@ -0,0 +1,193 @@
+"""
+Process-wide query-embedding cache shared by the RAG call sites.
+
+The same query strings are embedded over and over: the report's per-theme
+_build_query() strings, self_check's QUALITY_QUERIES (cross probes), the
+e2e smoke queries and the reindexers' --smoke-query. QueryEmbeddingCache
+keys vectors by (model id + encode variant, normalized text), where
+normalized means NFC, trimmed, with whitespace runs collapsed. The model id
+comes from embedding_backends.model_identity (ONNX precision included) and
+the variant adds normalize_embeddings plus the kwargs that change the
+vector itself (is_query, prompt_name, prompt).
+
+- memory: LRU, RAG_QUERY_EMBED_CACHE_SIZE entries (default 4096)
+- disk (optional): RAG_QUERY_EMBED_CACHE=disk persists vectors to
+  .cache/query_embeddings.sqlite (or RAG_QUERY_EMBED_CACHE_PATH) so later
+  runs start warm; RAG_QUERY_EMBED_CACHE=0 turns the cache off
+
+encode_queries(model, texts) is the only entry point: call it at the query
+sites these scripts own. The model itself is never patched, so document
+encodes and the encode() calls made inside backend_ai bypass the cache.
+Misses are encoded in one call. Hit/miss counts are added to the --profile
+timing JSON (see pipeline_profiling.add_counters).
+"""
+
+from __future__ import annotations
+
+import os
+import re
+import sqlite3
+import threading
+import unicodedata
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from embedding_backends import load_embedder, model_identity
+from pipeline_profiling import add_counters
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+DEFAULT_CACHE_PATH = REPO_ROOT / ".cache" / "query_embeddings.sqlite"
+DEFAULT_MAX_ENTRIES = 4096
+
+_SPACE_RE = re.compile(r"\s+")
+
+
+def normalize_text(text: str) -> str:
+    return _SPACE_RE.sub(" ", unicodedata.normalize("NFC", text or "")).strip()
+
+
+class QueryEmbeddingCache:
+    def __init__(self, max_entries: int = DEFAULT_MAX_ENTRIES, path: Optional[Path] = None):
+        self.max_entries = max_entries
+        self.path = Path(path) if path else None
+        self.hits = 0
+        self.misses = 0
+        self.encode_calls = 0
+        self._memory: "OrderedDict[Tuple[str, str], np.ndarray]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+
+    def _db(self) -> Optional[sqlite3.Connection]:
+        if self.path is None:
+            return None
+        if self._conn is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(str(self.path), check_same_thread=False, timeout=10)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS vectors (model TEXT NOT NULL, text TEXT NOT NULL, "
+                "vec BLOB NOT NULL, PRIMARY KEY (model, text)) WITHOUT ROWID"
+            )
+            self._conn = conn
+        return self._conn
+
+    def _lookup(self, key: Tuple[str, str]) -> Optional[np.ndarray]:
+        vec = self._memory.get(key)
+        if vec is not None:
+            self._memory.move_to_end(key)
+            return vec
+        conn = self._db()
+        if conn is None:
+            return None
+        row = conn.execute("SELECT vec FROM vectors WHERE model = ? AND text = ?", key).fetchone()
+        if row is None:
+            return None
+        vec = np.frombuffer(row[0], dtype=np.float32)
+        self._remember(key, vec)
+        return vec
+
+    def _remember(self, key: Tuple[str, str], vec: np.ndarray) -> None:
+        self._memory[key] = vec
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+    def encode(self, model_key: str, texts: Sequence[str], encode_fn: Callable[[List[str]], Any]) -> np.ndarray:
+        """Rows for texts in order; encode_fn(list_of_missing_texts) runs at most once."""
+        keys = [(model_key, normalize_text(t)) for t in texts]
+        found: Dict[Tuple[str, str], np.ndarray] = {}
+        with self._lock:
+            for key in keys:
+                if key not in found:
+                    vec = self._lookup(key)
+                    if vec is not None:
+                        found[key] = vec
+            missing = [key for key in dict.fromkeys(keys) if key not in found]
+            missed = sum(1 for key in keys if key not in found)
+            self.hits += len(keys) - missed
+            self.misses += missed
+        if missing:
+            vectors = np.asarray(encode_fn([text for _model, text in missing]), dtype=np.float32)
+            vectors = vectors.reshape(len(missing), -1)
+            with self._lock:
+                self.encode_calls += 1
+                for key, vec in zip(missing, vectors):
+                    vec = vec.copy()
+                    found[key] = vec
+                    self._remember(key, vec)
+                conn = self._db()
+                if conn is not None:
+                    try:
+                        conn.executemany(
+                            "INSERT OR REPLACE INTO vectors (model, text, vec) VALUES (?, ?, ?)",
+                            [(model, text, found[(model, text)].tobytes()) for model, text in missing],
+                        )
+                        conn.commit()
+                    except sqlite3.Error as exc:
+                        print(f"[query_embed_cache] disk tier unavailable: {exc}")
+        return np.stack([found[key] for key in keys]) if keys else np.empty((0, 0), dtype=np.float32)
+
+    def counters(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "encode_calls": self.encode_calls,
+            "entries": len(self._memory),
+            "persisted": str(self.path) if self.path else None,
+        }
+
+
+_CACHE: Optional[QueryEmbeddingCache] = None
+
+
+def enabled() -> bool:
+    return os.getenv("RAG_QUERY_EMBED_CACHE", "memory") != "0"
+
+
+def get_cache() -> QueryEmbeddingCache:
+    global _CACHE
+    if _CACHE is None:
+        mode = os.getenv("RAG_QUERY_EMBED_CACHE", "memory")
+        path = os.getenv("RAG_QUERY_EMBED_CACHE_PATH") or (DEFAULT_CACHE_PATH if mode == "disk" else None)
+        _CACHE = QueryEmbeddingCache(int(os.getenv("RAG_QUERY_EMBED_CACHE_SIZE", DEFAULT_MAX_ENTRIES)), path)
+        add_counters("query_embed_cache", _CACHE.counters)
+    return _CACHE
+
+
+# encode() kwargs that change the vector, not just how it is returned.
+_VARIANT_KWARGS = ("is_query", "prompt_name", "prompt")
+
+
+def _variant(model_id: str, kwargs: Dict[str, Any]) -> str:
+    parts = [model_id, f"normalize={bool(kwargs.get('normalize_embeddings'))}"]
+    parts.extend(f"{name}={kwargs[name]}" for name in _VARIANT_KWARGS if kwargs.get(name) is not None)
+    return "|".join(parts)
+
+
+def _cacheable(kwargs: Dict[str, Any]) -> bool:
+    return enabled() and not kwargs.get("convert_to_tensor") and kwargs.get("convert_to_numpy", True)
+
+
+def encode_queries(model, texts, model_id: Optional[str] = None, **kwargs: Any) -> np.ndarray:
+    """model.encode(texts, **kwargs) through the cache; a str gives one row, a list a matrix."""
+    single = isinstance(texts, str)
+    batch = [texts] if single else list(texts)
+    if not _cacheable(kwargs):
+        return model.encode(texts, **kwargs)
+    out = get_cache().encode(_variant(model_id or model_identity(model), kwargs), batch, lambda missing: model.encode(missing, **kwargs))
+    return out[0] if single else out
+
+
+def load_query_model():
+    """The backend's shared query model (get_model(prefer_multilingual=True)); pass it to encode_queries."""
+    def _load_model():
+        from backend_ai.app.saju_astro_rag import get_model  # pylint: disable=import-outside-toplevel
+
+        return get_model(prefer_multilingual=True)
+
+    return load_embedder(_load_model)
@@ -9,6 +9,7 @@ Goal:
 Usage:
   python scripts/reindex_saju_astro_cross.py
   python scripts/reindex_saju_astro_cross.py --no-reset
+  python scripts/reindex_saju_astro_cross.py --resync-manifest /tmp/cross_drift.json
 """
 
 from __future__ import annotations
@@ -573,21 +574,8 @@ def _build_stable_id(seed: str) -> str:
     return f"sa_cross_{digest[:36]}"
 
 
-def reindex(
-    graph_root: Path,
-    collection_name: str,
-    persist_dir: str | None,
-    batch_size: int,
-    reset: bool,
-    smoke_query: str | None,
-) -> None:
-    from app.rag.vector_store import VectorStoreManager  # pylint: disable=import-outside-toplevel
-    from app.saju_astro_rag import get_model  # pylint: disable=import-outside-toplevel
-
-    print(f"[reindex] graph_root={graph_root}")
-    print(f"[reindex] collection={collection_name}")
-    print(f"[reindex] domain={DOMAIN_NAME}")
-
+def collect_docs(graph_root: Path) -> Tuple[List[str], List[str], List[Dict]]:
+    """Build (ids, docs, metas) for every indexable cross record under graph_root."""
     files = _iter_cross_files(graph_root)
     print(f"[reindex] cross_files={len(files)}")
 
@@ -609,37 +597,122 @@ def reindex(
             ids.append(_build_stable_id(seed))
             docs.append(doc)
             metas.append(meta)
+    return ids, docs, metas
+
+
+def reindex(
+    graph_root: Path,
+    collection_name: str,
+    persist_dir: str | None,
+    batch_size: int,
+    reset: bool,
+    smoke_query: str | None,
+    embedder: str | None = None,
+    token_budget: int | None = 8192,
+    memory_ceiling_mb: float | None = None,
+    bulk_load: bool = False,
+    vector_sidecar: str | None = None,
+    resync_manifest: Path | None = None,
+) -> None:
+    """token_budget=None auto-tunes it; a memory ceiling (or auto) enables the back-off guard.
+
+    bulk_load (full reindex only) writes large chunks straight into the target
+    under bulk HNSW settings via chroma_bulk instead of index_nodes per batch,
+    then restores the normal settings. vector_sidecar
+    (int8/float16) writes a quantized_index sidecar from the finished collection.
+    resync_manifest (collection_digest.py verify --live --manifest-out) indexes
+    only the drifted ids it lists and deletes its stale ids, without reset.
+    """
+    from app.rag.vector_store import VectorStoreManager  # pylint: disable=import-outside-toplevel
+    from batch_autotune import MemoryGuard, autotune_token_budget, resolve_memory_ceiling  # pylint: disable=import-outside-toplevel
+    from embedding_backends import as_float32, encode_docs, load_embedder, model_identity  # pylint: disable=import-outside-toplevel
+    from pipeline_profiling import stage  # pylint: disable=import-outside-toplevel
+
+    def _load_model():
+        from app.saju_astro_rag import get_model  # pylint: disable=import-outside-toplevel
+
+        return get_model(prefer_multilingual=True)
+
+    print(f"[reindex] graph_root={graph_root}")
+    print(f"[reindex] collection={collection_name}")
+    print(f"[reindex] domain={DOMAIN_NAME}")
 
+    with stage("parse"):
+        ids, docs, metas = collect_docs(graph_root)
     print(f"[reindex] indexable_docs={len(docs)}")
     if not docs:
         raise RuntimeError("No indexable cross-analysis records found.")
 
+    # The digest describes the full source even when only drifted ids are written.
+    all_ids, all_docs = ids, docs
+    delete_ids: List[str] = []
+    if resync_manifest:
+        from collection_digest import load_manifest  # pylint: disable=import-outside-toplevel
+
+        if reset:
+            raise RuntimeError("--resync-manifest updates in place; it cannot be combined with reset.")
+        target, upsert_ids, delete_ids = load_manifest(resync_manifest)
+        if target != collection_name:
+            raise RuntimeError(f"resync manifest targets {target}, not {collection_name}")
+        keep = [i for i, doc_id in enumerate(ids) if doc_id in upsert_ids]
+        ids = [ids[i] for i in keep]
+        docs = [docs[i] for i in keep]
+        metas = [metas[i] for i in keep]
+        print(f"[reindex] resync upsert={len(ids)} delete={len(delete_ids)}")
+
     vs = VectorStoreManager(persist_dir=persist_dir, collection_name=collection_name)
     graph_vs = VectorStoreManager(
         persist_dir=persist_dir,
         collection_name="saju_astro_graph_nodes_v1",
     )
+    writer = None
     if reset:
+        from chroma_bulk import recreate_for_bulk, recreate_with_metadata  # pylint: disable=import-outside-toplevel
+        from hnsw_params import hnsw_metadata  # pylint: disable=import-outside-toplevel
+
         vs.reset()
+        # Swept M / construction_ef / search_ef (scripts/hnsw_sweep.py), if any.
+        tuned = hnsw_metadata(collection_name)
+        if bulk_load:
+            writer = recreate_for_bulk(vs.collection, persist_dir, extra=tuned)
+            vs.collection = writer.collection
+            print(f"[reindex] bulk_load=on bulk_hnsw={writer.restore} write_batch={writer.write_batch}")
+        elif tuned:
+            vs.collection = recreate_with_metadata(vs.collection, tuned, persist_dir)
+            print(f"[reindex] hnsw params={tuned}")
+    elif bulk_load:
+        print("[reindex] --bulk-load needs --reset; using per-batch writes")
+
+    with stage("load"):
+        model = load_embedder(_load_model, backend=embedder)
+    if resync_manifest:
+        from collection_stats import indexed_model_id  # pylint: disable=import-outside-toplevel
+
+        indexed = indexed_model_id(vs.collection)
+        if indexed != model_identity(model):
+            raise RuntimeError(
+                f"{collection_name} was indexed with embedding_model_id={indexed}, this run uses "
+                f"{model_identity(model)}; resync would mix vector spaces, run a full reindex instead"
+            )
 
-    model = get_model(prefer_multilingual=True)
+    guard = None
+    if token_budget is None or memory_ceiling_mb:
+        guard = MemoryGuard(resolve_memory_ceiling(memory_ceiling_mb))
+    if token_budget is None:
+        token_budget = autotune_token_budget(model, docs, guard.ceiling_mb)
 
     total = len(docs)
     indexed = 0
-    for start in range(0, total, batch_size):
-        end = min(start + batch_size, total)
+    start = 0
+    while start < total:
+        if guard is not None:
+            guard.check()
+        end = min(start + (guard.scaled(batch_size, floor=32) if guard else batch_size), total)
         batch_docs = docs[start:end]
         batch_ids = ids[start:end]
         batch_meta = metas[start:end]
 
-        embeds = model.encode(
-            batch_docs,
-            batch_size=min(64, len(batch_docs)),
-            convert_to_tensor=False,
-            normalize_embeddings=True,
-            show_progress_bar=False,
-        )
-        batch_embeds = embeds.tolist() if hasattr(embeds, "tolist") else embeds
+        batch_embeds = encode_docs(model, batch_docs, token_budget=token_budget, guard=guard)
 
         missing_indices: List[int] = []
         for idx, meta in enumerate(batch_meta):
@@ -649,23 +722,25 @@ def reindex(
                 missing_indices.append(idx)
 
         if missing_indices:
-            missing_embeds = [batch_embeds[i] for i in missing_indices]
+            missing_embeds = batch_embeds[missing_indices]
             query_result = None
             try:
-                query_result = graph_vs.collection.query(
-                    query_embeddings=missing_embeds,
-                    n_results=5,
-                    where={"domain": "saju_astro"},
-                    include=["metadatas", "documents", "distances"],
-                )
+                with stage("query"):
+                    query_result = graph_vs.collection.query(
+                        query_embeddings=missing_embeds,
+                        n_results=5,
+                        where={"domain": "saju_astro"},
+                        include=["metadatas", "documents", "distances"],
+                    )
             except Exception:
                 pass
             if query_result is None:
-                query_result = graph_vs.collection.query(
-                    query_embeddings=missing_embeds,
-                    n_results=5,
-                    include=["metadatas", "documents", "distances"],
-                )
+                with stage("query"):
+                    query_result = graph_vs.collection.query(
+                        query_embeddings=missing_embeds,
+                        n_results=5,
+                        include=["metadatas", "documents", "distances"],
+                    )
 
             docs_by_query = query_result.get("documents", []) if query_result else []
             metas_by_query = query_result.get("metadatas", []) if query_result else []
@@ -710,36 +785,75 @@ def reindex(
                         src_parts.append("backfill_similarity")
                     meta["evidence_source"] = ",".join(src_parts) if src_parts else "backfill_similarity"
 
-        vs.index_nodes(
-            ids=batch_ids,
-            texts=batch_docs,
-            embeddings=batch_embeds,
-            metadatas=batch_meta,
-            batch_size=len(batch_ids),
-        )
+        with stage("write"):
+            if writer is not None:
+                writer.add(ids=batch_ids, documents=batch_docs, embeddings=batch_embeds, metadatas=batch_meta)
+            else:
+                vs.index_nodes(
+                    ids=batch_ids,
+                    texts=batch_docs,
+                    embeddings=batch_embeds,
+                    metadatas=batch_meta,
+                    batch_size=len(batch_ids),
+                )
         indexed += len(batch_ids)
+        start = end
         print(f"[reindex] indexed {indexed}/{total}")
 
+    if writer is not None:
+        with stage("write"):
+            writer.finalize()
+    if delete_ids:
+        with stage("write"):
+            vs.collection.delete(ids=delete_ids)
+
     count = vs.collection.count()
     print(f"[reindex] collection_count={count}")
     if count == 0:
         raise RuntimeError("Indexing finished but collection count is 0.")
 
+    from collection_digest import compute_digest, hash_pairs, write_digest  # pylint: disable=import-outside-toplevel
+    from collection_stats import compute_stats, read_collection, write_stats  # pylint: disable=import-outside-toplevel
+
+    with stage("write"):
+        # After a resync only the rewritten records carry fresh ref backfill, so describe the live collection.
+        _ids, stats_docs, stats_metas = read_collection(vs.collection) if resync_manifest else (ids, docs, metas)
+        stats_path = write_stats(
+            compute_stats(collection_name, stats_docs, stats_metas, model_identity(model), _iter_cross_files(graph_root), persist_dir)
+        )
+        digest = compute_digest(collection_name, hash_pairs(all_ids, all_docs))
+        digest_path = write_digest(digest)
+    print(f"[reindex] stats={stats_path} digest={digest_path} root={digest['root'][:16]}")
+
+    if vector_sidecar:
+        from quantized_index import DEFAULT_SIDECAR_DIR, build_sidecar  # pylint: disable=import-outside-toplevel
+
+        with stage("write"):
+            sidecar = build_sidecar(vs.collection, vector_sidecar)
+        print(
+            f"[reindex] sidecar={vector_sidecar} dir={DEFAULT_SIDECAR_DIR / collection_name} "
+            f"resident={sidecar.code_mb:.1f}MB float32={sidecar.full_mb:.1f}MB"
+        )
+
     if smoke_query:
         print(f"[smoke] query={smoke_query}")
-        q_emb = model.encode(
+        from query_embedding_cache import encode_queries  # pylint: disable=import-outside-toplevel
+
+        q_emb = encode_queries(
+            model,
             smoke_query,
             convert_to_tensor=False,
             normalize_embeddings=True,
             show_progress_bar=False,
         )
-        q_vec = q_emb.tolist() if hasattr(q_emb, "tolist") else q_emb
-        results = vs.search(
-            query_embedding=q_vec,
-            top_k=5,
-            min_score=0.1,
-            where={"domain": DOMAIN_NAME},
-        )
+        q_vec = as_float32(q_emb).tolist()
+        with stage("query"):
+            results = vs.search(
+                query_embedding=q_vec,
+                top_k=5,
+                min_score=0.1,
+                where={"domain": DOMAIN_NAME},
+            )
         print(f"[smoke] result_count={len(results)}")
         for i, r in enumerate(results, start=1):
             m = r.get("metadata") or {}
@@ -749,6 +863,8 @@ def reindex(
 
 
 def main() -> None:
+    from batch_autotune import parse_token_budget  # pylint: disable=import-outside-toplevel
+
     repo_root = Path(__file__).resolve().parents[1]
     default_graph_root = repo_root / "backend_ai" / "data" / "graph"
     default_persist_dir = str(repo_root / "backend_ai" / "data" / "chromadb")
@@ -761,6 +877,45 @@ def main() -> None:
     parser.add_argument("--smoke-query", default=None, help="Optional smoke test query after indexing.")
     parser.add_argument("--reset", dest="reset", action="store_true", help="Reset collection before indexing.")
     parser.add_argument("--no-reset", dest="reset", action="store_false", help="Append/upsert without reset.")
+    parser.add_argument(
+        "--embedder",
+        choices=["model", "onnx", "fake"],
+        default=None,
+        help="Embedder backend (default: $RAG_EMBEDDER_BACKEND or model). onnx = int8 ONNX Runtime, fake = offline hash embedder.",
+    )
+    parser.add_argument(
+        "--token-budget",
+        type=parse_token_budget,
+        default=8192,
+        help="Padded tokens per encode call; docs are length-bucketed under it "
+        "(0 = fixed 64-doc batches, auto = probe throughput/RSS and pick).",
+    )
+    parser.add_argument(
+        "--memory-ceiling-mb",
+        type=float,
+        default=None,
+        help="Back off batch sizes when RSS nears this (default with auto: $RAG_MEMORY_CEILING_MB or 80%% of RAM).",
+    )
+    parser.add_argument(
+        "--bulk-load",
+        action="store_true",
+        help="Full reindex only: write large chunks under bulk HNSW batch/sync settings, then restore the "
+        "normal settings (Chroma >= 1.0; older Chroma only gets the large chunks).",
+    )
+    parser.add_argument(
+        "--vector-sidecar",
+        choices=["int8", "float16"],
+        default=None,
+        help="Also write a reduced-precision sidecar (quantized first stage + float rescoring); "
+        "gate with scripts/quantized_recall_check.py.",
+    )
+    parser.add_argument(
+        "--resync-manifest",
+        type=Path,
+        default=None,
+        help="collection_digest.py verify --live --manifest-out file: index only its drifted ids and delete "
+        "its stale ids (implies --no-reset).",
+    )
     parser.set_defaults(reset=True)
     args = parser.parse_args()
 
@@ -769,10 +924,18 @@ def main() -> None:
         collection_name=args.collection,
         persist_dir=args.persist_dir,
         batch_size=args.batch_size,
-        reset=args.reset,
+        reset=args.reset and not args.resync_manifest,
         smoke_query=args.smoke_query,
+        embedder=args.embedder,
+        token_budget=args.token_budget,
+        memory_ceiling_mb=args.memory_ceiling_mb,
+        bulk_load=args.bulk_load,
+        vector_sidecar=args.vector_sidecar,
+        resync_manifest=args.resync_manifest,
     )
 
 
 if __name__ == "__main__":
-    main()
+    from pipeline_profiling import run_profiled  # pylint: disable=import-outside-toplevel
+
+    run_profiled("reindex_saju_astro_cross", main)
@@ -25,6 +25,8 @@ from typing import Dict, Iterable, List, Tuple
 
 COLLECTION_NAME = "saju_astro_graph_nodes_v1"
 DOMAIN_NAME = "saju_astro"
+# Fallback source folders under graph_root when no graph_nodes*.jsonl|json exist.
+SOURCE_FOLDERS = ("saju", "saju_literary", "astro", "astro_database")
 
 
 REPO_ROOT = Path(__file__).resolve().parents[1]
@@ -217,19 +219,26 @@ def _load_records_from_graph_node_files(graph_root: Path) -> List[Dict]:
     return records
 
 
+def _source_files(graph_root: Path) -> List[Path]:
+    """Files build_saju_astro_nodes reads, for the collection stats source manifest."""
+    files = _iter_graph_node_files(graph_root)
+    if files:
+        return files
+    files = []
+    for source in SOURCE_FOLDERS:
+        folder = graph_root / source
+        if folder.is_dir():
+            files.extend(path for path in folder.rglob("*") if path.is_file())
+    return sorted(files)
+
+
 def _load_records_from_saju_astro_folders(graph_root: Path) -> List[Dict]:
     # Reuse existing graph parsing logic to stay aligned with query-side preprocessing.
     from app.saju_astro_rag import _load_from_folder  # pylint: disable=import-outside-toplevel
 
-    target_folders = [
-        ("saju", graph_root / "saju"),
-        ("saju_literary", graph_root / "saju_literary"),
-        ("astro", graph_root / "astro"),
-        ("astro_database", graph_root / "astro_database"),
-    ]
-
     records: List[Dict] = []
-    for source, folder in target_folders:
+    for source in SOURCE_FOLDERS:
+        folder = graph_root / source
         if folder.is_dir():
             _load_from_folder(folder, records, source)
     return records
@@ -262,15 +271,35 @@ def reindex(
     batch_size: int,
     reset: bool,
     smoke_query: str | None,
+    embedder: str | None = None,
+    token_budget: int | None = 8192,
+    memory_ceiling_mb: float | None = None,
+    bulk_load: bool = False,
+    vector_sidecar: str | None = None,
 ) -> None:
+    """token_budget=None auto-tunes it; a memory ceiling (or auto) enables the back-off guard.
+
+    bulk_load (full reindex only) writes large chunks straight into the target
+    under bulk HNSW settings via chroma_bulk instead of index_nodes per batch,
+    then restores the normal settings. vector_sidecar
+    (int8/float16) writes a quantized_index sidecar from the finished collection.
+    """
     from app.rag.vector_store import VectorStoreManager  # pylint: disable=import-outside-toplevel
-    from app.saju_astro_rag import get_model  # pylint: disable=import-outside-toplevel
+    from batch_autotune import MemoryGuard, autotune_token_budget, resolve_memory_ceiling  # pylint: disable=import-outside-toplevel
+    from embedding_backends import as_float32, encode_docs, load_embedder, model_identity  # pylint: disable=import-outside-toplevel
+    from pipeline_profiling import stage  # pylint: disable=import-outside-toplevel
+
+    def _load_model():
+        from app.saju_astro_rag import get_model  # pylint: disable=import-outside-toplevel
+
+        return get_model(prefer_multilingual=True)
 
     print(f"[reindex] graph_root={graph_root}")
     print(f"[reindex] collection={collection_name}")
     print(f"[reindex] domain={DOMAIN_NAME}")
 
-    raw_nodes = build_saju_astro_nodes(graph_root)
+    with stage("load"):
+        raw_nodes = build_saju_astro_nodes(graph_root)
     print(f"[reindex] raw_nodes={len(raw_nodes)}")
 
     docs: List[str] = []
@@ -278,25 +307,26 @@ def reindex(
     ids: List[str] = []
     seen_ids: set[str] = set()
     skipped_duplicates = 0
-    for idx, node in enumerate(raw_nodes, start=1):
-        doc, meta = _doc_from_node(node, idx)
-        # Skip unusable records
-        if "description:" not in doc or len(doc.strip()) < 20:
-            continue
+    with stage("parse"):
+        for idx, node in enumerate(raw_nodes, start=1):
+            doc, meta = _doc_from_node(node, idx)
+            # Skip unusable records
+            if "description:" not in doc or len(doc.strip()) < 20:
+                continue
 
-        # Deterministic IDs make upsert idempotent across reindex runs.
-        desc = _extract_desc(node)
-        source = _clean_text(node.get("source")) or "saju_astro"
-        title = _extract_title(node, idx)
-        uniq_id = _build_stable_id(node, title=title, desc=desc, source=source)
-        if uniq_id in seen_ids:
-            skipped_duplicates += 1
-            continue
-        seen_ids.add(uniq_id)
+            # Deterministic IDs make upsert idempotent across reindex runs.
+            desc = _extract_desc(node)
+            source = _clean_text(node.get("source")) or "saju_astro"
+            title = _extract_title(node, idx)
+            uniq_id = _build_stable_id(node, title=title, desc=desc, source=source)
+            if uniq_id in seen_ids:
+                skipped_duplicates += 1
+                continue
+            seen_ids.add(uniq_id)
 
-        ids.append(uniq_id)
-        docs.append(doc)
-        metas.append(meta)
+            ids.append(uniq_id)
+            docs.append(doc)
+            metas.append(meta)
 
     print(f"[reindex] indexable_docs={len(docs)}")
     print(f"[reindex] skipped_duplicates={skipped_duplicates}")
@@ -304,57 +334,106 @@ def reindex(
         raise RuntimeError("No indexable Saju+Astro nodes found.")
 
     vs = VectorStoreManager(persist_dir=persist_dir, collection_name=collection_name)
+    writer = None
     if reset:
-        vs.reset()
+        from chroma_bulk import recreate_for_bulk, recreate_with_metadata  # pylint: disable=import-outside-toplevel
+        from hnsw_params import hnsw_metadata  # pylint: disable=import-outside-toplevel
 
-    model = get_model(prefer_multilingual=True)
+        vs.reset()
+        # Swept M / construction_ef / search_ef (scripts/hnsw_sweep.py), if any.
+        tuned = hnsw_metadata(collection_name)
+        if bulk_load:
+            writer = recreate_for_bulk(vs.collection, persist_dir, extra=tuned)
+            vs.collection = writer.collection
+            print(f"[reindex] bulk_load=on bulk_hnsw={writer.restore} write_batch={writer.write_batch}")
+        elif tuned:
+            vs.collection = recreate_with_metadata(vs.collection, tuned, persist_dir)
+            print(f"[reindex] hnsw params={tuned}")
+    elif bulk_load:
+        print("[reindex] --bulk-load needs --reset; using per-batch writes")
+
+    with stage("load"):
+        model = load_embedder(_load_model, backend=embedder)
+
+    guard = None
+    if token_budget is None or memory_ceiling_mb:
+        guard = MemoryGuard(resolve_memory_ceiling(memory_ceiling_mb))
+    if token_budget is None:
+        token_budget = autotune_token_budget(model, docs, guard.ceiling_mb)
 
     total = len(docs)
     indexed = 0
-    for start in range(0, total, batch_size):
-        end = min(start + batch_size, total)
+    start = 0
+    while start < total:
+        if guard is not None:
+            guard.check()
+        end = min(start + (guard.scaled(batch_size, floor=32) if guard else batch_size), total)
         batch_docs = docs[start:end]
         batch_ids = ids[start:end]
         batch_meta = metas[start:end]
 
-        embeds = model.encode(
-            batch_docs,
-            batch_size=min(64, len(batch_docs)),
-            convert_to_tensor=False,
-            normalize_embeddings=True,
-            show_progress_bar=False,
-        )
-        batch_embeds = embeds.tolist() if hasattr(embeds, "tolist") else embeds
-        vs.index_nodes(
-            ids=batch_ids,
-            texts=batch_docs,
-            embeddings=batch_embeds,
-            metadatas=batch_meta,
-            batch_size=len(batch_ids),
-        )
+        batch_embeds = encode_docs(model, batch_docs, token_budget=token_budget, guard=guard)
+        with stage("write"):
+            if writer is not None:
+                writer.add(ids=batch_ids, documents=batch_docs, embeddings=batch_embeds, metadatas=batch_meta)
+            else:
+                vs.index_nodes(
+                    ids=batch_ids,
+                    texts=batch_docs,
+                    embeddings=batch_embeds,
+                    metadatas=batch_meta,
+                    batch_size=len(batch_ids),
+                )
         indexed += len(batch_ids)
+        start = end
         print(f"[reindex] indexed {indexed}/{total}")
 
+    if writer is not None:
+        with stage("write"):
+            writer.finalize()
+
     count = vs.collection.count()
     print(f"[reindex] collection_count={count}")
     if count == 0:
         raise RuntimeError("Indexing finished but collection count is 0.")
 
+    from collection_stats import compute_stats, write_stats  # pylint: disable=import-outside-toplevel
+
+    with stage("write"):
+        stats_path = write_stats(
+            compute_stats(collection_name, docs, metas, model_identity(model), _source_files(graph_root), persist_dir)
+        )
+    print(f"[reindex] stats={stats_path}")
+
+    if vector_sidecar:
+        from quantized_index import DEFAULT_SIDECAR_DIR, build_sidecar  # pylint: disable=import-outside-toplevel
+
+        with stage("write"):
+            sidecar = build_sidecar(vs.collection, vector_sidecar)
+        print(
+            f"[reindex] sidecar={vector_sidecar} dir={DEFAULT_SIDECAR_DIR / collection_name} "
+            f"resident={sidecar.code_mb:.1f}MB float32={sidecar.full_mb:.1f}MB"
+        )
+
     if smoke_query:
         print(f"[smoke] query={smoke_query}")
-        q_emb = model.encode(
+        from query_embedding_cache import encode_queries  # pylint: disable=import-outside-toplevel
+
+        q_emb = encode_queries(
+            model,
             smoke_query,
             convert_to_tensor=False,
             normalize_embeddings=True,
             show_progress_bar=False,
         )
-        q_vec = q_emb.tolist() if hasattr(q_emb, "tolist") else q_emb
-        results = vs.search(
-            query_embedding=q_vec,
-            top_k=5,
-            min_score=0.1,
-            where={"domain": DOMAIN_NAME},
-        )
+        q_vec = as_float32(q_emb).tolist()
+        with stage("query"):
+            results = vs.search(
+                query_embedding=q_vec,
+                top_k=5,
+                min_score=0.1,
+                where={"domain": DOMAIN_NAME},
+            )
         print(f"[smoke] result_count={len(results)}")
         for i, r in enumerate(results, start=1):
             m = r.get("metadata") or {}
@@ -364,6 +443,8 @@ def reindex(
 
 
 def main() -> None:
+    from batch_autotune import parse_token_budget  # pylint: disable=import-outside-toplevel
+
     repo_root = Path(__file__).resolve().parents[1]
     default_graph_root = repo_root / "backend_ai" / "data" / "graph"
     default_persist_dir = str(repo_root / "backend_ai" / "data" / "chromadb")
@@ -376,6 +457,38 @@ def main() -> None:
     parser.add_argument("--smoke-query", default=None, help="Optional smoke test query after indexing.")
     parser.add_argument("--reset", dest="reset", action="store_true", help="Reset collection before indexing.")
     parser.add_argument("--no-reset", dest="reset", action="store_false", help="Append/upsert without reset.")
+    parser.add_argument(
+        "--embedder",
+        choices=["model", "onnx", "fake"],
+        default=None,
+        help="Embedder backend (default: $RAG_EMBEDDER_BACKEND or model). onnx = int8 ONNX Runtime, fake = offline hash embedder.",
+    )
+    parser.add_argument(
+        "--token-budget",
+        type=parse_token_budget,
+        default=8192,
+        help="Padded tokens per encode call; docs are length-bucketed under it "
+        "(0 = fixed 64-doc batches, auto = probe throughput/RSS and pick).",
+    )
+    parser.add_argument(
+        "--memory-ceiling-mb",
+        type=float,
+        default=None,
+        help="Back off batch sizes when RSS nears this (default with auto: $RAG_MEMORY_CEILING_MB or 80%% of RAM).",
+    )
+    parser.add_argument(
+        "--bulk-load",
+        action="store_true",
+        help="Full reindex only: write large chunks under bulk HNSW batch/sync settings, then restore the "
+        "normal settings (Chroma >= 1.0; older Chroma only gets the large chunks).",
+    )
+    parser.add_argument(
+        "--vector-sidecar",
+        choices=["int8", "float16"],
+        default=None,
+        help="Also write a reduced-precision sidecar (quantized first stage + float rescoring); "
+        "gate with scripts/quantized_recall_check.py.",
+    )
     parser.set_defaults(reset=True)
     args = parser.parse_args()
 
@@ -386,8 +499,15 @@ def main() -> None:
         batch_size=args.batch_size,
         reset=args.reset,
         smoke_query=args.smoke_query,
+        embedder=args.embedder,
+        token_budget=args.token_budget,
+        memory_ceiling_mb=args.memory_ceiling_mb,
+        bulk_load=args.bulk_load,
+        vector_sidecar=args.vector_sidecar,
     )
 
 
 if __name__ == "__main__":
-    main()
+    from pipeline_profiling import run_profiled  # pylint: disable=import-outside-toplevel
+
+    run_profiled("reindex_saju_astro_graph_nodes", main)
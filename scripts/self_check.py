@@ -24,10 +24,14 @@ from io import StringIO
 from pathlib import Path
 from typing import Dict, List, Optional
 
+from collection_stats import is_fresh, load_stats, missing_count
+from pipeline_profiling import run_profiled, stage
+
 
 REPO_ROOT = Path(__file__).resolve().parents[1]
 BACKEND_AI_ROOT = REPO_ROOT / "backend_ai"
 CHROMA_DIR = REPO_ROOT / "backend_ai" / "data" / "chromadb"
+SCRIPTS_DIR = Path(__file__).resolve().parent
 
 if str(REPO_ROOT) not in sys.path:
     sys.path.insert(0, str(REPO_ROOT))
@@ -117,6 +121,7 @@ def _sample_collection(client, col_name: str, sample_size: int = 200) -> Dict[st
         "axis_missing": 0,
         "fusion_missing": 0,
         "avg_len": 0.0,
+        "source": "sampled",
     }
     try:
         col = client.get_collection(col_name)
@@ -166,6 +171,30 @@ def _sample_collection(client, col_name: str, sample_size: int = 200) -> Dict[st
     return out
 
 
+def _sidecar_collection(client, col_name: str) -> Optional[Dict[str, object]]:
+    """_sample_collection's fields from the index-time stats sidecar; None when missing or stale."""
+    stats = load_stats(col_name)
+    if stats is None:
+        return None
+    try:
+        count = client.get_collection(col_name).count()
+    except Exception:
+        return None
+    if not is_fresh(stats, count, CHROMA_DIR):
+        return None
+    return {
+        "exists": True,
+        "count": count,
+        "sample_n": count,
+        "empty_docs": stats["short_docs"],
+        "domain_missing": missing_count(stats, "domain"),
+        "axis_missing": missing_count(stats, "theme_or_axis"),
+        "fusion_missing": missing_count(stats, "fusion_key"),
+        "avg_len": stats["doc_length"]["mean"],
+        "source": "sidecar",
+    }
+
+
 def health_check() -> CheckResult:
     errors: List[str] = []
     warnings: List[str] = []
@@ -195,7 +224,7 @@ def health_check() -> CheckResult:
             seen.add(name)
 
     for col_name in ordered_targets:
-        sample = _sample_collection(client, col_name)
+        sample = _sidecar_collection(client, col_name) or _sample_collection(client, col_name)
         exists = sample["exists"]
         count = sample["count"]
         sample_n = sample["sample_n"]
@@ -215,6 +244,7 @@ def health_check() -> CheckResult:
             f"{domain_missing_pct:.1f}%",
             f"{axis_missing_pct:.1f}%" if col_name == "saju_astro_cross_v1" else "-",
             f"{fusion_missing_pct:.1f}%" if col_name == "saju_astro_cross_v1" else "-",
+            sample["source"] if exists else "-",
         ])
 
         metrics[col_name] = sample
@@ -231,7 +261,7 @@ def health_check() -> CheckResult:
 
     table_lines = _print_table(
         "Health",
-        ["collection", "exists", "count", "empty_docs%", "domain_missing%", "axis_missing%", "fusion_missing%"],
+        ["collection", "exists", "count", "empty_docs%", "domain_missing%", "axis_missing%", "fusion_missing%", "stats"],
         rows,
     )
 
@@ -458,16 +488,18 @@ import os
 import sys
 os.environ["USE_CHROMADB"] = "1"
 os.environ["EXCLUDE_NON_SAJU_ASTRO"] = "1"
-from backend_ai.app.rag.cross_store import build_cross_summary
+from cross_batch import CrossItem, build_cross_summaries
 queries = json.loads(sys.stdin.read())
-out = []
-for q in queries:
-    s = build_cross_summary(
+batch = [
+    CrossItem(
         q,
         saju_seed=["ê°‘", "ëª©", "ìˆ˜", "ë¹„ê²¬"],
         astro_seed=["Sun", "Moon", "Pisces"],
-        top_k=12,
     )
+    for q in queries
+]
+out = []
+for s in build_cross_summaries(batch, top_k=12):
     lines = [line.strip() for line in s.splitlines() if line.strip()]
     hit = False
     for i, line in enumerate(lines[:-1]):
@@ -485,6 +517,7 @@ print(json.dumps(out, ensure_ascii=False))
 """
     env = dict(os.environ)
     env["PYTHONIOENCODING"] = "utf-8"
+    env["PYTHONPATH"] = os.pathsep.join(p for p in (str(SCRIPTS_DIR), env.get("PYTHONPATH", "")) if p)
     proc = subprocess.run(
         [sys.executable, "-c", probe],
         input=payload,
@@ -497,7 +530,7 @@ print(json.dumps(out, ensure_ascii=False))
     if proc.returncode != 0:
         return [False for _ in queries]
     try:
-        data = json.loads(proc.stdout.strip() or "[]")
+        data = json.loads((proc.stdout.strip().splitlines() or ["[]"])[-1])
         return [bool(v) for v in data]
     except Exception:
         return [False for _ in queries]
@@ -512,7 +545,7 @@ import sys
 os.environ["USE_CHROMADB"] = "1"
 os.environ["EXCLUDE_NON_SAJU_ASTRO"] = "1"
 os.environ["CROSS_ADVANCED"] = "1"
-from backend_ai.app.rag.cross_store import build_cross_summary
+from cross_batch import CrossItem, build_cross_summaries
 
 saju = {
     "dayMaster": {"heavenlyStem": "갑", "element": "목"},
@@ -573,17 +606,17 @@ total_groups = 0
 groups_with_advanced_links = 0
 groups_complete = 0
 empty_advanced_link_count = 0
-for q in queries:
-    _summary, grouped = build_cross_summary(
+batch = [
+    CrossItem(
         q,
         saju_seed=["갑", "목", "수", "비견"],
         astro_seed=["Cancer", "Pisces", "Scorpio"],
         saju_json=saju,
         astro_json=astro,
-        top_k=12,
-        max_groups=3,
-        return_meta=True,
     )
+    for q in queries
+]
+for _summary, grouped in build_cross_summaries(batch, top_k=12, max_groups=3, return_meta=True):
     for axis, items in grouped:
         if not items:
             continue
@@ -622,6 +655,7 @@ print(json.dumps({
 """
     env = dict(os.environ)
     env["PYTHONIOENCODING"] = "utf-8"
+    env["PYTHONPATH"] = os.pathsep.join(p for p in (str(SCRIPTS_DIR), env.get("PYTHONPATH", "")) if p)
     proc = subprocess.run(
         [sys.executable, "-c", probe],
         input=payload,
@@ -641,7 +675,7 @@ print(json.dumps({
             "empty_advanced_link_count": len(queries),
         }
     try:
-        data = json.loads(proc.stdout.strip() or "{}")
+        data = json.loads((proc.stdout.strip().splitlines() or ["{}"])[-1])
         return {
             "total_groups": int(data.get("total_groups", 0) or 0),
             "groups_with_advanced_links": int(data.get("groups_with_advanced_links", 0) or 0),
@@ -807,12 +841,33 @@ def _print_section(result: CheckResult) -> None:
             print(f"- {warn}")
 
 
+def _prefetch_cache_lines() -> List[str]:
+    from prefetch_cache import cache_stats
+
+    stats = cache_stats()
+    rows = [[
+        str(int(stats["entries"])),
+        f"{stats['hit_rate'] * 100:.1f}%",
+        f"memory={int(stats['memory_hits'])}, disk={int(stats['disk_hits'])}",
+        str(int(stats["misses"])),
+        str(int(stats["expired"])),
+        f"{stats['avg_hit_ms']:.1f}",
+        f"{stats['avg_miss_ms']:.1f}",
+    ]]
+    return _print_table(
+        "Prefetch cache",
+        ["entries", "hit_rate", "hits", "misses", "expired", "avg_hit_ms", "avg_miss_ms"],
+        rows,
+    )
+
+
 def _next_actions(overall: str, health: CheckResult, leak: CheckResult, quality: CheckResult) -> List[str]:
     actions: List[str] = []
     if overall == "PASS":
         return actions
 
     if health.status != "PASS":
+        actions.append("Fast path (prebuilt snapshots): python scripts\\chroma_snapshot.py import --replace")
         actions.append("Reindex graph: python scripts\\reindex_saju_astro_graph_nodes.py --no-reset")
         actions.append("Reindex cross: python scripts\\reindex_saju_astro_cross.py --no-reset")
         actions.append("Check collection names in backend_ai/app/saju_astro_rag.py and backend_ai/app/rag/cross_store.py")
@@ -840,9 +895,12 @@ def main() -> int:
     print("backend_ai self-check running...")
     print(f"chroma_dir={CHROMA_DIR}")
 
-    health = health_check()
-    leak = leak_check()
-    quality = quality_check(runtime_evidence=args.runtime_evidence)
+    with stage("health"):
+        health = health_check()
+    with stage("leak"):
+        leak = leak_check()
+    with stage("quality"):
+        quality = quality_check(runtime_evidence=args.runtime_evidence)
 
     print()
     _print_section(health)
@@ -850,6 +908,8 @@ def main() -> int:
     _print_section(leak)
     print()
     _print_section(quality)
+    print()
+    print("\n".join(_prefetch_cache_lines()))
 
     overall = _merge_status(health.status, leak.status, quality.status)
     icon = "âœ…" if overall == "PASS" else ("âš ï¸" if overall == "WARN" else "âŒ")
@@ -866,6 +926,6 @@ def main() -> int:
 
 
 if __name__ == "__main__":
-    raise SystemExit(main())
+    raise SystemExit(run_profiled("self_check", main))
 
 
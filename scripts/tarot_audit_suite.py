@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+"""
+Run the four tarot audits concurrently, then the threshold check.
+
+Imports backend_ai and warms the spread loader once, then runs coverage,
+router eval, e2e smoke and deck validation on a pool. On POSIX the pool
+forks worker processes, which inherit the already-imported modules (CPU-bound
+audits run in parallel). Elsewhere it falls back to threads; e2e smoke
+installs process-global patch() stubs, so in thread mode it runs on its own
+after the pooled audits finish. Artifacts are
+written to the same default paths the standalone scripts use, so
+tarot_audit_threshold_check.py and CI keep working unchanged.
+"""
+
+from __future__ import annotations
+
+import argparse
+import multiprocessing
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from pipeline_profiling import add_counters, run_profiled, stage
+from tarot_audit_common import ensure_artifacts_dir, write_json
+
+import tarot_audit_threshold_check
+import tarot_coverage_audit
+import tarot_deck_validate
+import tarot_e2e_smoke
+import tarot_router_eval
+from backend_ai.app.tarot.spread_loader import get_spread_loader
+
+AUDITS = {
+    "coverage": tarot_coverage_audit.main,
+    "router": tarot_router_eval.main,
+    "e2e": tarot_e2e_smoke.main,
+    "deck": tarot_deck_validate.main,
+}
+# Audits that patch process-global state while running; never run them on a thread beside others.
+PATCHES_GLOBALS = ("e2e",)
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Run tarot audits concurrently and check thresholds")
+    parser.add_argument("--executor", choices=["auto", "process", "thread"], default="auto")
+    parser.add_argument("--only", action="append", choices=sorted(AUDITS), help="Run a subset (repeatable)")
+    parser.add_argument("--router-workers", type=int, default=1, help="Passed to tarot_router_eval --workers")
+    parser.add_argument("--e2e-sample-size", type=int, default=None, help="Passed to tarot_e2e_smoke --sample-size")
+    parser.add_argument("--max-missing", type=int, default=0)
+    parser.add_argument("--max-router-anomaly-rate", type=float, default=0.01)
+    parser.add_argument("--skip-threshold", action="store_true")
+    parser.add_argument("--output-json", default="artifacts/audit_suite_summary.json")
+    return parser.parse_args()
+
+
+def _audit_argv(name: str, args: argparse.Namespace) -> List[str]:
+    if name == "router":
+        return ["--workers", str(args.router_workers)]
+    if name == "e2e" and args.e2e_sample_size:
+        return ["--sample-size", str(args.e2e_sample_size)]
+    return []
+
+
+def _run_audit(name: str, argv: List[str]) -> Tuple[str, int, float, Optional[str]]:
+    started = time.perf_counter()
+    try:
+        code = int(AUDITS[name](argv) or 0)
+        error = None
+    except SystemExit as exc:
+        code = exc.code if isinstance(exc.code, int) else 1
+        error = None if code == 0 else str(exc)
+    except Exception as exc:  # report and keep the other audits going
+        code = 1
+        error = f"{type(exc).__name__}: {exc}"
+    return name, code, time.perf_counter() - started, error
+
+
+def _make_executor(kind: str, workers: int) -> Tuple[Executor, str]:
+    if kind == "auto":
+        kind = "process" if "fork" in multiprocessing.get_all_start_methods() else "thread"
+    if kind == "process":
+        ctx = multiprocessing.get_context("fork")
+        return ProcessPoolExecutor(max_workers=workers, mp_context=ctx), "process(fork)"
+    return ThreadPoolExecutor(max_workers=workers), "thread"
+
+
+def main() -> int:
+    args = parse_args()
+    names = args.only or list(AUDITS)
+
+    started = time.perf_counter()
+    with stage("load"):
+        get_spread_loader()  # warm the shared singleton before forking
+        ensure_artifacts_dir()
+    warmup_sec = time.perf_counter() - started
+
+    executor, mode = _make_executor(args.executor, len(names))
+    serial = [name for name in names if mode == "thread" and name in PATCHES_GLOBALS]
+    results: Dict[str, Dict] = {}
+    # Audits may run in forked workers, outside this process's profile; report
+    # each one's wall time as a counter instead of a stage.
+    add_counters("audit_wall_sec", lambda: {name: r["wall_sec"] for name, r in results.items()})
+
+    def _record(name: str, code: int, elapsed: float, error: Optional[str]) -> None:
+        results[name] = {"exit_code": code, "wall_sec": round(elapsed, 3), "error": error}
+        status = "ok" if code == 0 else "FAIL"
+        print(f"[audit_suite] {name} {status} {elapsed:.2f}s" + (f" ({error})" if error else ""))
+
+    with stage("audits"), executor:
+        futures = [executor.submit(_run_audit, name, _audit_argv(name, args)) for name in names if name not in serial]
+        for future in as_completed(futures):
+            _record(*future.result())
+    with stage("audits"):
+        for name in serial:
+            _record(*_run_audit(name, _audit_argv(name, args)))
+    audits_sec = time.perf_counter() - started - warmup_sec
+
+    threshold_code = None
+    if not args.skip_threshold and not args.only:
+        with stage("threshold"):
+            threshold_code = tarot_audit_threshold_check.main(
+                [
+                    "--max-missing", str(args.max_missing),
+                    "--max-router-anomaly-rate", str(args.max_router_anomaly_rate),
+                ]
+            )
+
+    total_sec = time.perf_counter() - started
+    audit_failed = any(r["exit_code"] != 0 for r in results.values())
+    summary = {
+        "executor": mode,
+        "warmup_sec": round(warmup_sec, 3),
+        "audits_wall_sec": round(audits_sec, 3),
+        "audits_serial_sum_sec": round(sum(r["wall_sec"] for r in results.values()), 3),
+        "total_sec": round(total_sec, 3),
+        "audits": {name: results[name] for name in names},
+        "threshold": None if threshold_code is None else ("PASS" if threshold_code == 0 else "FAIL"),
+    }
+    with stage("write"):
+        write_json(Path(args.output_json), summary)
+
+    print(f"[audit_suite] executor={mode} warmup={warmup_sec:.2f}s audits={audits_sec:.2f}s total={total_sec:.2f}s")
+    for name in names:
+        r = results[name]
+        print(f"- {name}: exit={r['exit_code']} wall={r['wall_sec']:.2f}s")
+    if summary["threshold"]:
+        print(f"- threshold: {summary['threshold']}")
+    print(f"[audit_suite] wrote: {args.output_json}")
+    return 1 if audit_failed or (threshold_code or 0) != 0 else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(run_profiled("tarot_audit_suite", main))
@@ -8,9 +8,12 @@ from __future__ import annotations
 import argparse
 import json
 from pathlib import Path
+from typing import List, Optional
 
+from pipeline_profiling import run_profiled
 
-def parse_args() -> argparse.Namespace:
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
     parser = argparse.ArgumentParser(description="Check tarot audit thresholds")
     parser.add_argument("--coverage-report", default="artifacts/coverage_report.json")
     parser.add_argument("--router-report", default="artifacts/router_eval_report.json")
@@ -18,15 +21,15 @@ def parse_args() -> argparse.Namespace:
     parser.add_argument("--deck-report-md", default="artifacts/deck_validation_report.md")
     parser.add_argument("--max-missing", type=int, default=0)
     parser.add_argument("--max-router-anomaly-rate", type=float, default=0.01)
-    return parser.parse_args()
+    return parser.parse_args(argv)
 
 
 def _load_json(path: Path) -> dict:
     return json.loads(path.read_text(encoding="utf-8"))
 
 
-def main() -> int:
-    args = parse_args()
+def main(argv: Optional[List[str]] = None) -> int:
+    args = parse_args(argv)
     errors = []
 
     coverage = _load_json(Path(args.coverage_report))
@@ -64,5 +67,5 @@ def main() -> int:
 
 
 if __name__ == "__main__":
-    raise SystemExit(main())
+    raise SystemExit(run_profiled("tarot_audit_threshold_check", main))
 
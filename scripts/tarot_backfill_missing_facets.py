@@ -10,6 +10,7 @@ import json
 from pathlib import Path
 from typing import Dict, List, Set, Tuple
 
+from pipeline_profiling import run_profiled, stage
 from tarot_pipeline_utils import DEFAULT_CORPUS_PATH, load_jsonl_records, make_doc_id
 
 
@@ -140,10 +141,11 @@ def main() -> int:
     output_path = Path(args.output_path)
     ci_path = Path(args.complete_interpretations_path)
 
-    records = load_jsonl_records(corpus_path)
-    missing = _load_missing(coverage_path)
-    card_idx = _build_card_index(records)
-    ci_cards = _load_complete_interpretations(ci_path) if ci_path.exists() else {}
+    with stage("load"):
+        records = load_jsonl_records(corpus_path)
+        missing = _load_missing(coverage_path)
+        card_idx = _build_card_index(records)
+        ci_cards = _load_complete_interpretations(ci_path) if ci_path.exists() else {}
 
     existing_keys: Set[Tuple[str, str, str]] = set()
     existing_doc_ids: Set[str] = set()
@@ -216,10 +218,11 @@ def main() -> int:
     merged = list(records) + backfilled
     merged.sort(key=lambda r: str(r.get("doc_id") or ""))
 
-    output_path.parent.mkdir(parents=True, exist_ok=True)
-    with output_path.open("w", encoding="utf-8", newline="\n") as f:
-        for row in merged:
-            f.write(json.dumps(row, ensure_ascii=False) + "\n")
+    with stage("write"):
+        output_path.parent.mkdir(parents=True, exist_ok=True)
+        with output_path.open("w", encoding="utf-8", newline="\n") as f:
+            for row in merged:
+                f.write(json.dumps(row, ensure_ascii=False) + "\n")
 
     print(f"[backfill] input_records={len(records)}")
     print(f"[backfill] missing_requested={len(missing)}")
@@ -230,4 +233,4 @@ def main() -> int:
 
 
 if __name__ == "__main__":
-    raise SystemExit(main())
+    raise SystemExit(run_profiled("tarot_backfill_missing_facets", main))
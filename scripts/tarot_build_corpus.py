@@ -17,6 +17,7 @@ import json
 from pathlib import Path
 from typing import Dict, List
 
+from pipeline_profiling import run_profiled, stage
 from tarot_pipeline_utils import load_combo_source_stats, make_doc_id
 
 
@@ -194,17 +195,20 @@ def main() -> int:
     dst = Path(args.output_jsonl)
     dst.parent.mkdir(parents=True, exist_ok=True)
 
-    data = json.loads(src.read_text(encoding="utf-8-sig"))
-    records = _build_records(
-        data,
-        version=args.version,
-        combo_mode=args.combo_mode,
-        combo_source_csv=combo_source_csv,
-    )
-
-    with dst.open("w", encoding="utf-8", newline="\n") as f:
-        for row in records:
-            f.write(json.dumps(row, ensure_ascii=False) + "\n")
+    with stage("load"):
+        data = json.loads(src.read_text(encoding="utf-8-sig"))
+    with stage("parse"):
+        records = _build_records(
+            data,
+            version=args.version,
+            combo_mode=args.combo_mode,
+            combo_source_csv=combo_source_csv,
+        )
+
+    with stage("write"):
+        with dst.open("w", encoding="utf-8", newline="\n") as f:
+            for row in records:
+                f.write(json.dumps(row, ensure_ascii=False) + "\n")
 
     combo_stats = load_combo_source_stats()
     card_count = sum(1 for r in records if r["doc_type"] == "card")
@@ -231,4 +235,4 @@ def main() -> int:
 
 
 if __name__ == "__main__":
-    raise SystemExit(main())
+    raise SystemExit(run_profiled("tarot_build_corpus", main))
@@ -14,6 +14,7 @@ import json
 from pathlib import Path
 from typing import Dict, List
 
+from pipeline_profiling import run_profiled, stage
 from tarot_pipeline_utils import DEFAULT_CORPUS_PATH, load_jsonl_records
 
 
@@ -160,19 +161,22 @@ def _write_jsonl(path: Path, rows: List[Dict]):
 
 def main() -> int:
     args = parse_args()
-    records = load_jsonl_records(Path(args.corpus_path))
+    with stage("load"):
+        records = load_jsonl_records(Path(args.corpus_path))
 
-    auto_samples = _build_auto_samples(records, max_card_samples=args.max_auto_card_samples)
-    realstyle_samples = _build_realstyle_samples(records, n=args.realstyle_samples)
-    realstyle_draws_samples = _build_realstyle_draws_samples(records, n=args.realstyle_samples)
+    with stage("parse"):
+        auto_samples = _build_auto_samples(records, max_card_samples=args.max_auto_card_samples)
+        realstyle_samples = _build_realstyle_samples(records, n=args.realstyle_samples)
+        realstyle_draws_samples = _build_realstyle_draws_samples(records, n=args.realstyle_samples)
 
     auto_out = Path(args.auto_output_path)
     realstyle_out = Path(args.realstyle_output_path)
     realstyle_draws_out = Path(args.realstyle_draws_output_path)
 
-    _write_jsonl(auto_out, auto_samples)
-    _write_jsonl(realstyle_out, realstyle_samples)
-    _write_jsonl(realstyle_draws_out, realstyle_draws_samples)
+    with stage("write"):
+        _write_jsonl(auto_out, auto_samples)
+        _write_jsonl(realstyle_out, realstyle_samples)
+        _write_jsonl(realstyle_draws_out, realstyle_draws_samples)
 
     print(f"[tarot_build_eval_dataset] wrote auto={auto_out} samples={len(auto_samples)}")
     print(f"[tarot_build_eval_dataset] wrote realstyle={realstyle_out} samples={len(realstyle_samples)}")
@@ -184,4 +188,4 @@ def main() -> int:
 
 
 if __name__ == "__main__":
-    raise SystemExit(main())
+    raise SystemExit(run_profiled("tarot_build_eval_dataset", main))
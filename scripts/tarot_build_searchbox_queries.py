@@ -11,6 +11,8 @@ import random
 from pathlib import Path
 from typing import Dict, List
 
+from pipeline_profiling import run_profiled, stage
+
 
 BASE_SEEDS: List[Dict] = [
     {"query": "걔 나 좋아함?", "expected_intent_class": "crush", "expected_spread_class": "crush-feelings"},
@@ -85,12 +87,14 @@ def build_rows(target_size: int, seed: int) -> List[Dict]:
 
 def main() -> int:
     args = parse_args()
-    rows = build_rows(target_size=args.target_size, seed=args.seed)
+    with stage("parse"):
+        rows = build_rows(target_size=args.target_size, seed=args.seed)
     out_path = Path(args.output_path)
-    out_path.parent.mkdir(parents=True, exist_ok=True)
-    with out_path.open("w", encoding="utf-8", newline="\n") as f:
-        for row in rows:
-            f.write(json.dumps(row, ensure_ascii=False) + "\n")
+    with stage("write"):
+        out_path.parent.mkdir(parents=True, exist_ok=True)
+        with out_path.open("w", encoding="utf-8", newline="\n") as f:
+            for row in rows:
+                f.write(json.dumps(row, ensure_ascii=False) + "\n")
     manual_count = sum(1 for r in rows if r["label_source"] == "manual")
     print(f"[searchbox] wrote {len(rows)} rows -> {out_path}")
     print(f"[searchbox] manual_labeled={manual_count}, heuristic={len(rows)-manual_count}")
@@ -98,5 +102,5 @@ def main() -> int:
 
 
 if __name__ == "__main__":
-    raise SystemExit(main())
+    raise SystemExit(run_profiled("tarot_build_searchbox_queries", main))
 
@@ -12,8 +12,9 @@ import sys
 from collections import Counter, defaultdict
 from pathlib import Path
 from statistics import mean
-from typing import Dict, List, Set, Tuple
+from typing import Dict, List, Optional, Set, Tuple
 
+from pipeline_profiling import run_profiled, stage
 from tarot_audit_common import (
     REPO_ROOT,
     ensure_artifacts_dir,
@@ -37,7 +38,7 @@ from backend_ai.app.tarot.spread_loader import get_spread_loader  # noqa: E402
 from backend_ai.app.routers.tarot_constants import TAROT_SUBTOPIC_MAPPING, TAROT_THEME_MAPPING  # noqa: E402
 
 
-def parse_args() -> argparse.Namespace:
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
     parser = argparse.ArgumentParser(description="Tarot coverage and quality audit")
     parser.add_argument("--corpus-path", default=str(DEFAULT_CORPUS_PATH))
     parser.add_argument("--min-text-len", type=int, default=300)
@@ -45,7 +46,7 @@ def parse_args() -> argparse.Namespace:
     parser.add_argument("--dup-top-n", type=int, default=30)
     parser.add_argument("--output-json", default="artifacts/coverage_report.json")
     parser.add_argument("--output-md", default="artifacts/coverage_report.md")
-    return parser.parse_args()
+    return parser.parse_args(argv)
 
 
 def _similarity(a: str, b: str) -> float:
@@ -262,23 +263,26 @@ def _to_markdown(report: Dict) -> List[str]:
     return lines
 
 
-def main() -> int:
-    args = parse_args()
+def main(argv: Optional[List[str]] = None) -> int:
+    args = parse_args(argv)
     os.environ.setdefault("PYTHONUTF8", "1")
 
-    records = load_jsonl_records(Path(args.corpus_path))
-    report = _build_report(
-        records=records,
-        min_text_len=args.min_text_len,
-        sim_threshold=args.similarity_threshold,
-        dup_top_n=args.dup_top_n,
-    )
+    with stage("load"):
+        records = load_jsonl_records(Path(args.corpus_path))
+    with stage("parse"):
+        report = _build_report(
+            records=records,
+            min_text_len=args.min_text_len,
+            sim_threshold=args.similarity_threshold,
+            dup_top_n=args.dup_top_n,
+        )
 
     ensure_artifacts_dir()
     json_out = Path(args.output_json)
     md_out = Path(args.output_md)
-    write_json(json_out, report)
-    write_markdown(md_out, _to_markdown(report))
+    with stage("write"):
+        write_json(json_out, report)
+        write_markdown(md_out, _to_markdown(report))
 
     print(f"[coverage] wrote: {json_out}")
     print(f"[coverage] wrote: {md_out}")
@@ -287,5 +291,5 @@ def main() -> int:
 
 
 if __name__ == "__main__":
-    raise SystemExit(main())
+    raise SystemExit(run_profiled("tarot_coverage_audit", main))
 
@@ -8,7 +8,9 @@ from __future__ import annotations
 import argparse
 import re
 from pathlib import Path
-from typing import Dict, List, Set
+from typing import Dict, List, Optional, Set
+
+from pipeline_profiling import run_profiled, stage
 
 REPO_ROOT = Path(__file__).resolve().parents[1]
 
@@ -24,10 +26,10 @@ def write_markdown(path: Path, lines: List[str]) -> None:
     path.write_text("\n".join(lines).rstrip() + "\n", encoding="utf-8")
 
 
-def parse_args() -> argparse.Namespace:
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
     parser = argparse.ArgumentParser(description="Validate tarot decks and card mappings")
     parser.add_argument("--output-md", default="artifacts/deck_validation_report.md")
-    return parser.parse_args()
+    return parser.parse_args(argv)
 
 
 def _extract_deck_styles(ts_text: str) -> List[str]:
@@ -88,19 +90,21 @@ def _orientation_contract_ok(interpret_route_text: str) -> bool:
     return "is_reversed: c.isReversed" in interpret_route_text and "isReversed" in interpret_route_text
 
 
-def main() -> int:
-    args = parse_args()
+def main(argv: Optional[List[str]] = None) -> int:
+    args = parse_args(argv)
     tarot_types = REPO_ROOT / "src" / "lib" / "Tarot" / "tarot.types.ts"
     tarot_data_dir = REPO_ROOT / "src" / "lib" / "Tarot" / "data"
     interpret_route = REPO_ROOT / "src" / "app" / "api" / "tarot" / "interpret" / "route.ts"
 
-    ts_text = tarot_types.read_text(encoding="utf-8")
-    interpret_text = interpret_route.read_text(encoding="utf-8")
+    with stage("load"):
+        ts_text = tarot_types.read_text(encoding="utf-8")
+        interpret_text = interpret_route.read_text(encoding="utf-8")
 
-    deck_styles = _extract_deck_styles(ts_text)
-    deck_images = _extract_back_images(ts_text)
-    card_ids = _extract_card_ids_from_data(tarot_data_dir)
-    name_issues = _extract_card_name_issues(tarot_data_dir)
+    with stage("parse"):
+        deck_styles = _extract_deck_styles(ts_text)
+        deck_images = _extract_back_images(ts_text)
+        card_ids = _extract_card_ids_from_data(tarot_data_dir)
+        name_issues = _extract_card_name_issues(tarot_data_dir)
 
     expected_ids = set(range(78))
     missing_ids = sorted(expected_ids - card_ids)
@@ -160,11 +164,12 @@ def main() -> int:
             lines.append(f"- {it}")
 
     ensure_artifacts_dir()
-    write_markdown(Path(args.output_md), lines)
+    with stage("write"):
+        write_markdown(Path(args.output_md), lines)
     print(f"[deck_validate] status={pass_fail}")
     print(f"[deck_validate] wrote: {args.output_md}")
     return 0
 
 
 if __name__ == "__main__":
-    raise SystemExit(main())
+    raise SystemExit(run_profiled("tarot_deck_validate", main))
@@ -1,20 +1,35 @@
 #!/usr/bin/env python3
 """
 E2E smoke simulator for tarot UX flow.
+
+--load-requests N switches to load-test mode: the LLM/RAG stubs are installed
+once, N generated requests are fired at /api/tarot/interpret across a thread
+or (forked) process pool, and requests/sec, latency percentiles and per-request
+allocation (tracemalloc, on a serial sample) are reported. Use --load-cprofile
+to dump a cProfile of the serial sample for hot-spot hunting in the route.
 """
 
 from __future__ import annotations
 
 import argparse
+import cProfile
 import json
+import multiprocessing
+import pstats
 import random
 import sys
+import threading
+import time
+import tracemalloc
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from contextlib import ExitStack, contextmanager
 from pathlib import Path
-from typing import Any, Dict, List
+from typing import Any, Dict, Iterator, List, Optional, Tuple
 from unittest.mock import patch
 
-from flask import Flask, g
+from flask import Flask, g, request
 
+from pipeline_profiling import percentile
 from tarot_audit_common import (
     REPO_ROOT,
     ensure_artifacts_dir,
@@ -73,7 +88,7 @@ class _DummyHybridRag:
         return {}
 
 
-def parse_args() -> argparse.Namespace:
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
     parser = argparse.ArgumentParser(description="Tarot E2E smoke simulator")
     parser.add_argument("--queries-path", default="tests/fixtures/tarot-eval/searchbox_queries.jsonl")
     parser.add_argument("--sample-size", type=int, default=100)
@@ -81,7 +96,19 @@ def parse_args() -> argparse.Namespace:
     parser.add_argument("--output-json", default="artifacts/e2e_smoke_report.json")
     parser.add_argument("--failures-dir", default="artifacts/failures")
     parser.add_argument("--max-overall-len", type=int, default=9000)
-    return parser.parse_args()
+    parser.add_argument(
+        "--load-requests",
+        type=int,
+        default=0,
+        help="Load-test mode: number of generated requests to fire (0 = correctness smoke)",
+    )
+    parser.add_argument("--load-workers", type=int, default=8)
+    parser.add_argument("--load-executor", choices=["thread", "process"], default="thread")
+    parser.add_argument("--load-warmup", type=int, default=20, help="Untimed requests per worker before measuring")
+    parser.add_argument("--load-alloc-sample", type=int, default=200, help="Serial requests traced with tracemalloc")
+    parser.add_argument("--load-cprofile", default=None, help="Write cProfile stats of the serial sample here")
+    parser.add_argument("--load-output-json", default="artifacts/e2e_load_report.json")
+    return parser.parse_args(argv)
 
 
 def _make_app() -> Flask:
@@ -145,6 +172,120 @@ def _llm_factory(payload_cards: List[Dict[str, Any]], draws: List[Dict[str, Any]
     return _fake_llm
 
 
+def _request_llm(_prompt: str, **kwargs) -> str:
+    """Fake LLM that reads cards/draws/question from the current Flask request.
+
+    Lets load mode install one generate_with_gpt4 stub for every request
+    instead of re-patching with a per-request closure.
+    """
+    body = request.get_json(silent=True) or {}
+    fake = _llm_factory(body.get("cards") or [], body.get("draws") or [], str(body.get("user_question") or ""))
+    return fake(_prompt, **kwargs)
+
+
+def _returns(value):
+    # Plain functions rather than MagicMock: mocks record every call, which
+    # skews allocation numbers and grows without bound under load.
+    def _stub(*_args, **_kwargs):
+        return value
+
+    return _stub
+
+
+@contextmanager
+def _interpret_stubs(llm) -> Iterator[None]:
+    target = "backend_ai.app.routers.tarot.interpret"
+    with ExitStack() as stack:
+        stack.enter_context(patch(f"{target}.has_tarot", new=_returns(True)))
+        stack.enter_context(patch(f"{target}.get_tarot_hybrid_rag", new=_returns(_DummyHybridRag())))
+        stack.enter_context(patch(f"{target}.get_cache", new=_returns(None)))
+        stack.enter_context(patch(f"{target}.HAS_GRAPH_RAG", False))
+        stack.enter_context(patch(f"{target}.generate_dynamic_followup_questions", new=_returns([])))
+        stack.enter_context(patch(f"{target}.generate_with_gpt4", new=llm))
+        yield
+
+
+def _build_spread_catalog() -> Tuple[Dict[tuple, Any], Optional[Dict[str, Any]]]:
+    spread_loader = get_spread_loader()
+    spread_catalog: Dict[tuple, Any] = {}
+    for theme in spread_loader.get_available_themes():
+        for st in spread_loader.get_sub_topics(theme):
+            info = spread_loader.get_spread(theme, st["id"]) or {}
+            positions = [str(p.get("title") or p.get("name") or "").strip() for p in (info.get("positions") or [])]
+            spread_catalog[(theme, st["id"])] = {
+                "theme_id": theme,
+                "spread_id": st["id"],
+                "card_count": int(info.get("card_count") or st.get("card_count") or 3),
+                "title": str(info.get("title") or st.get("title") or st["id"]),
+                "positions": positions,
+            }
+    fallback_spread = spread_catalog.get(("daily", "one_card")) or next(iter(spread_catalog.values()), None)
+    return spread_catalog, fallback_spread
+
+
+def _build_request(
+    query: str,
+    row: Dict[str, Any],
+    rng: random.Random,
+    spread_catalog: Dict[tuple, Any],
+    fallback_spread: Optional[Dict[str, Any]],
+    card_records: List[Dict],
+) -> Tuple[Dict[str, Any], List[Dict[str, Any]], List[Dict[str, Any]]]:
+    spread_id = str(row.get("expected_spread_class") or "quick-reading")
+    # Use matching frontend spread if exists, fallback to 1-card.
+    spread = None
+    for (theme, sid), spec in spread_catalog.items():
+        if sid == spread_id:
+            spread = spec
+            category = theme
+            break
+    if spread is None:
+        spread = fallback_spread
+        category = str(spread.get("theme_id") or "daily")
+    if spread is None:
+        raise RuntimeError("spread catalog fallback not found")
+
+    domain = _pick_domain(query)
+    spread_count = int(spread.get("card_count") or 1)
+    positions = list(spread.get("positions") or [])
+    if not positions:
+        positions = [f"Card {i+1}" for i in range(spread_count)]
+    sample_cards = rng.sample(card_records, k=min(spread_count, len(card_records)))
+    payload_cards = []
+    draws = []
+    for ci in range(spread_count):
+        card = sample_cards[ci % len(sample_cards)]
+        is_reversed = bool(rng.randint(0, 1))
+        orientation = "reversed" if is_reversed else "upright"
+        position = positions[ci] if ci < len(positions) else f"Card {ci+1}"
+        payload_cards.append(
+            {
+                "name": str(card.get("card_name") or ""),
+                "is_reversed": is_reversed,
+                "position": position,
+            }
+        )
+        draws.append(
+            {
+                "card_id": str(card.get("card_id") or ""),
+                "orientation": orientation,
+                "domain": domain,
+                "position": position,
+            }
+        )
+
+    request_payload = {
+        "category": category,
+        "spread_id": str(spread.get("spread_id") or "one_card"),
+        "spread_title": str(spread.get("title") or "One Card"),
+        "cards": payload_cards,
+        "draws": draws,
+        "user_question": query,
+        "language": "ko",
+    }
+    return request_payload, payload_cards, draws
+
+
 def _validate_response(resp_json: Dict[str, Any], draws: List[Dict[str, Any]], max_overall_len: int, query: str) -> List[str]:
     errors: List[str] = []
     evidence = resp_json.get("card_evidence") if isinstance(resp_json.get("card_evidence"), list) else []
@@ -173,29 +314,163 @@ def _validate_response(resp_json: Dict[str, Any], draws: List[Dict[str, Any]], m
     return errors
 
 
-def main() -> int:
-    args = parse_args()
+# ────────────────────────────────── load-test mode
+
+_THREAD_CLIENT = threading.local()
+
+
+def _thread_client():
+    client = getattr(_THREAD_CLIENT, "client", None)
+    if client is None:
+        client = _make_app().test_client()
+        _THREAD_CLIENT.client = client
+    return client
+
+
+def _fire(bodies: List[str], warmup: int) -> Tuple[List[float], Dict[str, int]]:
+    """POST every body with this worker's client; returns latencies (ms) and status counts."""
+    client = _thread_client()
+    for body in bodies[:warmup]:
+        client.post("/api/tarot/interpret", data=body, content_type="application/json")
+    latencies: List[float] = []
+    statuses: Dict[str, int] = {}
+    for body in bodies:
+        started = time.perf_counter()
+        resp = client.post("/api/tarot/interpret", data=body, content_type="application/json")
+        latencies.append((time.perf_counter() - started) * 1000.0)
+        key = str(resp.status_code)
+        statuses[key] = statuses.get(key, 0) + 1
+    return latencies, statuses
+
+
+def _alloc_profile(bodies: List[str], cprofile_path: Optional[str]) -> Dict[str, Any]:
+    """Serial pass with tracemalloc (and optionally cProfile) for per-request cost."""
+    client = _thread_client()
+    profiler = cProfile.Profile() if cprofile_path else None
+    peaks: List[int] = []
+    tracemalloc.start(25)
+    before = tracemalloc.take_snapshot()
+    try:
+        for body in bodies:
+            base, _ = tracemalloc.get_traced_memory()
+            tracemalloc.reset_peak()
+            if profiler:
+                profiler.enable()
+            client.post("/api/tarot/interpret", data=body, content_type="application/json")
+            if profiler:
+                profiler.disable()
+            _, peak = tracemalloc.get_traced_memory()
+            peaks.append(peak - base)
+        after = tracemalloc.take_snapshot()
+    finally:
+        tracemalloc.stop()
+
+    stats = after.compare_to(before, "lineno")
+    top_sites = [
+        {"site": str(stat.traceback[0]), "size_diff": stat.size_diff, "count_diff": stat.count_diff}
+        for stat in stats[:15]
+    ]
+    if profiler:
+        Path(cprofile_path).parent.mkdir(parents=True, exist_ok=True)
+        profiler.dump_stats(cprofile_path)
+        pstats.Stats(profiler).sort_stats("cumulative").print_stats(25)
+    return {
+        "requests": len(peaks),
+        "peak_bytes_per_request_mean": (sum(peaks) / len(peaks)) if peaks else 0.0,
+        "peak_bytes_per_request_p95": percentile([float(x) for x in peaks], 95),
+        "retained_top_sites": top_sites,
+    }
+
+
+def _run_load_test(
+    args: argparse.Namespace,
+    rows: List[Dict],
+    rng: random.Random,
+    spread_catalog: Dict[tuple, Any],
+    fallback_spread: Optional[Dict[str, Any]],
+    card_records: List[Dict],
+) -> int:
+    queries = [(str(r.get("query") or "").strip(), r) for r in rows]
+    queries = [(q, r) for q, r in queries if q]
+    if not queries:
+        raise SystemExit("no queries to load-test")
+
+    # Pre-serialize every request so the timed loop only measures the route.
+    bodies: List[str] = []
+    for i in range(args.load_requests):
+        query, row = queries[i % len(queries)]
+        payload, _, _ = _build_request(query, row, rng, spread_catalog, fallback_spread, card_records)
+        bodies.append(json.dumps(payload, ensure_ascii=False))
+
+    workers = max(1, args.load_workers)
+    shards = [bodies[i::workers] for i in range(workers)]
+    with _interpret_stubs(_request_llm):
+        alloc = _alloc_profile(bodies[: args.load_alloc_sample], args.load_cprofile) if args.load_alloc_sample else None
+        started = time.perf_counter()
+        if args.load_executor == "process":
+            ctx = multiprocessing.get_context("fork")  # children inherit the installed stubs
+            with ProcessPoolExecutor(max_workers=workers, mp_context=ctx) as pool:
+                outputs = list(pool.map(_fire, shards, [args.load_warmup] * workers))
+        else:
+            with ThreadPoolExecutor(max_workers=workers) as pool:
+                outputs = list(pool.map(_fire, shards, [args.load_warmup] * workers))
+        wall = time.perf_counter() - started
+
+    latencies = [ms for lat, _ in outputs for ms in lat]
+    statuses: Dict[str, int] = {}
+    for _, counts in outputs:
+        for code, n in counts.items():
+            statuses[code] = statuses.get(code, 0) + n
+    # Warmup requests are inside the wall clock but not in the latency list.
+    fired = len(latencies) + sum(min(args.load_warmup, len(shard)) for shard in shards)
+    report = {
+        "mode": "load",
+        "executor": args.load_executor,
+        "workers": workers,
+        "requests": len(latencies),
+        "wall_sec": wall,
+        "requests_per_sec": (fired / wall) if wall else 0.0,
+        "status_counts": statuses,
+        "latency_ms": {
+            "mean": (sum(latencies) / len(latencies)) if latencies else 0.0,
+            "p50": percentile(latencies, 50),
+            "p90": percentile(latencies, 90),
+            "p95": percentile(latencies, 95),
+            "p99": percentile(latencies, 99),
+            "max": max(latencies) if latencies else 0.0,
+        },
+        "allocation": alloc,
+    }
+
+    ensure_artifacts_dir()
+    Path(args.load_output_json).write_text(json.dumps(report, ensure_ascii=False, indent=2), encoding="utf-8")
+    lat = report["latency_ms"]
+    print(
+        f"[e2e_load] requests={report['requests']} workers={workers} executor={args.load_executor} "
+        f"rps={report['requests_per_sec']:.1f} p50={lat['p50']:.2f}ms p95={lat['p95']:.2f}ms p99={lat['p99']:.2f}ms"
+    )
+    if alloc:
+        print(f"[e2e_load] alloc peak/request mean={alloc['peak_bytes_per_request_mean']:.0f}B")
+    print(f"[e2e_load] status={statuses}")
+    print(f"[e2e_load] wrote: {args.load_output_json}")
+    non_200 = sum(n for code, n in statuses.items() if code != "200")
+    return 1 if non_200 else 0
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = parse_args(argv)
     rng = random.Random(args.seed)
     rows = read_jsonl(Path(args.queries_path))
-    rows = rows[: max(1, min(args.sample_size, len(rows)))]
 
-    spread_loader = get_spread_loader()
-    spread_catalog: Dict[tuple, Any] = {}
-    for theme in spread_loader.get_available_themes():
-        for st in spread_loader.get_sub_topics(theme):
-            info = spread_loader.get_spread(theme, st["id"]) or {}
-            positions = [str(p.get("title") or p.get("name") or "").strip() for p in (info.get("positions") or [])]
-            spread_catalog[(theme, st["id"])] = {
-                "theme_id": theme,
-                "spread_id": st["id"],
-                "card_count": int(info.get("card_count") or st.get("card_count") or 3),
-                "title": str(info.get("title") or st.get("title") or st["id"]),
-                "positions": positions,
-            }
-    fallback_spread = spread_catalog.get(("daily", "one_card")) or next(iter(spread_catalog.values()), None)
+    spread_catalog, fallback_spread = _build_spread_catalog()
     card_records = load_tarot_card_records()
     card_records = [r for r in card_records if not str(r.get("card_id") or "").startswith("combo:")]
 
+    if args.load_requests > 0:
+        return _run_load_test(args, rows, rng, spread_catalog, fallback_spread, card_records)
+
+    rows = rows[: max(1, min(args.sample_size, len(rows)))]
+
     app = _make_app()
     client = app.test_client()
 
@@ -216,65 +491,11 @@ def main() -> int:
         if should_require_safety_notice(query):
             safety_required += 1
 
-        spread_id = str(row.get("expected_spread_class") or "quick-reading")
-        # Use matching frontend spread if exists, fallback to 1-card.
-        spread = None
-        for (theme, sid), spec in spread_catalog.items():
-            if sid == spread_id:
-                spread = spec
-                category = theme
-                break
-        if spread is None:
-            spread = fallback_spread
-            category = str(spread.get("theme_id") or "daily")
-        if spread is None:
-            raise RuntimeError("spread catalog fallback not found")
-
-        domain = _pick_domain(query)
-        spread_count = int(spread.get("card_count") or 1)
-        positions = list(spread.get("positions") or [])
-        if not positions:
-            positions = [f"Card {i+1}" for i in range(spread_count)]
-        sample_cards = rng.sample(card_records, k=min(spread_count, len(card_records)))
-        payload_cards = []
-        draws = []
-        for ci in range(spread_count):
-            card = sample_cards[ci % len(sample_cards)]
-            is_reversed = bool(rng.randint(0, 1))
-            orientation = "reversed" if is_reversed else "upright"
-            position = positions[ci] if ci < len(positions) else f"Card {ci+1}"
-            payload_cards.append(
-                {
-                    "name": str(card.get("card_name") or ""),
-                    "is_reversed": is_reversed,
-                    "position": position,
-                }
-            )
-            draws.append(
-                {
-                    "card_id": str(card.get("card_id") or ""),
-                    "orientation": orientation,
-                    "domain": domain,
-                    "position": position,
-                }
-            )
-
-        request_payload = {
-            "category": category,
-            "spread_id": str(spread.get("spread_id") or "one_card"),
-            "spread_title": str(spread.get("title") or "One Card"),
-            "cards": payload_cards,
-            "draws": draws,
-            "user_question": query,
-            "language": "ko",
-        }
+        request_payload, payload_cards, draws = _build_request(
+            query, row, rng, spread_catalog, fallback_spread, card_records
+        )
 
-        with patch("backend_ai.app.routers.tarot.interpret.has_tarot", return_value=True), \
-            patch("backend_ai.app.routers.tarot.interpret.get_tarot_hybrid_rag", return_value=_DummyHybridRag()), \
-            patch("backend_ai.app.routers.tarot.interpret.get_cache", return_value=None), \
-            patch("backend_ai.app.routers.tarot.interpret.HAS_GRAPH_RAG", False), \
-            patch("backend_ai.app.routers.tarot.interpret.generate_dynamic_followup_questions", return_value=[]), \
-            patch("backend_ai.app.routers.tarot.interpret.generate_with_gpt4", side_effect=_llm_factory(payload_cards, draws, query)):
+        with _interpret_stubs(_llm_factory(payload_cards, draws, query)):
             resp = client.post("/api/tarot/interpret", data=json.dumps(request_payload), content_type="application/json")
 
         fail_reasons: List[str] = []
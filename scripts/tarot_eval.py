@@ -5,6 +5,18 @@ Tarot retrieval quality evaluation harness.
 Supports separate reporting for:
 - auto eval dataset (corpus-derived)
 - realstyle eval dataset (user-like queries)
+
+Retrieval modes:
+- rag (default): one DomainRAG.search call per sample (draw-aware).
+- batched: all queries embedded in one encode call (through
+  query_embedding_cache, disk tier on unless --no-embedding-cache or
+  RAG_QUERY_EMBED_CACHE says otherwise) and searched with a single
+  multi-query Chroma call. Draws are not applied in this mode.
+
+Grid mode (--top-k-grid/--min-score-grid) retrieves once at the largest k
+without a score floor and slices per grid point, so tuning does not re-query.
+--sweep adds a --context-top-n-grid axis (with defaults for all three),
+scores the whole grid with numpy in one pass and prints a comparison table.
 """
 
 from __future__ import annotations
@@ -15,9 +27,14 @@ import os
 import random
 from datetime import datetime
 from pathlib import Path
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Sequence
+
+from pipeline_profiling import run_profiled, stage
+from tarot_pipeline_utils import DEFAULT_CORPUS_PATH, PROJECT_ROOT, load_jsonl_records
 
-from tarot_pipeline_utils import DEFAULT_CORPUS_PATH, load_jsonl_records
+DEFAULT_SWEEP_TOP_K = "3,5,8,10"
+DEFAULT_SWEEP_CONTEXT_TOP_N = "1,3,5"
+DEFAULT_SWEEP_MIN_SCORE = "none,0.2,0.3,0.4"
 
 
 def parse_args() -> argparse.Namespace:
@@ -31,6 +48,53 @@ def parse_args() -> argparse.Namespace:
     parser.add_argument("--min-score", type=float, default=None)
     parser.add_argument("--sample-size", type=int, default=None, help="Evaluate first N shuffled samples per dataset")
     parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument(
+        "--retrieval",
+        choices=["rag", "batched"],
+        default="rag",
+        help="rag: DomainRAG.search per sample, batched: one encode + one multi-query Chroma search",
+    )
+    parser.add_argument("--persist-dir", default="backend_ai/data/chromadb", help="Chroma dir (batched mode)")
+    parser.add_argument("--collection-name", default="domain_tarot", help="Chroma collection (batched mode)")
+    parser.add_argument(
+        "--embedding-model-id",
+        default=None,
+        help="Query embedding model (batched mode). Default: collection metadata, then RAG_EMBEDDING_MODEL/minilm",
+    )
+    parser.add_argument(
+        "--no-embedding-cache",
+        action="store_true",
+        help="Batched mode: skip query_embedding_cache (same as RAG_QUERY_EMBED_CACHE=0)",
+    )
+    parser.add_argument(
+        "--top-k-grid",
+        default=None,
+        help="Comma-separated top_k values; evaluates every (top_k, min_score) point from one retrieval",
+    )
+    parser.add_argument(
+        "--min-score-grid",
+        default=None,
+        help="Comma-separated min_score values (use 'none' for no floor) for grid evaluation",
+    )
+    parser.add_argument(
+        "--context-top-n-grid",
+        default=None,
+        help="Comma-separated context_top_n values for grid evaluation",
+    )
+    parser.add_argument(
+        "--sweep",
+        action="store_true",
+        help=(
+            "Parameter sweep over top_k x context_top_n x min_score from one retrieval "
+            f"(defaults: top_k={DEFAULT_SWEEP_TOP_K} context_top_n={DEFAULT_SWEEP_CONTEXT_TOP_N} "
+            f"min_score={DEFAULT_SWEEP_MIN_SCORE})"
+        ),
+    )
+    parser.add_argument(
+        "--sweep-markdown",
+        default=None,
+        help="Optional path to write the sweep comparison table as Markdown",
+    )
     parser.add_argument(
         "--output-json",
         default=None,
@@ -39,6 +103,26 @@ def parse_args() -> argparse.Namespace:
     return parser.parse_args()
 
 
+def _parse_int_grid(raw: Optional[str]) -> List[int]:
+    if not raw:
+        return []
+    return sorted({int(x) for x in raw.split(",") if x.strip()})
+
+
+def _parse_score_grid(raw: Optional[str]) -> List[Optional[float]]:
+    if not raw:
+        return []
+    values: List[Optional[float]] = []
+    for token in raw.split(","):
+        token = token.strip().lower()
+        if not token:
+            continue
+        value = None if token in {"none", "null", "-"} else float(token)
+        if value not in values:
+            values.append(value)
+    return values
+
+
 def _load_eval_samples(eval_path: Path) -> List[Dict]:
     samples: List[Dict] = []
     with eval_path.open("r", encoding="utf-8-sig") as f:
@@ -94,9 +178,35 @@ def _tag_leakage_detected(query: str, expected_tags: List[str]) -> bool:
     return any(tag and tag in query_lower for tag in expected_tags)
 
 
-def _eval_one_dataset(
-    rag,
-    samples: List[Dict],
+def _prepare_samples(samples: List[Dict]) -> List[Dict]:
+    prepared: List[Dict] = []
+    for sample in samples:
+        query = str(sample.get("query") or "").strip()
+        if not query:
+            continue
+        expected_tags = [str(x).strip().lower() for x in (sample.get("expected_tags") or []) if str(x).strip()]
+        prepared.append(
+            {
+                "query": query,
+                "expected_tags": expected_tags,
+                "expected_cards": [str(x).strip() for x in (sample.get("expected_cards") or []) if str(x).strip()],
+                "draws": sample.get("draws") if isinstance(sample.get("draws"), list) else [],
+                "tag_leakage": _tag_leakage_detected(query, expected_tags),
+            }
+        )
+    return prepared
+
+
+def _slice_results(results: List[Dict], top_k: int, min_score: Optional[float]) -> List[Dict]:
+    """Apply a score floor and top_k to a result list retrieved at a larger k."""
+    if min_score is not None:
+        results = [r for r in results if float(r.get("score") or 0.0) >= min_score]
+    return results[:top_k]
+
+
+def _score_dataset(
+    prepared: List[Dict],
+    results_per_sample: Sequence[List[Dict]],
     top_k: int,
     context_top_n: int,
     min_score: Optional[float],
@@ -111,22 +221,18 @@ def _eval_one_dataset(
     draws_samples = 0
     details: List[Dict] = []
 
-    for sample in samples:
-        query = str(sample.get("query") or "").strip()
-        if not query:
-            continue
-        expected_tags = [str(x).strip().lower() for x in (sample.get("expected_tags") or []) if str(x).strip()]
-        expected_cards = [str(x).strip() for x in (sample.get("expected_cards") or []) if str(x).strip()]
-        draws = sample.get("draws") if isinstance(sample.get("draws"), list) else []
-        has_draws = len(draws) > 0
+    for sample, raw_results in zip(prepared, results_per_sample):
+        query = sample["query"]
+        expected_tags = sample["expected_tags"]
+        has_draws = len(sample["draws"]) > 0
         if has_draws:
             draws_samples += 1
 
-        leakage = _tag_leakage_detected(query, expected_tags)
+        leakage = sample["tag_leakage"]
         if leakage:
             leakage_hits += 1
 
-        results = rag.search("tarot", query, top_k=top_k, min_score=min_score, draws=draws)
+        results = _slice_results(raw_results, top_k, min_score)
         top_context = " ".join(r.get("text", "") for r in results[:context_top_n]).lower()
 
         is_zero = len(results) == 0
@@ -137,7 +243,7 @@ def _eval_one_dataset(
         if tag_hit:
             tag_hits += 1
 
-        card_hit = _expected_cards_hit(expected_cards, top_context, card_name_map)
+        card_hit = _expected_cards_hit(sample["expected_cards"], top_context, card_name_map)
         if card_hit:
             card_hits_raw += 1
         if has_draws:
@@ -180,6 +286,103 @@ def _eval_one_dataset(
     }
 
 
+def _retrieve_rag(rag, prepared: List[Dict], top_k: int, min_score: Optional[float]) -> List[List[Dict]]:
+    with stage("query"):
+        return [
+            rag.search("tarot", s["query"], top_k=top_k, min_score=min_score, draws=s["draws"])
+            for s in prepared
+        ]
+
+
+class BatchedRetriever:
+    """Embed every query in one encode call and search them with one Chroma query."""
+
+    def __init__(self, args: argparse.Namespace):
+        from chromadb import PersistentClient
+        from chromadb.config import Settings
+
+        from embedding_backends import backend_identity
+        from tarot_rebuild_chroma import _load_embedder
+
+        client = PersistentClient(path=args.persist_dir, settings=Settings(anonymized_telemetry=False))
+        self.collection = client.get_collection(args.collection_name)
+        col_meta = self.collection.metadata or {}
+        self.model_id = (
+            args.embedding_model_id
+            or str(col_meta.get("embedding_model_id") or "")
+            or os.getenv("RAG_EMBEDDING_MODEL", "minilm")
+        )
+        # Cache key: backend + ONNX precision included, so fake/int8/fp32 vectors never mix.
+        self.model_key = backend_identity(self.model_id)
+        self._encode = None
+        self._load_embedder = _load_embedder
+        if args.no_embedding_cache:
+            os.environ["RAG_QUERY_EMBED_CACHE"] = "0"
+        else:
+            os.environ.setdefault("RAG_QUERY_EMBED_CACHE", "disk")
+
+    def encode(self, texts: List[str], **_kwargs):
+        """encode()-shaped entry for encode_queries; the model is only loaded on a cache miss."""
+        if self._encode is None:
+            with stage("load"):
+                self._encode = self._load_embedder(self.model_id, is_query=True)
+        return self._encode(texts)
+
+    def embed(self, queries: List[str]) -> List[List[float]]:
+        from query_embedding_cache import encode_queries
+
+        return encode_queries(self, queries, model_id=self.model_key, is_query=True).tolist()
+
+    def retrieve(self, prepared: List[Dict], top_k: int, min_score: Optional[float]) -> List[List[Dict]]:
+        if not prepared:
+            return []
+        vectors = self.embed([s["query"] for s in prepared])
+        with stage("query"):
+            raw = self.collection.query(
+                query_embeddings=vectors,
+                n_results=top_k,
+                include=["documents", "metadatas", "distances"],
+            )
+        docs_by_query = raw.get("documents") or []
+        metas_by_query = raw.get("metadatas") or []
+        dists_by_query = raw.get("distances") or []
+        out: List[List[Dict]] = []
+        for qi in range(len(prepared)):
+            docs = docs_by_query[qi] if qi < len(docs_by_query) else []
+            metas = metas_by_query[qi] if qi < len(metas_by_query) else []
+            dists = dists_by_query[qi] if qi < len(dists_by_query) else []
+            rows = []
+            for hi, doc in enumerate(docs):
+                score = 1.0 - float(dists[hi] if hi < len(dists) else 1.0)
+                rows.append(
+                    {
+                        "text": doc or "",
+                        "metadata": metas[hi] if hi < len(metas) else {},
+                        "score": score,
+                    }
+                )
+            out.append(_slice_results(rows, top_k, min_score))
+        return out
+
+
+def _eval_one_dataset(
+    rag,
+    samples: List[Dict],
+    top_k: int,
+    context_top_n: int,
+    min_score: Optional[float],
+    card_name_map: Dict[str, str],
+    retriever: Optional[BatchedRetriever] = None,
+) -> Dict:
+    prepared = _prepare_samples(samples)
+    if retriever is not None:
+        results = retriever.retrieve(prepared, top_k=top_k, min_score=min_score)
+    else:
+        results = _retrieve_rag(rag, prepared, top_k=top_k, min_score=min_score)
+    with stage("score"):
+        return _score_dataset(prepared, results, top_k, context_top_n, min_score, card_name_map)
+
+
 def _print_dataset_summary(name: str, metrics: Dict):
     print(f"Tarot Eval Summary [{name}]")
     print(f"- total_samples: {metrics['total_samples']}")
@@ -193,16 +396,157 @@ def _print_dataset_summary(name: str, metrics: Dict):
     print(f"- tag_leakage_rate: {metrics['tag_leakage_rate']:.4f}")
 
 
+def _format_grid_table(name: str, points: List[Dict]) -> List[str]:
+    lines = [
+        f"### {name}",
+        "",
+        "| top_k | context_top_n | min_score | zero_hit_rate | tag_hit_rate | card_facet_coverage |",
+        "|---:|---:|---:|---:|---:|---:|",
+    ]
+    for p in points:
+        coverage = p.get("card_facet_coverage")
+        coverage_text = "NA" if coverage is None else f"{coverage:.4f}"
+        min_score = "none" if p["min_score"] is None else f"{p['min_score']:.2f}"
+        lines.append(
+            f"| {p['top_k']} | {p['context_top_n']} | {min_score} | "
+            f"{p['zero_hit_rate']:.4f} | {p['tag_hit_rate']:.4f} | {coverage_text} |"
+        )
+    return lines
+
+
+def _print_grid_summary(name: str, points: List[Dict]):
+    print(f"Tarot Eval Grid [{name}]")
+    for line in _format_grid_table(name, points)[2:]:
+        print(line)
+
+
+def _eval_grid(
+    rag,
+    samples: List[Dict],
+    top_k_grid: List[int],
+    min_score_grid: List[Optional[float]],
+    context_top_n_grid: List[int],
+    card_name_map: Dict[str, str],
+    retriever: Optional[BatchedRetriever] = None,
+) -> List[Dict]:
+    """Retrieve once at max(top_k_grid) with no score floor, then score every grid point.
+
+    Hits keep the retriever's order (DomainRAG.search may rerank, so it is not
+    necessarily by score), exactly as _score_dataset sees them. For each
+    min_score the floor is applied like _slice_results, and every
+    (top_k, context_top_n) point reduces to "first j kept hits" with
+    j = min(top_k, context_top_n, kept). Text matching runs once per
+    (sample, distinct kept list, j); the grid itself is evaluated with numpy.
+    """
+    import numpy as np
+
+    prepared = _prepare_samples(samples)
+    k_max = max(top_k_grid)
+    if retriever is not None:
+        results = retriever.retrieve(prepared, top_k=k_max, min_score=None)
+    else:
+        results = _retrieve_rag(rag, prepared, top_k=k_max, min_score=None)
+
+    n = len(prepared)
+    floors = len(min_score_grid)
+    passing = np.zeros((floors, n), dtype=np.int64)
+    tag_hit = np.zeros((floors, n, k_max + 1), dtype=bool)
+    card_hit = np.zeros((floors, n, k_max + 1), dtype=bool)
+    has_draws = np.zeros(n, dtype=bool)
+    leakage = np.zeros(n, dtype=bool)
+    for i, (sample, raw_results) in enumerate(zip(prepared, results)):
+        has_draws[i] = len(sample["draws"]) > 0
+        leakage[i] = sample["tag_leakage"]
+        tags = sample["expected_tags"]
+        # Floors that keep the same hits share one round of text matching.
+        seen: Dict[tuple, int] = {}
+        for m, min_score in enumerate(min_score_grid):
+            hits = _slice_results(raw_results, k_max, min_score)
+            passing[m, i] = len(hits)
+            key = tuple(id(hit) for hit in hits)
+            if key in seen:
+                tag_hit[m, i] = tag_hit[seen[key], i]
+                card_hit[m, i] = card_hit[seen[key], i]
+                continue
+            seen[key] = m
+            texts: List[str] = []
+            for j in range(k_max + 1):
+                if 0 < j <= len(hits):
+                    texts.append(hits[j - 1].get("text", ""))
+                context = " ".join(texts).lower()
+                tag_hit[m, i, j] = (not tags) or any(tag in context for tag in tags)
+                card_hit[m, i, j] = _expected_cards_hit(sample["expected_cards"], context, card_name_map)
+
+    rows = np.arange(n)
+    eligible = int(has_draws.sum())
+    points: List[Dict] = []
+    for m, min_score in enumerate(min_score_grid):
+        for top_k in top_k_grid:
+            kept = np.minimum(passing[m], top_k)
+            for context_top_n in context_top_n_grid:
+                j = np.minimum(kept, context_top_n)
+                tag = tag_hit[m, rows, j]
+                card = card_hit[m, rows, j]
+                zero = kept == 0
+                card_draws = int((card & has_draws).sum())
+                points.append(
+                    {
+                        "top_k": top_k,
+                        "context_top_n": context_top_n,
+                        "min_score": min_score,
+                        "total_samples": n,
+                        "draws_samples": eligible,
+                        "zero_hit_rate": float(zero.mean()) if n else 0.0,
+                        "tag_hit_rate": float(tag.mean()) if n else 0.0,
+                        "card_facet_coverage": (card_draws / eligible) if eligible else None,
+                        "card_facet_coverage_raw": float(card.mean()) if n else 0.0,
+                        "tag_leakage_rate": float(leakage.mean()) if n else 0.0,
+                        "counts": {
+                            "zero_hits": int(zero.sum()),
+                            "tag_hits": int(tag.sum()),
+                            "card_hits": card_draws,
+                            "card_hits_raw": int(card.sum()),
+                            "card_eval_eligible": eligible,
+                            "tag_leakage_hits": int(leakage.sum()),
+                        },
+                    }
+                )
+    points.sort(key=lambda p: (p["top_k"], p["context_top_n"], -1.0 if p["min_score"] is None else p["min_score"]))
+    return points
+
+
 def main() -> int:
     args = parse_args()
     os.environ.setdefault("USE_CHROMADB", "1")
 
     corpus_path = Path(args.corpus_path)
-    card_name_map = _build_card_name_map(corpus_path)
-
-    from backend_ai.app.domain_rag import DomainRAG
-
-    rag = DomainRAG()
+    with stage("load"):
+        card_name_map = _build_card_name_map(corpus_path)
+
+    rag = None
+    retriever: Optional[BatchedRetriever] = None
+    if args.retrieval == "batched":
+        with stage("load"):
+            retriever = BatchedRetriever(args)
+        print(f"[tarot_eval] retrieval=batched model={retriever.model_id} collection={args.collection_name}")
+    else:
+        from backend_ai.app.domain_rag import DomainRAG
+
+        with stage("load"):
+            rag = DomainRAG()
+
+    if args.sweep:
+        args.top_k_grid = args.top_k_grid or DEFAULT_SWEEP_TOP_K
+        args.context_top_n_grid = args.context_top_n_grid or DEFAULT_SWEEP_CONTEXT_TOP_N
+        args.min_score_grid = args.min_score_grid or DEFAULT_SWEEP_MIN_SCORE
+    top_k_grid = _parse_int_grid(args.top_k_grid)
+    context_top_n_grid = _parse_int_grid(args.context_top_n_grid)
+    min_score_grid = _parse_score_grid(args.min_score_grid)
+    grid_mode = bool(top_k_grid or context_top_n_grid or min_score_grid)
+    if grid_mode:
+        top_k_grid = top_k_grid or [args.top_k]
+        context_top_n_grid = context_top_n_grid or [args.context_top_n]
+        min_score_grid = min_score_grid or [args.min_score]
 
     datasets: Dict[str, Path] = {}
     if args.eval_path:
@@ -213,8 +557,22 @@ def main() -> int:
 
     per_dataset: Dict[str, Dict] = {}
     for name, path in datasets.items():
-        rows = _load_eval_samples(path)
+        with stage("load"):
+            rows = _load_eval_samples(path)
         rows = _sample_rows(rows, args.sample_size, args.seed)
+        if grid_mode:
+            points = _eval_grid(
+                rag=rag,
+                samples=rows,
+                top_k_grid=top_k_grid,
+                min_score_grid=min_score_grid,
+                context_top_n_grid=context_top_n_grid,
+                card_name_map=card_name_map,
+                retriever=retriever,
+            )
+            per_dataset[name] = {"path": str(path), "grid": points}
+            _print_grid_summary(name, points)
+            continue
         metrics = _eval_one_dataset(
             rag=rag,
             samples=rows,
@@ -222,6 +580,7 @@ def main() -> int:
             context_top_n=args.context_top_n,
             min_score=args.min_score,
             card_name_map=card_name_map,
+            retriever=retriever,
         )
         per_dataset[name] = {
             "path": str(path),
@@ -231,24 +590,48 @@ def main() -> int:
 
     summary = {
         "timestamp": datetime.utcnow().isoformat() + "Z",
+        "retrieval": args.retrieval,
         "top_k": args.top_k,
         "context_top_n": args.context_top_n,
         "min_score": args.min_score,
         "sample_size": args.sample_size,
         "datasets": per_dataset,
     }
+    if grid_mode:
+        summary["grid"] = {
+            "top_k": top_k_grid,
+            "context_top_n": context_top_n_grid,
+            "min_score": min_score_grid,
+        }
+        if args.sweep_markdown:
+            md_lines = ["# Tarot Eval Sweep", "", f"- retrieval: `{args.retrieval}`", ""]
+            for name, data in per_dataset.items():
+                md_lines.extend(_format_grid_table(name, data["grid"]))
+                md_lines.append("")
+            md_path = Path(args.sweep_markdown)
+            md_path.parent.mkdir(parents=True, exist_ok=True)
+            md_path.write_text("\n".join(md_lines), encoding="utf-8")
+            print(f"- sweep_markdown: {md_path}")
+    if retriever is not None:
+        summary["embedding_model_id"] = retriever.model_id
+        from query_embedding_cache import get_cache
+
+        cache = get_cache().counters()
+        summary["query_embedding_cache"] = cache
+        print(f"- query_embedding_cache: hits={cache['hits']} misses={cache['misses']}")
 
     if args.output_json:
         output_path = Path(args.output_json)
     else:
         ts = datetime.utcnow().strftime("%Y%m%d_%H%M%S")
         output_path = Path("reports/quality/tarot-eval") / f"tarot_eval_{ts}.json"
-    output_path.parent.mkdir(parents=True, exist_ok=True)
-    output_path.write_text(json.dumps(summary, ensure_ascii=False, indent=2), encoding="utf-8")
+    with stage("write"):
+        output_path.parent.mkdir(parents=True, exist_ok=True)
+        output_path.write_text(json.dumps(summary, ensure_ascii=False, indent=2), encoding="utf-8")
     print(f"- output_json: {output_path}")
 
     return 0
 
 
 if __name__ == "__main__":
-    raise SystemExit(main())
+    raise SystemExit(run_profiled("tarot_eval", main, PROJECT_ROOT / "reports" / "quality" / "tarot-eval"))
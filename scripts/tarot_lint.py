@@ -10,6 +10,7 @@ from __future__ import annotations
 import argparse
 from pathlib import Path
 
+from pipeline_profiling import run_profiled, stage
 from tarot_pipeline_utils import (
     DEFAULT_COMPLETE_INTERPRETATIONS_PATH,
     DEFAULT_CORPUS_PATH,
@@ -48,15 +49,16 @@ def parse_args() -> argparse.Namespace:
 def main() -> int:
     args = parse_args()
 
-    lint_result = lint_tarot_dataset(
-        corpus_path=Path(args.corpus_path),
-        edges_path=Path(args.edges_path),
-        tarot_graph_dir=Path(args.tarot_graph_dir),
-        complete_interpretations_path=Path(args.complete_interpretations_path),
-    )
+    with stage("lint"):
+        lint_result = lint_tarot_dataset(
+            corpus_path=Path(args.corpus_path),
+            edges_path=Path(args.edges_path),
+            tarot_graph_dir=Path(args.tarot_graph_dir),
+            complete_interpretations_path=Path(args.complete_interpretations_path),
+        )
     print(summarize_lint_result(lint_result))
     return 0 if lint_result.ok else 1
 
 
 if __name__ == "__main__":
-    raise SystemExit(main())
+    raise SystemExit(run_profiled("tarot_lint", main))
@@ -0,0 +1,449 @@
+#!/usr/bin/env python3
+"""
+Make-style runner for the tarot data pipeline.
+
+Each stage declares the files it reads and writes. The runner fingerprints
+inputs by content (sha256), and a stage is skipped when its inputs, its
+arguments and its own script are unchanged since the last successful run and
+its outputs are still on disk with the recorded digests. Because comparisons
+are content-based, a stage whose output comes out byte-identical (the corpus
+build is deterministic) does not invalidate anything downstream. Stages whose
+dependencies are satisfied run in parallel.
+
+DAG (stage <- deps):
+  build_corpus
+  lint             <- build_corpus
+  coverage_audit   <- build_corpus
+  backfill         <- coverage_audit
+  sync_quality     <- backfill          (rewrites the v1.1 corpus in place)
+  rebuild_chroma   <- sync_quality, lint
+  eval             <- rebuild_chroma
+  router_eval
+  e2e_smoke
+  deck_validate
+  audit_threshold  <- coverage_audit, router_eval, e2e_smoke, deck_validate
+
+rebuild_chroma's output is the domain_tarot digest + stats sidecars
+(collection_digest / collection_stats), not the chromadb directory: every
+Chroma open, the Saju reindexers sharing the directory and WAL checkpoints
+touch its files, so fingerprinting it would make rebuild_chroma stale on
+every run. The digest changes exactly when the collection's contents do.
+
+State lives in .cache/tarot-pipeline/state.json. Digests are memoized by
+(path, size, mtime_ns) so unchanged large files are not re-read.
+
+Examples:
+  python scripts/tarot_pipeline.py                 # run everything that is stale
+  python scripts/tarot_pipeline.py eval            # eval and whatever it depends on
+  python scripts/tarot_pipeline.py --dry-run       # show which stages would run
+  python scripts/tarot_pipeline.py --force lint    # rerun lint regardless of state
+"""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Set, Tuple
+
+from tarot_pipeline_utils import (
+    DEFAULT_COMPLETE_INTERPRETATIONS_PATH,
+    DEFAULT_EDGES_PATH,
+    DEFAULT_RULE_COMBOS_PATH,
+    DEFAULT_TAROT_GRAPH_DIR,
+    PROJECT_ROOT,
+)
+
+SCRIPTS_DIR = PROJECT_ROOT / "scripts"
+STATE_PATH = PROJECT_ROOT / ".cache" / "tarot-pipeline" / "state.json"
+
+CORPUS_V1 = "backend_ai/data/tarot_corpus/tarot_corpus_v1.jsonl"
+CORPUS_V1_1 = "backend_ai/data/tarot_corpus/tarot_corpus_v1_1.jsonl"
+CHROMA_DIR = "backend_ai/data/chromadb"
+TAROT_DIGEST = "backend_ai/data/collection_digests/domain_tarot.json"
+TAROT_STATS = "backend_ai/data/collection_stats/domain_tarot.json"
+COVERAGE_JSON = "artifacts/coverage_report.json"
+COVERAGE_MD = "artifacts/coverage_report.md"
+ROUTER_JSON = "artifacts/router_eval_report.json"
+ROUTER_MD = "artifacts/router_eval_report.md"
+E2E_JSON = "artifacts/e2e_smoke_report.json"
+DECK_MD = "artifacts/deck_validation_report.md"
+EVAL_JSON = "reports/quality/tarot-eval/tarot_eval_pipeline.json"
+EVAL_AUTO = "tests/fixtures/tarot-eval/eval_auto.jsonl"
+EVAL_REALSTYLE = "tests/fixtures/tarot-eval/eval_realstyle_draws.jsonl"
+SEARCHBOX_QUERIES = "tests/fixtures/tarot-eval/searchbox_queries.jsonl"
+
+# Every stage also depends on the shared helpers it imports.
+SHARED_CODE = ("scripts/tarot_pipeline_utils.py", "scripts/tarot_audit_common.py")
+
+
+def _rel(path: Path) -> str:
+    return path.relative_to(PROJECT_ROOT).as_posix()
+
+
+@dataclass
+class Stage:
+    name: str
+    script: str
+    args: List[str] = field(default_factory=list)
+    inputs: List[str] = field(default_factory=list)
+    outputs: List[str] = field(default_factory=list)
+    deps: List[str] = field(default_factory=list)
+
+    @property
+    def command(self) -> List[str]:
+        return [sys.executable, str(SCRIPTS_DIR / self.script), *self.args]
+
+    @property
+    def code_inputs(self) -> List[str]:
+        return [f"scripts/{self.script}", *SHARED_CODE]
+
+
+def build_stages() -> Dict[str, Stage]:
+    complete_interpretations = _rel(DEFAULT_COMPLETE_INTERPRETATIONS_PATH)
+    stages = [
+        Stage(
+            name="build_corpus",
+            script="tarot_build_corpus.py",
+            args=["--output-jsonl", CORPUS_V1],
+            inputs=[complete_interpretations, _rel(DEFAULT_RULE_COMBOS_PATH)],
+            outputs=[CORPUS_V1],
+        ),
+        Stage(
+            name="lint",
+            script="tarot_lint.py",
+            args=["--corpus-path", CORPUS_V1],
+            inputs=[CORPUS_V1, _rel(DEFAULT_EDGES_PATH), _rel(DEFAULT_TAROT_GRAPH_DIR), complete_interpretations],
+            deps=["build_corpus"],
+        ),
+        Stage(
+            name="coverage_audit",
+            script="tarot_coverage_audit.py",
+            args=["--corpus-path", CORPUS_V1, "--output-json", COVERAGE_JSON, "--output-md", COVERAGE_MD],
+            inputs=[CORPUS_V1, complete_interpretations, "backend_ai/app/tarot"],
+            outputs=[COVERAGE_JSON, COVERAGE_MD],
+            deps=["build_corpus"],
+        ),
+        Stage(
+            name="backfill",
+            script="tarot_backfill_missing_facets.py",
+            args=["--corpus-path", CORPUS_V1, "--coverage-report-path", COVERAGE_JSON, "--output-path", CORPUS_V1_1],
+            inputs=[CORPUS_V1, COVERAGE_JSON, complete_interpretations],
+            outputs=[CORPUS_V1_1],
+            deps=["coverage_audit"],
+        ),
+        Stage(
+            # Rewrites CORPUS_V1_1 in place (path is fixed in the script).
+            name="sync_quality",
+            script="tarot_sync_corpus_quality.py",
+            inputs=[CORPUS_V1_1],
+            outputs=[CORPUS_V1_1],
+            deps=["backfill"],
+        ),
+        Stage(
+            name="rebuild_chroma",
+            script="tarot_rebuild_chroma.py",
+            args=["--corpus-path", CORPUS_V1_1, "--persist-dir", CHROMA_DIR, "--skip-lint"],
+            inputs=[CORPUS_V1_1],
+            outputs=[TAROT_DIGEST, TAROT_STATS],
+            deps=["sync_quality", "lint"],
+        ),
+        Stage(
+            name="eval",
+            script="tarot_eval.py",
+            args=["--corpus-path", CORPUS_V1_1, "--output-json", EVAL_JSON],
+            inputs=[CORPUS_V1_1, TAROT_DIGEST, TAROT_STATS, EVAL_AUTO, EVAL_REALSTYLE],
+            outputs=[EVAL_JSON],
+            deps=["rebuild_chroma"],
+        ),
+        Stage(
+            name="router_eval",
+            script="tarot_router_eval.py",
+            args=["--input-path", SEARCHBOX_QUERIES, "--output-json", ROUTER_JSON, "--output-md", ROUTER_MD],
+            inputs=[SEARCHBOX_QUERIES, "backend_ai/app/tarot"],
+            outputs=[ROUTER_JSON, ROUTER_MD],
+        ),
+        Stage(
+            name="e2e_smoke",
+            script="tarot_e2e_smoke.py",
+            args=["--queries-path", SEARCHBOX_QUERIES, "--output-json", E2E_JSON],
+            inputs=[SEARCHBOX_QUERIES, "backend_ai/app/tarot"],
+            outputs=[E2E_JSON],
+        ),
+        Stage(
+            name="deck_validate",
+            script="tarot_deck_validate.py",
+            args=["--output-md", DECK_MD],
+            inputs=["src/lib/Tarot/tarot.types.ts", "src/lib/Tarot/data", "src/app/api/tarot/interpret/route.ts"],
+            outputs=[DECK_MD],
+        ),
+        Stage(
+            name="audit_threshold",
+            script="tarot_audit_threshold_check.py",
+            args=[
+                "--coverage-report", COVERAGE_JSON,
+                "--router-report", ROUTER_JSON,
+                "--e2e-report", E2E_JSON,
+                "--deck-report-md", DECK_MD,
+            ],
+            inputs=[COVERAGE_JSON, ROUTER_JSON, E2E_JSON, DECK_MD],
+            deps=["coverage_audit", "router_eval", "e2e_smoke", "deck_validate"],
+        ),
+    ]
+    return {s.name: s for s in stages}
+
+
+# ────────────────────────────────── fingerprints
+
+
+class Fingerprinter:
+    """sha256 of file/dir content, memoized by (size, mtime_ns) across runs."""
+
+    def __init__(self, memo: Dict[str, List]):
+        self.memo = memo
+        self._lock = threading.Lock()
+
+    def _file_digest(self, path: Path) -> str:
+        st = path.stat()
+        key = _rel(path)
+        with self._lock:
+            hit = self.memo.get(key)
+        if hit and hit[0] == st.st_size and hit[1] == st.st_mtime_ns:
+            return hit[2]
+        h = hashlib.sha256()
+        with path.open("rb") as f:
+            for block in iter(lambda: f.read(1 << 20), b""):
+                h.update(block)
+        digest = h.hexdigest()
+        with self._lock:
+            self.memo[key] = [st.st_size, st.st_mtime_ns, digest]
+        return digest
+
+    def digest(self, rel_path: str) -> Optional[str]:
+        path = PROJECT_ROOT / rel_path
+        if path.is_file():
+            return self._file_digest(path)
+        if path.is_dir():
+            h = hashlib.sha256()
+            for child in sorted(p for p in path.rglob("*") if p.is_file() and "__pycache__" not in p.parts):
+                h.update(child.relative_to(path).as_posix().encode("utf-8"))
+                h.update(self._file_digest(child).encode("ascii"))
+            return h.hexdigest()
+        return None
+
+    def digests(self, rel_paths: Sequence[str]) -> Dict[str, Optional[str]]:
+        return {p: self.digest(p) for p in rel_paths}
+
+
+def _load_state() -> Dict:
+    try:
+        return json.loads(STATE_PATH.read_text(encoding="utf-8"))
+    except (OSError, json.JSONDecodeError):
+        return {}
+
+
+def _save_state(state: Dict) -> None:
+    STATE_PATH.parent.mkdir(parents=True, exist_ok=True)
+    tmp = STATE_PATH.with_suffix(".tmp")
+    tmp.write_text(json.dumps(state, ensure_ascii=False, indent=2, sort_keys=True), encoding="utf-8")
+    tmp.replace(STATE_PATH)
+
+
+def _stage_key(stage: Stage, fp: Fingerprinter) -> Dict:
+    return {
+        "command": stage.command[1:],
+        "inputs": fp.digests(stage.inputs),
+        "code": fp.digests(stage.code_inputs),
+    }
+
+
+def _stale_reason(stage: Stage, records: Dict[str, Dict], fp: Fingerprinter) -> Optional[str]:
+    record = records.get(stage.name)
+    if not record:
+        return "never run"
+    key = _stage_key(stage, fp)
+    if record.get("command") != key["command"]:
+        return "arguments changed"
+    if record.get("code") != key["code"]:
+        return "script changed"
+    for path, digest in key["inputs"].items():
+        if digest is None:
+            return f"missing input {path}"
+        if record.get("inputs", {}).get(path) != digest:
+            return f"input changed {path}"
+    for path, digest in fp.digests(stage.outputs).items():
+        recorded = record.get("outputs", {}).get(path)
+        if digest is None or not (digest == recorded or _rewritten_downstream(path, recorded, digest, records)):
+            return f"output missing/modified {path}"
+    return None
+
+
+def _rewritten_downstream(path: str, produced: Optional[str], current: str, records: Dict[str, Dict]) -> bool:
+    """True when an in-place stage turned exactly our output into the current file."""
+    return any(r.get("rewrote", {}).get(path) == [produced, current] for r in records.values())
+
+
+# ────────────────────────────────── scheduling
+
+
+def _select(stages: Dict[str, Stage], targets: Sequence[str]) -> List[str]:
+    """Targets plus their transitive deps, in declaration (topological) order."""
+    if not targets:
+        return list(stages)
+    wanted: Set[str] = set()
+    stack = list(targets)
+    while stack:
+        name = stack.pop()
+        if name not in stages:
+            raise SystemExit(f"Unknown stage: {name} (known: {', '.join(stages)})")
+        if name not in wanted:
+            wanted.add(name)
+            stack.extend(stages[name].deps)
+    return [n for n in stages if n in wanted]
+
+
+def _run_stage(stage: Stage) -> Tuple[int, float, str]:
+    started = time.perf_counter()
+    proc = subprocess.run(
+        stage.command,
+        cwd=str(PROJECT_ROOT),
+        stdout=subprocess.PIPE,
+        stderr=subprocess.STDOUT,
+        text=True,
+        encoding="utf-8",
+        errors="replace",
+    )
+    return proc.returncode, time.perf_counter() - started, proc.stdout or ""
+
+
+def run_pipeline(
+    stages: Dict[str, Stage],
+    selected: List[str],
+    jobs: int,
+    force: Set[str],
+    dry_run: bool,
+    verbose: bool,
+) -> int:
+    state = _load_state()
+    fp = Fingerprinter(state.setdefault("digest_memo", {}))
+    records: Dict[str, Dict] = state.setdefault("stages", {})
+
+    done: Set[str] = set()
+    failed: Set[str] = set()
+    pre_inputs: Dict[str, Dict[str, Optional[str]]] = {}
+    summary: List[Tuple[str, str, float]] = []
+    pending = list(selected)
+    running: Dict[Future, Stage] = {}
+
+    def _ready(name: str) -> bool:
+        return all(d in done or d not in selected for d in stages[name].deps)
+
+    with ThreadPoolExecutor(max_workers=max(1, jobs)) as pool:
+        while pending or running:
+            for name in list(pending):
+                stage = stages[name]
+                if any(d in failed for d in stage.deps):
+                    pending.remove(name)
+                    failed.add(name)
+                    summary.append((name, "blocked", 0.0))
+                    continue
+                if not _ready(name):
+                    continue
+                pending.remove(name)
+                reason = "forced" if name in force else _stale_reason(stage, records, fp)
+                if reason is None:
+                    done.add(name)
+                    summary.append((name, "cached", 0.0))
+                    print(f"[tarot_pipeline] skip {name} (up to date)")
+                    continue
+                if dry_run:
+                    # Downstream stages are judged on current files; a real run
+                    # may cascade further if this stage's outputs change.
+                    done.add(name)
+                    summary.append((name, f"would run: {reason}", 0.0))
+                    print(f"[tarot_pipeline] would run {name}: {reason}")
+                    continue
+                print(f"[tarot_pipeline] run {name}: {reason}")
+                pre_inputs[name] = fp.digests(stage.inputs)
+                running[pool.submit(_run_stage, stage)] = stage
+
+            if not running:
+                if pending and not any(_ready(n) for n in pending):
+                    raise SystemExit(f"Dependency cycle or unresolved stages: {pending}")
+                continue
+
+            finished, _ = wait(list(running), return_when=FIRST_COMPLETED)
+            for future in finished:
+                stage = running.pop(future)
+                code, elapsed, output = future.result()
+                if verbose or code != 0:
+                    for line in output.rstrip().splitlines():
+                        print(f"  [{stage.name}] {line}")
+                if code != 0:
+                    failed.add(stage.name)
+                    summary.append((stage.name, f"FAILED (exit {code})", elapsed))
+                    print(f"[tarot_pipeline] FAIL {stage.name} exit={code} ({elapsed:.1f}s)")
+                    records.pop(stage.name, None)
+                    continue
+                key = _stage_key(stage, fp)
+                before = pre_inputs.pop(stage.name)
+                # In-place stages (input == output) record the post-run digest as
+                # their input and remember the rewrite so the producer stays cached.
+                key["rewrote"] = {
+                    p: [before[p], key["inputs"][p]] for p in stage.inputs if p in stage.outputs
+                }
+                key["inputs"] = {p: (key["inputs"][p] if p in stage.outputs else before[p]) for p in stage.inputs}
+                key["outputs"] = fp.digests(stage.outputs)
+                key["finished_at"] = time.strftime("%Y-%m-%dT%H:%M:%S")
+                key["elapsed_sec"] = round(elapsed, 3)
+                records[stage.name] = key
+                done.add(stage.name)
+                summary.append((stage.name, "ran", elapsed))
+                print(f"[tarot_pipeline] ok {stage.name} ({elapsed:.1f}s)")
+                _save_state(state)
+
+    if not dry_run:
+        _save_state(state)
+
+    print("[tarot_pipeline] summary")
+    order = {n: i for i, n in enumerate(selected)}
+    for name, status, elapsed in sorted(summary, key=lambda x: order[x[0]]):
+        timing = f" {elapsed:.1f}s" if elapsed else ""
+        print(f"- {name}: {status}{timing}")
+    return 1 if failed else 0
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Run the tarot data pipeline, skipping up-to-date stages")
+    parser.add_argument("targets", nargs="*", help="Stages to bring up to date (default: all)")
+    parser.add_argument("--jobs", type=int, default=4, help="Max stages to run in parallel")
+    parser.add_argument("--force", action="append", default=[], help="Rerun this stage even if cached (repeatable, 'all')")
+    parser.add_argument("--dry-run", action="store_true", help="Print the plan without running anything")
+    parser.add_argument("--list", action="store_true", help="List stages with inputs/outputs and exit")
+    parser.add_argument("--verbose", action="store_true", help="Echo stage output even on success")
+    return parser.parse_args()
+
+
+def main() -> int:
+    args = parse_args()
+    stages = build_stages()
+    if args.list:
+        for stage in stages.values():
+            print(f"{stage.name}  <- {', '.join(stage.deps) or '-'}")
+            print(f"  inputs:  {', '.join(stage.inputs) or '-'}")
+            print(f"  outputs: {', '.join(stage.outputs) or '-'}")
+        return 0
+    selected = _select(stages, args.targets)
+    force = set(selected) if "all" in args.force else set(args.force)
+    return run_pipeline(stages, selected, args.jobs, force, args.dry_run, args.verbose)
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
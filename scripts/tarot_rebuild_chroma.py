@@ -11,13 +11,31 @@ import time
 from pathlib import Path
 from typing import Dict, List, Tuple
 
+import numpy as np
+
 from chromadb import PersistentClient
 from chromadb.config import Settings
 
+from batch_autotune import MemoryGuard, autotune_token_budget, parse_token_budget, resolve_memory_ceiling
+from collection_digest import compute_digest, hash_pairs, load_manifest, write_digest
+from collection_stats import compute_stats, indexed_model_id, write_stats
+from embedding_backends import (
+    BACKENDS,
+    DEFAULT_TOKEN_BUDGET,
+    HashEmbedder,
+    as_float32,
+    encode_docs,
+    fake_dim_for,
+    fake_model_id,
+    is_fake_model_id,
+    load_embedder,
+    resolve_backend,
+)
+from hnsw_params import hnsw_metadata
+from pipeline_profiling import run_profiled, stage
 from tarot_pipeline_utils import (
     DEFAULT_CORPUS_PATH,
     LintResult,
-    chunked,
     lint_tarot_dataset,
     load_combo_source_stats,
     load_jsonl_records,
@@ -44,41 +62,86 @@ def parse_args() -> argparse.Namespace:
         default=os.getenv("RAG_EMBEDDING_MODEL", "minilm"),
         help="Model key (minilm/e5-large/bge-m3) or HuggingFace model id",
     )
+    parser.add_argument(
+        "--embedder",
+        choices=BACKENDS,
+        default=None,
+        help="Embedder backend (default: $RAG_EMBEDDER_BACKEND or model). onnx = int8 ONNX Runtime, fake = offline hash embedder",
+    )
     parser.add_argument("--batch-size", type=int, default=256)
+    parser.add_argument(
+        "--token-budget",
+        type=parse_token_budget,
+        default=DEFAULT_TOKEN_BUDGET,
+        help="Padded tokens per encode call; docs are length-bucketed under it "
+        "(0 = fixed 64-doc batches, auto = probe throughput/RSS and pick)",
+    )
+    parser.add_argument(
+        "--memory-ceiling-mb",
+        type=float,
+        default=None,
+        help="Back off encode batches when RSS nears this (default with auto: $RAG_MEMORY_CEILING_MB or 80%% of RAM)",
+    )
     parser.add_argument("--keep-staging", action="store_true")
     parser.add_argument("--skip-lint", action="store_true")
     parser.add_argument("--dry-run", action="store_true")
+    parser.add_argument(
+        "--resync-manifest",
+        default=None,
+        help="collection_digest.py verify --live --manifest-out file: re-embed and upsert only its ids, "
+        "delete its stale ids, no staging swap",
+    )
     return parser.parse_args()
 
 
-def _load_embedder(model_id: str):
-    from backend_ai.app.rag import model_manager
+class _ManagerEncoder:
+    """encode()-shaped adapter over model_manager's encode_batch."""
 
-    if model_id in model_manager.EMBEDDING_MODELS:
-        manager = model_manager.get_embedding_manager(model_key=model_id)
+    def __init__(self, manager, is_query: bool):
+        self.manager = manager
+        self.is_query = is_query
+        model = getattr(manager, "model", None)
+        self.tokenizer = getattr(model, "tokenizer", None)
+        self.max_seq_length = getattr(model, "max_seq_length", None)
 
-        def _encode(texts: List[str]) -> List[List[float]]:
-            embeds = manager.encode_batch(texts, batch_size=min(64, max(1, len(texts))), is_query=False)
-            if embeds is None:
-                raise RuntimeError("Failed to generate embeddings via model_manager")
-            return embeds.cpu().numpy().tolist()
+    def encode(self, texts: List[str], batch_size: int = 64, **_kwargs) -> np.ndarray:
+        embeds = self.manager.encode_batch(list(texts), batch_size=batch_size, is_query=self.is_query)
+        if embeds is None:
+            raise RuntimeError("Failed to generate embeddings via model_manager")
+        return as_float32(embeds)
 
-        return _encode
 
-    from sentence_transformers import SentenceTransformer
-
-    device = os.getenv("RAG_DEVICE", "cpu")
-    model = SentenceTransformer(model_id, device=device)
-
-    def _encode(texts: List[str]) -> List[List[float]]:
-        embeds = model.encode(
-            texts,
-            batch_size=min(64, max(1, len(texts))),
-            convert_to_tensor=True,
-            normalize_embeddings=True,
-            show_progress_bar=True,
-        )
-        return embeds.cpu().numpy().tolist()
+def _load_embedder(
+    model_id: str,
+    is_query: bool = False,
+    backend: str | None = None,
+    token_budget: int | None = DEFAULT_TOKEN_BUDGET,
+    guard: MemoryGuard | None = None,
+):
+    """Return encode(texts) -> float32 matrix. token_budget=None auto-tunes on the first call."""
+    extra: Dict = {}
+    if is_fake_model_id(model_id) or resolve_backend(backend) == "fake":
+        model = HashEmbedder(fake_dim_for(model_id))
+    elif resolve_backend(backend) == "onnx":
+        model = load_embedder(lambda: None, backend="onnx", model_id=model_id)
+        extra["is_query"] = is_query
+    else:
+        from backend_ai.app.rag import model_manager
+
+        if model_id in model_manager.EMBEDDING_MODELS:
+            model = _ManagerEncoder(model_manager.get_embedding_manager(model_key=model_id), is_query)
+        else:
+            from sentence_transformers import SentenceTransformer
+
+            model = SentenceTransformer(model_id, device=os.getenv("RAG_DEVICE", "cpu"))
+
+    state = {"token_budget": token_budget}
+
+    def _encode(texts: List[str]) -> np.ndarray:
+        if state["token_budget"] is None:
+            ceiling = guard.ceiling_mb if guard else resolve_memory_ceiling()
+            state["token_budget"] = autotune_token_budget(model, texts, ceiling, **extra)
+        return encode_docs(model, texts, token_budget=state["token_budget"], guard=guard, **extra)
 
     return _encode
 
@@ -113,7 +176,10 @@ def _normalize_record(record: Dict) -> Dict:
     return normalized
 
 
-def _prepare_collection_payload(records: List[Dict]) -> Tuple[List[str], List[str], List[Dict]]:
+Payload = Tuple[List[str], List[str], List[Dict]]
+
+
+def _prepare_collection_payload(records: List[Dict]) -> Payload:
     ids: List[str] = []
     docs: List[str] = []
     metas: List[Dict] = []
@@ -136,6 +202,24 @@ def _prepare_collection_payload(records: List[Dict]) -> Tuple[List[str], List[st
     return ids, docs, metas
 
 
+def collect_payloads(raw_records: List[Dict]) -> Tuple[Payload, Payload]:
+    """(primary, combo) collection payloads from raw corpus records, sorted by doc_id."""
+    records = [_normalize_record(r) for r in raw_records]
+    records.sort(key=lambda x: x["doc_id"])
+    primary = _prepare_collection_payload([r for r in records if r["doc_type"] != "combo"])
+    combo = _prepare_collection_payload([r for r in records if r["doc_type"] == "combo"])
+    return primary, combo
+
+
+def _write_sidecars(args, collection_name: str, ids: List[str], docs: List[str], metas: List[Dict], corpus_path: Path):
+    stats_path = write_stats(
+        compute_stats(collection_name, docs, metas, args.embedding_model_id, [corpus_path], Path(args.persist_dir))
+    )
+    digest = compute_digest(collection_name, hash_pairs(ids, docs))
+    digest_path = write_digest(digest)
+    print(f"[tarot_rebuild] stats={stats_path} digest={digest_path} root={digest['root'][:16]}")
+
+
 def _delete_if_exists(client: PersistentClient, name: str):
     try:
         client.delete_collection(name=name)
@@ -147,20 +231,18 @@ def _upsert_batches(
     collection,
     ids: List[str],
     docs: List[str],
-    embeddings: List[List[float]],
+    embeddings: np.ndarray,
     metas: List[Dict],
     batch_size: int,
 ):
-    for idx_batch in chunked(list(range(len(ids))), batch_size):
-        batch_ids = [ids[i] for i in idx_batch]
-        batch_docs = [docs[i] for i in idx_batch]
-        batch_embeds = [embeddings[i] for i in idx_batch]
-        batch_metas = [metas[i] for i in idx_batch]
+    # Slices of the float32 matrix are views; Chroma takes them as-is.
+    for start in range(0, len(ids), batch_size):
+        end = start + batch_size
         collection.upsert(
-            ids=batch_ids,
-            documents=batch_docs,
-            embeddings=batch_embeds,
-            metadatas=batch_metas,
+            ids=ids[start:end],
+            documents=docs[start:end],
+            embeddings=embeddings[start:end],
+            metadatas=metas[start:end],
         )
 
 
@@ -169,7 +251,7 @@ def _stage_and_swap(
     collection_name: str,
     ids: List[str],
     docs: List[str],
-    embeddings: List[List[float]],
+    embeddings: np.ndarray,
     metas: List[Dict],
     embedding_model_id: str,
     batch_size: int,
@@ -179,16 +261,20 @@ def _stage_and_swap(
     staging_name = f"{collection_name}__staging__{ts}"
     _delete_if_exists(client, staging_name)
 
+    metadata = {"hnsw:space": "cosine", "embedding_model_id": embedding_model_id}
+    tuned = hnsw_metadata(collection_name)
+    if tuned:
+        print(f"[tarot_rebuild] hnsw params {collection_name}={tuned}")
     staging = client.get_or_create_collection(
         name=staging_name,
-        metadata={"hnsw:space": "cosine", "embedding_model_id": embedding_model_id},
+        metadata={**metadata, **tuned},
     )
     _upsert_batches(staging, ids, docs, embeddings, metas, batch_size)
 
     _delete_if_exists(client, collection_name)
     target = client.get_or_create_collection(
         name=collection_name,
-        metadata={"hnsw:space": "cosine", "embedding_model_id": embedding_model_id},
+        metadata={**metadata, **tuned},
     )
 
     total = staging.count()
@@ -211,6 +297,45 @@ def _stage_and_swap(
     return total
 
 
+def _resync(args, encode, payloads: Dict[str, Payload], corpus_path: Path) -> int:
+    """Apply a collection_digest drift manifest in place: upsert its ids, delete its stale ids."""
+    collection_name, upsert_ids, delete_ids = load_manifest(Path(args.resync_manifest))
+    if collection_name not in payloads:
+        raise RuntimeError(f"resync manifest targets {collection_name}, expected one of {sorted(payloads)}")
+    ids, docs, metas = payloads[collection_name]
+    keep = [i for i, doc_id in enumerate(ids) if doc_id in upsert_ids]
+    print(f"[tarot_rebuild] resync collection={collection_name} upsert={len(keep)} delete={len(delete_ids)}")
+
+    client = PersistentClient(
+        path=str(Path(args.persist_dir)),
+        settings=Settings(anonymized_telemetry=False, allow_reset=True),
+    )
+    collection = client.get_collection(collection_name)
+    indexed = indexed_model_id(collection)
+    if indexed != args.embedding_model_id:
+        raise RuntimeError(
+            f"{collection_name} was indexed with embedding_model_id={indexed}, this run uses "
+            f"{args.embedding_model_id}; resync would mix vector spaces, run a full rebuild instead"
+        )
+    if keep:
+        embeddings = encode([docs[i] for i in keep])
+        with stage("write"):
+            _upsert_batches(
+                collection,
+                [ids[i] for i in keep],
+                [docs[i] for i in keep],
+                embeddings,
+                [metas[i] for i in keep],
+                args.batch_size,
+            )
+    if delete_ids:
+        with stage("write"):
+            collection.delete(ids=delete_ids)
+    print(f"[tarot_rebuild] resynced collection={collection_name} count={collection.count()}")
+    _write_sidecars(args, collection_name, ids, docs, metas, corpus_path)
+    return 0
+
+
 def _run_lint_or_fail(args) -> LintResult:
     lint_result = lint_tarot_dataset(corpus_path=Path(args.corpus_path))
     print(summarize_lint_result(lint_result))
@@ -223,17 +348,18 @@ def main() -> int:
     args = parse_args()
 
     if not args.skip_lint:
-        _run_lint_or_fail(args)
+        with stage("lint"):
+            _run_lint_or_fail(args)
 
-    corpus_path = Path(args.corpus_path)
-    records = [_normalize_record(r) for r in load_jsonl_records(corpus_path)]
-    records.sort(key=lambda x: x["doc_id"])
-
-    primary_records = [r for r in records if r["doc_type"] != "combo"]
-    combo_records = [r for r in records if r["doc_type"] == "combo"]
+    if resolve_backend(args.embedder) == "fake":
+        # Tag the collection so eval/search never mistake it for a real index.
+        args.embedding_model_id = fake_model_id(fake_dim_for(args.embedding_model_id))
 
-    primary_ids, primary_docs, primary_metas = _prepare_collection_payload(primary_records)
-    combo_ids, combo_docs, combo_metas = _prepare_collection_payload(combo_records)
+    corpus_path = Path(args.corpus_path)
+    with stage("load"):
+        raw_records = load_jsonl_records(corpus_path)
+    with stage("parse"):
+        (primary_ids, primary_docs, primary_metas), (combo_ids, combo_docs, combo_metas) = collect_payloads(raw_records)
 
     combo_stats = load_combo_source_stats()
     print(
@@ -244,13 +370,28 @@ def main() -> int:
         f"expected_combo_doc_floor={combo_stats.expected_combo_doc_floor}"
     )
     print(f"[tarot_rebuild] combo_mode={args.combo_mode}")
-    print(f"[tarot_rebuild] primary docs={len(primary_records)} combo docs={len(combo_records)}")
+    print(f"[tarot_rebuild] primary docs={len(primary_ids)} combo docs={len(combo_ids)}")
     print(f"[tarot_rebuild] embedding_model_id={args.embedding_model_id}")
 
     if args.dry_run:
         return 0
 
-    encode = _load_embedder(args.embedding_model_id)
+    guard = None
+    if args.token_budget is None or args.memory_ceiling_mb:
+        guard = MemoryGuard(resolve_memory_ceiling(args.memory_ceiling_mb))
+    with stage("load"):
+        encode = _load_embedder(
+            args.embedding_model_id,
+            backend=args.embedder,
+            token_budget=args.token_budget,
+            guard=guard,
+        )
+    if args.resync_manifest:
+        payloads = {args.collection_name: (primary_ids, primary_docs, primary_metas)}
+        if args.combo_collection_name:
+            payloads[args.combo_collection_name] = (combo_ids, combo_docs, combo_metas)
+        return _resync(args, encode, payloads, corpus_path)
+
     primary_embeddings = encode(primary_docs) if primary_docs else []
     combo_embeddings = encode(combo_docs) if combo_docs else []
 
@@ -261,18 +402,20 @@ def main() -> int:
         settings=Settings(anonymized_telemetry=False, allow_reset=True),
     )
 
-    primary_count = _stage_and_swap(
-        client=client,
-        collection_name=args.collection_name,
-        ids=primary_ids,
-        docs=primary_docs,
-        embeddings=primary_embeddings,
-        metas=primary_metas,
-        embedding_model_id=args.embedding_model_id,
-        batch_size=args.batch_size,
-        keep_staging=args.keep_staging,
-    )
+    with stage("write"):
+        primary_count = _stage_and_swap(
+            client=client,
+            collection_name=args.collection_name,
+            ids=primary_ids,
+            docs=primary_docs,
+            embeddings=primary_embeddings,
+            metas=primary_metas,
+            embedding_model_id=args.embedding_model_id,
+            batch_size=args.batch_size,
+            keep_staging=args.keep_staging,
+        )
     print(f"[tarot_rebuild] rebuilt collection={args.collection_name} count={primary_count}")
+    _write_sidecars(args, args.collection_name, primary_ids, primary_docs, primary_metas, corpus_path)
 
     if args.combo_mode == "graph_only":
         if args.combo_collection_name:
@@ -287,20 +430,22 @@ def main() -> int:
                 "combo docs below expected floor: "
                 f"got={len(combo_ids)} expected_floor={combo_stats.expected_combo_doc_floor}"
             )
-        combo_count = _stage_and_swap(
-            client=client,
-            collection_name=args.combo_collection_name,
-            ids=combo_ids,
-            docs=combo_docs,
-            embeddings=combo_embeddings,
-            metas=combo_metas,
-            embedding_model_id=args.embedding_model_id,
-            batch_size=args.batch_size,
-            keep_staging=args.keep_staging,
-        )
+        with stage("write"):
+            combo_count = _stage_and_swap(
+                client=client,
+                collection_name=args.combo_collection_name,
+                ids=combo_ids,
+                docs=combo_docs,
+                embeddings=combo_embeddings,
+                metas=combo_metas,
+                embedding_model_id=args.embedding_model_id,
+                batch_size=args.batch_size,
+                keep_staging=args.keep_staging,
+            )
         print(
             f"[tarot_rebuild] rebuilt collection={args.combo_collection_name} count={combo_count}"
         )
+        _write_sidecars(args, args.combo_collection_name, combo_ids, combo_docs, combo_metas, corpus_path)
     elif args.combo_mode == "docs":
         raise RuntimeError(
             "combo_mode=docs requires combo docs in corpus, but none were found."
@@ -311,4 +456,4 @@ def main() -> int:
 
 
 if __name__ == "__main__":
-    raise SystemExit(main())
+    raise SystemExit(run_profiled("tarot_rebuild_chroma", main))
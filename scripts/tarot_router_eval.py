@@ -1,18 +1,33 @@
 #!/usr/bin/env python3
 """
 Router audit for searchbox-style tarot queries.
+
+detect_tarot_topic is called once per normalized query (the searchbox dataset
+repeats many mutated variants). Datasets with at least --parallel-min-queries
+unique queries are fanned out over a process pool. Per-call latency
+(p50/p95/p99) is reported because the router sits on the search box hot path.
 """
 
 from __future__ import annotations
 
 import argparse
 import json
+import os
 import sys
+import time
 from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
-from typing import Dict, List, Tuple
+from typing import Dict, List, Optional, Tuple
 
-from tarot_audit_common import REPO_ROOT, ensure_artifacts_dir, read_jsonl, write_markdown
+from pipeline_profiling import percentile, run_profiled, stage
+from tarot_audit_common import (
+    REPO_ROOT,
+    ensure_artifacts_dir,
+    normalize_question_text,
+    read_jsonl,
+    write_markdown,
+)
 
 if str(REPO_ROOT) not in sys.path:
     sys.path.insert(0, str(REPO_ROOT))
@@ -23,13 +38,90 @@ from backend_ai.services.tarot_service import TarotService  # noqa: E402
 from backend_ai.app.tarot.spread_loader import get_spread_loader  # noqa: E402
 
 
-def parse_args() -> argparse.Namespace:
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
     parser = argparse.ArgumentParser(description="Evaluate tarot routing quality")
     parser.add_argument("--input-path", default="tests/fixtures/tarot-eval/searchbox_queries.jsonl")
     parser.add_argument("--sample-size", type=int, default=None)
     parser.add_argument("--output-md", default="artifacts/router_eval_report.md")
     parser.add_argument("--output-json", default="artifacts/router_eval_report.json")
-    return parser.parse_args()
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=min(8, os.cpu_count() or 1),
+        help="Process pool size for large datasets (1 = always serial)",
+    )
+    parser.add_argument(
+        "--parallel-min-queries",
+        type=int,
+        default=2000,
+        help="Use the process pool only when there are at least this many unique queries",
+    )
+    return parser.parse_args(argv)
+
+
+_WORKER_SERVICE: Optional[TarotService] = None
+
+
+def _init_worker() -> None:
+    global _WORKER_SERVICE
+    _WORKER_SERVICE = TarotService()
+
+
+def _timed_detect(service: TarotService, query: str) -> Tuple[Dict, float]:
+    started = time.perf_counter()
+    detected = service.detect_tarot_topic(query)
+    return detected, (time.perf_counter() - started) * 1000.0
+
+
+def _detect_in_worker(query: str) -> Tuple[Dict, float]:
+    return _timed_detect(_WORKER_SERVICE, query)
+
+
+def detect_topics(
+    queries: List[str],
+    workers: int = 1,
+    parallel_min_queries: int = 2000,
+) -> Tuple[Dict[str, Tuple[Dict, float]], Dict]:
+    """Run detect_tarot_topic once per normalized query.
+
+    Returns ({normalized query: (detected, latency_ms)}, run info). The first raw
+    spelling of each normalized query is the one sent to the router.
+    """
+    unique: Dict[str, str] = {}
+    for query in queries:
+        unique.setdefault(normalize_question_text(query), query)
+
+    keys = list(unique)
+    use_pool = workers > 1 and len(keys) >= parallel_min_queries
+    started = time.perf_counter()
+    if use_pool:
+        chunksize = max(1, len(keys) // (workers * 8))
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as pool:
+            outputs = list(pool.map(_detect_in_worker, [unique[k] for k in keys], chunksize=chunksize))
+    else:
+        service = TarotService()
+        outputs = [_timed_detect(service, unique[k]) for k in keys]
+    wall_ms = (time.perf_counter() - started) * 1000.0
+
+    info = {
+        "mode": f"process_pool[{workers}]" if use_pool else "serial",
+        "queries": len(queries),
+        "unique_queries": len(keys),
+        "memo_hits": len(queries) - len(keys),
+        "wall_ms": wall_ms,
+    }
+    return dict(zip(keys, outputs)), info
+
+
+def latency_summary(latencies_ms: List[float]) -> Dict:
+    return {
+        "calls": len(latencies_ms),
+        "mean_ms": (sum(latencies_ms) / len(latencies_ms)) if latencies_ms else 0.0,
+        "p50_ms": percentile(latencies_ms, 50),
+        "p95_ms": percentile(latencies_ms, 95),
+        "p99_ms": percentile(latencies_ms, 99),
+        "max_ms": max(latencies_ms) if latencies_ms else 0.0,
+    }
 
 
 def _is_yes_no(q: str) -> bool:
@@ -67,13 +159,14 @@ def _low_confidence(confidence: float) -> bool:
     return confidence < 0.6
 
 
-def run_eval(rows: List[Dict]) -> Dict:
+def run_eval(rows: List[Dict], workers: int = 1, parallel_min_queries: int = 2000) -> Dict:
     spread_loader = get_spread_loader()
     spread_catalog = {
         theme: {x["id"] for x in spread_loader.get_sub_topics(theme)}
         for theme in spread_loader.get_available_themes()
     }
-    service = TarotService()
+    queries = [q for q in (str(row.get("query") or "").strip() for row in rows) if q]
+    detections, detect_info = detect_topics(queries, workers=workers, parallel_min_queries=parallel_min_queries)
 
     domain_dist = Counter()
     spread_dist = Counter()
@@ -87,7 +180,7 @@ def run_eval(rows: List[Dict]) -> Dict:
         if not query:
             continue
         eval_rows += 1
-        detected = service.detect_tarot_topic(query)
+        detected, _latency_ms = detections[normalize_question_text(query)]
         theme = str(detected.get("theme") or "")
         sub_topic = str(detected.get("sub_topic") or "")
         confidence = float(detected.get("confidence") or 0.0)
@@ -154,6 +247,8 @@ def run_eval(rows: List[Dict]) -> Dict:
         "anomaly_patterns_top5": [
             {"pattern": k, "count": v} for k, v in pattern_counter.most_common(5)
         ],
+        "detect": detect_info,
+        "detect_latency": latency_summary([latency for _, latency in detections.values()]),
     }
 
 
@@ -168,8 +263,24 @@ def build_markdown(report: Dict) -> List[str]:
         f"- label_mismatch_count: {report['label_mismatch_count']}",
         f"- label_mismatch_rate: {report['label_mismatch_rate']:.4f}",
         "",
-        "## Domain Distribution",
     ]
+    detect = report.get("detect")
+    latency = report.get("detect_latency")
+    if detect and latency:
+        lines.extend(
+            [
+                "## Router Latency (detect_tarot_topic)",
+                f"- mode: {detect['mode']}",
+                f"- unique_queries: {detect['unique_queries']} (memo_hits={detect['memo_hits']})",
+                f"- wall_ms: {detect['wall_ms']:.1f}",
+                f"- p50_ms: {latency['p50_ms']:.3f}",
+                f"- p95_ms: {latency['p95_ms']:.3f}",
+                f"- p99_ms: {latency['p99_ms']:.3f}",
+                f"- max_ms: {latency['max_ms']:.3f}",
+                "",
+            ]
+        )
+    lines.append("## Domain Distribution")
     for k, v in sorted(report["domain_distribution"].items(), key=lambda x: (-x[1], x[0])):
         lines.append(f"- {k}: {v}")
     lines.extend(["", "## Spread Distribution (Top 20)"])
@@ -201,21 +312,29 @@ def build_markdown(report: Dict) -> List[str]:
     return lines
 
 
-def main() -> int:
-    args = parse_args()
-    rows = read_jsonl(Path(args.input_path))
+def main(argv: Optional[List[str]] = None) -> int:
+    args = parse_args(argv)
+    with stage("load"):
+        rows = read_jsonl(Path(args.input_path))
     if args.sample_size and args.sample_size > 0:
         rows = rows[: args.sample_size]
 
-    report = run_eval(rows)
-    ensure_artifacts_dir()
-    write_markdown(Path(args.output_md), build_markdown(report))
-    Path(args.output_json).write_text(json.dumps(report, ensure_ascii=False, indent=2), encoding="utf-8")
+    with stage("query"):
+        report = run_eval(rows, workers=args.workers, parallel_min_queries=args.parallel_min_queries)
+    with stage("write"):
+        ensure_artifacts_dir()
+        write_markdown(Path(args.output_md), build_markdown(report))
+        Path(args.output_json).write_text(json.dumps(report, ensure_ascii=False, indent=2), encoding="utf-8")
     print(f"[router_eval] total={report['total']} anomaly_rate={report['anomaly_rate']:.4f}")
+    latency = report["detect_latency"]
+    print(
+        f"[router_eval] detect mode={report['detect']['mode']} unique={report['detect']['unique_queries']} "
+        f"p50={latency['p50_ms']:.3f}ms p95={latency['p95_ms']:.3f}ms p99={latency['p99_ms']:.3f}ms"
+    )
     print(f"[router_eval] wrote: {args.output_md}")
     print(f"[router_eval] wrote: {args.output_json}")
     return 0
 
 
 if __name__ == "__main__":
-    raise SystemExit(main())
+    raise SystemExit(run_profiled("tarot_router_eval", main))
@@ -3,11 +3,14 @@
 
 from __future__ import annotations
 
+import argparse
 import ast
 import json
 import re
 from pathlib import Path
 
+from pipeline_profiling import run_profiled, stage
+
 CORPUS_PATH = Path("backend_ai/data/tarot_corpus/tarot_corpus_v1_1.jsonl")
 
 
@@ -49,6 +52,7 @@ def clean_text(text: str, card_name: str) -> str:
 
 
 def main() -> int:
+    argparse.ArgumentParser(description=__doc__).parse_args()
     if not CORPUS_PATH.exists():
         raise SystemExit(f"Missing corpus: {CORPUS_PATH}")
 
@@ -56,34 +60,36 @@ def main() -> int:
     card_name_fixed = 0
     text_fixed = 0
 
-    with CORPUS_PATH.open("r", encoding="utf-8-sig") as f:
-        for line in f:
-            stripped = line.strip()
-            if not stripped:
-                continue
-            row = json.loads(stripped)
-
-            original_card_name = row.get("card_name")
-            normalized_card_name = normalize_card_name(original_card_name)
-            if normalized_card_name and normalized_card_name != original_card_name:
-                row["card_name"] = normalized_card_name
-                card_name_fixed += 1
-
-            original_text = str(row.get("text") or "")
-            cleaned = clean_text(original_text, row.get("card_name") or "")
-            if cleaned != original_text:
-                row["text"] = cleaned
-                text_fixed += 1
-
-            rows.append(row)
-
-    with CORPUS_PATH.open("w", encoding="utf-8") as f:
-        for row in rows:
-            f.write(json.dumps(row, ensure_ascii=False) + "\n")
+    with stage("parse"):
+        with CORPUS_PATH.open("r", encoding="utf-8-sig") as f:
+            for line in f:
+                stripped = line.strip()
+                if not stripped:
+                    continue
+                row = json.loads(stripped)
+
+                original_card_name = row.get("card_name")
+                normalized_card_name = normalize_card_name(original_card_name)
+                if normalized_card_name and normalized_card_name != original_card_name:
+                    row["card_name"] = normalized_card_name
+                    card_name_fixed += 1
+
+                original_text = str(row.get("text") or "")
+                cleaned = clean_text(original_text, row.get("card_name") or "")
+                if cleaned != original_text:
+                    row["text"] = cleaned
+                    text_fixed += 1
+
+                rows.append(row)
+
+    with stage("write"):
+        with CORPUS_PATH.open("w", encoding="utf-8") as f:
+            for row in rows:
+                f.write(json.dumps(row, ensure_ascii=False) + "\n")
 
     print(f"rows={len(rows)} card_name_fixed={card_name_fixed} text_fixed={text_fixed}")
     return 0
 
 
 if __name__ == "__main__":
-    raise SystemExit(main())
+    raise SystemExit(run_profiled("tarot_sync_corpus_quality", main))
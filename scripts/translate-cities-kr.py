@@ -26,33 +26,61 @@ entries (~1%) 만 한글 매핑이라 KO locale 사용자에게 99% 도시가 
 
 옵션
 ----
-  --batch-size N   (default 60)  — 한 API call 당 도시 수
-  --concurrency N  (default 5)   — 동시 in-flight API 호출 수
-  --max-cities N                — 테스트용. N 개만 처리 후 종료.
-  --model MODEL    (default claude-haiku-4-5)  — 다른 모델 강제 시 사용
-  --dry-run                     — API 호출 안 하고 batch 수만 출력
+  --batch-size N        (default 60)  — 한 API call 당 도시 수
+  --concurrency N       (default 5)   — 시작 동시 in-flight 호출 수 (AIMD 초기값)
+  --max-concurrency N   (default 16)  — AIMD 가 늘릴 수 있는 동시 호출 상한
+  --rps R               (default 4)   — token bucket 초당 요청 수 상한
+  --max-cities N                     — 테스트용. N 개만 처리 후 종료.
+  --model MODEL         (default claude-haiku-4-5)  — 다른 모델 강제 시 사용
+  --endpoint URL                     — Messages API URL (로컬 stub 서버 테스트용)
+  --cache-dir DIR       (default .cache/translate-cities-kr)
+  --no-cache                         — 응답 캐시 읽기/쓰기 끄기
+  --dry-run                          — API 호출 안 하고 batch 수만 출력
+
+동시성 / 재시도
+--------------
+asyncio 파이프라인. 모든 batch 는 token bucket(--rps) 을 통과한 뒤 AIMD
+동시성 제한 안에서 호출된다. 성공하면 동시성 한도가 +1/limit 씩 천천히
+늘고, 429 / 5xx / 네트워크 오류면 절반으로 줄어든다. 재시도 대기는
+asyncio.sleep 이라 다른 batch 진행을 막지 않는다 (429 의 Retry-After 존중).
+
+응답 캐시
+---------
+(model, name, country, region) 를 key 로 도시 하나씩 --cache-dir 의
+translations.sqlite 에 저장한다. batch 를 만들기 전에 캐시에서 먼저 채우므로,
+중간에 실패/중단 후 재실행해서 batch 구성이 바뀌어도 이미 번역된 이름에
+다시 비용을 내지 않는다. 응답이 올 때마다 받은 이름만 바로 저장하고, 빠진
+이름만 (비었거나 JSON 이 아닌 응답이면 batch 전체를) 다시 보낸다.
 """
 
 import argparse
-import concurrent.futures
+import asyncio
 import json
 import os
 import random
 import re
 import signal
+import sqlite3
 import sys
 import time
 from pathlib import Path
 from urllib.request import Request, urlopen
 from urllib.error import HTTPError, URLError
 
+from city_name_utils import kr_lookup_key, load_key_table
+from pipeline_profiling import add_counters, run_profiled, stage
+
 ROOT = Path(__file__).resolve().parent.parent
 CITIES_PATH = ROOT / "public" / "data" / "cities.min.json"
 KR_PATH = ROOT / "src" / "lib" / "cities" / "data" / "city-names-kr.json"
+DEFAULT_CACHE_DIR = ROOT / ".cache" / "translate-cities-kr"
 
 ANTHROPIC_ENDPOINT = "https://api.anthropic.com/v1/messages"
 DEFAULT_MODEL = "claude-haiku-4-5-20251001"
 
+MAX_ATTEMPTS = 5
+RETRYABLE_STATUS = (429, 500, 502, 503, 504, 529)
+
 SYSTEM_PROMPT = (
     "You are a Korean toponym (지명) translation assistant. "
     "Given a JSON array of English city names with their country and admin region, "
@@ -90,36 +118,154 @@ def save_kr(mapping: dict[str, str]) -> None:
     # Sort for stable diffs.
     out = {k: mapping[k] for k in sorted(mapping)}
     KR_PATH.parent.mkdir(parents=True, exist_ok=True)
-    with KR_PATH.open("w", encoding="utf-8") as f:
+    with stage("write"), KR_PATH.open("w", encoding="utf-8") as f:
         json.dump(out, f, ensure_ascii=False, indent=2)
         f.write("\n")
 
 
-# ────────────────────────────────── API call
+# ────────────────────────────────── response cache
+
 
+class ResponseCache:
+    """(model, name, country, region) → 한글명 을 sqlite 하나에 보관.
 
-def call_anthropic(
-    api_key: str,
-    model: str,
-    batch: list[dict],
-    attempt: int = 0,
-) -> dict[str, str]:
-    """Translate one batch via Anthropic Messages API. Returns {English: 한글}.
+    도시 단위 key 라 batch 경계와 무관하다. 받은 이름은 응답마다 바로
+    commit 하므로 중간에 죽어도 이미 비용을 낸 번역은 남는다.
+    """
 
-    On HTTP 5xx / 429 / network blip we backoff and retry up to 4 attempts.
+    def __init__(self, root: Path | None):
+        self.root = root
+        self.hits = 0
+        self.misses = 0
+        self._conn: sqlite3.Connection | None = None
+
+    def _db(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self.root.mkdir(parents=True, exist_ok=True)
+            self._conn = sqlite3.connect(str(self.root / "translations.sqlite"))
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS translations (model TEXT NOT NULL, name TEXT NOT NULL, "
+                "country TEXT NOT NULL, region TEXT NOT NULL, kr TEXT NOT NULL, "
+                "PRIMARY KEY (model, name, country, region)) WITHOUT ROWID"
+            )
+        return self._conn
+
+    @staticmethod
+    def key(model: str, entry: dict) -> tuple[str, str, str, str]:
+        return model, entry["name"], entry.get("country") or "", entry.get("region") or ""
+
+    def get(self, model: str, entry: dict) -> str | None:
+        if self.root is None:
+            return None
+        row = self._db().execute(
+            "SELECT kr FROM translations WHERE model = ? AND name = ? AND country = ? AND region = ?",
+            self.key(model, entry),
+        ).fetchone()
+        if row is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return row[0]
+
+    def put(self, model: str, entries: list[dict], result: dict[str, str]) -> None:
+        """entries 중 result 에 번역이 있는 것만 저장."""
+        rows = [(*self.key(model, e), result[e["name"]]) for e in entries if result.get(e["name"])]
+        if self.root is None or not rows:
+            return
+        conn = self._db()
+        conn.executemany("INSERT OR REPLACE INTO translations VALUES (?, ?, ?, ?, ?)", rows)
+        conn.commit()
+
+
+# ────────────────────────────────── rate / concurrency control
+
+
+class TokenBucket:
+    """초당 rate 개 토큰, 최대 capacity 개까지 burst 허용."""
+
+    def __init__(self, rate: float, capacity: float | None = None):
+        self.rate = max(rate, 0.01)
+        self.capacity = capacity if capacity is not None else max(1.0, self.rate)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self) -> None:
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1.0:
+                    self.tokens -= 1.0
+                    return
+                await asyncio.sleep((1.0 - self.tokens) / self.rate)
+
+
+class AimdLimiter:
+    """AIMD 동시성 제한: 성공 시 +1/limit (RTT 당 약 +1), 429/5xx 시 절반.
+
+    같은 폭주에서 여러 in-flight 요청이 동시에 429 를 받아 한도가 1 까지
+    연속으로 꺾이지 않도록, 감소는 cooldown 초에 한 번만 반영한다.
     """
+
+    def __init__(self, initial: int, minimum: int = 1, maximum: int = 16, cooldown: float = 2.0):
+        self.minimum = max(1, minimum)
+        self.maximum = max(self.minimum, maximum)
+        self.limit = float(min(max(initial, self.minimum), self.maximum))
+        self.cooldown = cooldown
+        self.in_flight = 0
+        self._last_decrease = 0.0
+        self._cond = asyncio.Condition()
+
+    async def __aenter__(self) -> "AimdLimiter":
+        async with self._cond:
+            await self._cond.wait_for(lambda: self.in_flight < int(self.limit))
+            self.in_flight += 1
+        return self
+
+    async def __aexit__(self, *_exc) -> None:
+        async with self._cond:
+            self.in_flight -= 1
+            self._cond.notify_all()
+
+    def on_success(self) -> None:
+        self.limit = min(float(self.maximum), self.limit + 1.0 / self.limit)
+
+    def on_throttle(self) -> None:
+        now = time.monotonic()
+        if now - self._last_decrease < self.cooldown:
+            return
+        self._last_decrease = now
+        self.limit = max(float(self.minimum), self.limit / 2.0)
+
+
+# ────────────────────────────────── API call
+
+
+class RetryableError(RuntimeError):
+    def __init__(self, message: str, retry_after: float | None = None):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+def build_payload(model: str, batch: list[dict]) -> dict:
     user_msg = (
         "Translate to Korean. Return ONLY a JSON object. Input:\n"
         + json.dumps(batch, ensure_ascii=False)
     )
-    payload = {
+    return {
         "model": model,
         "max_tokens": 4096,
         "system": SYSTEM_PROMPT,
         "messages": [{"role": "user", "content": user_msg}],
     }
+
+
+def post_messages(endpoint: str, api_key: str, payload: dict) -> dict:
+    """Messages API 1회 호출 (blocking). 429/5xx/네트워크 오류는 RetryableError."""
     req = Request(
-        ANTHROPIC_ENDPOINT,
+        endpoint,
         data=json.dumps(payload).encode("utf-8"),
         headers={
             "content-type": "application/json",
@@ -130,21 +276,23 @@ def call_anthropic(
     )
     try:
         with urlopen(req, timeout=90) as resp:
-            data = json.loads(resp.read().decode("utf-8"))
+            return json.loads(resp.read().decode("utf-8"))
     except HTTPError as e:
         # 4xx surfaces immediately (probably malformed); 5xx + 429 retry.
         body = e.read().decode("utf-8", errors="replace")[:400]
-        if e.code in (429, 500, 502, 503, 504) and attempt < 4:
-            backoff = (2**attempt) + random.uniform(0, 1)
-            time.sleep(backoff)
-            return call_anthropic(api_key, model, batch, attempt + 1)
+        if e.code in RETRYABLE_STATUS:
+            retry_after = None
+            try:
+                retry_after = float(e.headers.get("retry-after") or "")
+            except (TypeError, ValueError):
+                pass
+            raise RetryableError(f"Anthropic HTTP {e.code}: {body}", retry_after) from e
         raise RuntimeError(f"Anthropic HTTP {e.code}: {body}") from e
     except URLError as e:
-        if attempt < 4:
-            time.sleep((2**attempt) + random.uniform(0, 1))
-            return call_anthropic(api_key, model, batch, attempt + 1)
-        raise RuntimeError(f"Anthropic network error: {e}") from e
+        raise RetryableError(f"Anthropic network error: {e}") from e
 
+
+def parse_translation(data: dict) -> dict[str, str]:
     # Extract text content. Claude responses: { content: [{type:'text', text:'…'}] }
     text = ""
     for block in data.get("content", []):
@@ -163,15 +311,135 @@ def call_anthropic(
     return {str(k): str(v) for k, v in parsed.items() if isinstance(v, str) and v.strip()}
 
 
+class Translator:
+    """batch 하나를 cache → token bucket → AIMD 순으로 통과시켜 번역."""
+
+    def __init__(
+        self,
+        api_key: str,
+        model: str,
+        endpoint: str,
+        cache: ResponseCache,
+        bucket: TokenBucket,
+        limiter: AimdLimiter,
+    ):
+        self.api_key = api_key
+        self.model = model
+        self.endpoint = endpoint
+        self.cache = cache
+        self.bucket = bucket
+        self.limiter = limiter
+        self.api_calls = 0
+        self.throttled = 0
+        self.incomplete = 0
+
+    async def translate(self, batch: list[dict]) -> dict[str, str]:
+        """batch 번역. 응답에서 빠진 이름만 다시 보내고, 끝내 빠진 이름은 결과에 없다."""
+        result: dict[str, str] = {}
+        pending = batch
+        for attempt in range(MAX_ATTEMPTS):
+            await self.bucket.acquire()
+            try:
+                async with self.limiter:
+                    self.api_calls += 1
+                    data = await asyncio.to_thread(
+                        post_messages, self.endpoint, self.api_key, build_payload(self.model, pending)
+                    )
+            except RetryableError as e:
+                self.throttled += 1
+                self.limiter.on_throttle()
+                if attempt + 1 >= MAX_ATTEMPTS:
+                    if result:
+                        return result
+                    raise RuntimeError(str(e)) from e
+                backoff = e.retry_after if e.retry_after is not None else (2**attempt) + random.uniform(0, 1)
+                await asyncio.sleep(backoff)
+                continue
+            self.limiter.on_success()
+            try:
+                got = parse_translation(data)
+            except RuntimeError as e:  # JSON 이 아닌 응답은 빈 응답과 같게 — 전부 다시 보낸다.
+                print(f"  ↳ unusable response ({len(pending)} names): {e}", file=sys.stderr)
+                got = {}
+            self.cache.put(self.model, pending, got)
+            result.update({e["name"]: got[e["name"]] for e in pending if got.get(e["name"])})
+            pending = [e for e in pending if e["name"] not in result]
+            if not pending:
+                return result
+            self.incomplete += 1
+        # 끝내 빠진 이름은 캐시에도 없으니 다음 실행의 queue 에 다시 들어간다.
+        return result
+
+
 # ────────────────────────────────── main loop
 
 
+async def run_pipeline(
+    translator: Translator,
+    batches: list[list[dict]],
+    kr: dict[str, str],
+    stop_requested,
+) -> int:
+    """모든 batch 를 비동기로 번역하며 kr 에 병합. 추가된 이름 수 반환."""
+    total_added = 0
+    started = time.time()
+    # 매 N batch 마다 부분 저장 — 긴 작업 중 사고 시 손실 최소화.
+    SAVE_EVERY = 20
+
+    async def _one(batch: list[dict]):
+        try:
+            return batch, await translator.translate(batch), None
+        except Exception as e:  # noqa: BLE001 — batch 단위 실패는 기록 후 계속
+            return batch, None, e
+
+    tasks = [asyncio.create_task(_one(batch)) for batch in batches]
+    completed = 0
+    try:
+        for fut in asyncio.as_completed(tasks):
+            batch, result, err = await fut
+            completed += 1
+            if err is not None:
+                print(f"batch failed (size {len(batch)}): {err}", file=sys.stderr)
+            else:
+                new_keys = 0
+                for entry in batch:
+                    name = entry["name"]
+                    if name in result and result[name] and name not in kr:
+                        kr[name] = result[name]
+                        new_keys += 1
+                total_added += new_keys
+                elapsed = time.time() - started
+                print(
+                    f"  [{completed}/{len(batches)}] +{new_keys} "
+                    f"(total {total_added}, {elapsed:.0f}s, "
+                    f"concurrency {translator.limiter.limit:.1f})",
+                    flush=True,
+                )
+
+            if completed % SAVE_EVERY == 0:
+                save_kr(kr)
+                print(f"  ↳ checkpoint saved ({len(kr)} entries)")
+
+            if stop_requested():
+                break
+    finally:
+        for t in tasks:
+            t.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+    return total_added
+
+
 def main() -> int:
     parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
     parser.add_argument("--batch-size", type=int, default=60)
     parser.add_argument("--concurrency", type=int, default=5)
+    parser.add_argument("--max-concurrency", type=int, default=16)
+    parser.add_argument("--rps", type=float, default=4.0)
     parser.add_argument("--max-cities", type=int, default=None)
     parser.add_argument("--model", default=DEFAULT_MODEL)
+    parser.add_argument("--endpoint", default=os.environ.get("ANTHROPIC_ENDPOINT", ANTHROPIC_ENDPOINT))
+    parser.add_argument("--cache-dir", type=Path, default=DEFAULT_CACHE_DIR)
+    parser.add_argument("--no-cache", action="store_true")
     parser.add_argument("--dry-run", action="store_true")
     args = parser.parse_args()
 
@@ -180,32 +448,53 @@ def main() -> int:
         print("error: ANTHROPIC_API_KEY env var required (or use --dry-run)", file=sys.stderr)
         return 2
 
-    cities = load_cities()
-    print(f"loaded {len(cities)} cities")
-    kr = load_existing_kr()
-    print(f"existing KR mappings: {len(kr)}")
+    with stage("load"):
+        cities = load_cities()
+        print(f"loaded {len(cities)} cities")
+        kr = load_existing_kr()
+        print(f"existing KR mappings: {len(kr)}")
 
     # Build queue of (name, country, region) for cities without KR mapping.
     # Dedupe by name (multiple cities sharing a name get one translation).
-    seen: set[str] = set()
-    queue: list[dict] = []
-    for c in cities:
-        name = c.get("name")
-        if not name or name in seen or name in kr:
-            continue
-        seen.add(name)
-        queue.append({
-            "name": name,
-            "country": c.get("country", ""),
-            "region": c.get("region", ""),
-        })
-
-    if args.max_cities:
-        queue = queue[: args.max_cities]
+    # formatter 는 capitalizeWords 키로 조회하므로, 대소문자/따옴표만 다른
+    # 기존 매핑(GeoNames 보강분 등)이 있으면 다시 번역하지 않는다.
+    with stage("parse"):
+        covered = {kr_lookup_key(k) for k in kr}
+        key_rows = load_key_table(CITIES_PATH, cities)
+        seen: set[str] = set()
+        queue: list[dict] = []
+        for c, keys in zip(cities, key_rows):
+            name = c.get("name")
+            if not name or name in seen or name in kr or keys[0] in covered:
+                continue
+            seen.add(name)
+            queue.append({
+                "name": name,
+                "country": c.get("country", ""),
+                "region": c.get("region", ""),
+            })
+
+        if args.max_cities:
+            queue = queue[: args.max_cities]
+
+        # batch 를 만들기 전에 도시 단위 캐시로 채운다 — batch 구성과 무관하게 hit.
+        cache = ResponseCache(None if args.no_cache else args.cache_dir)
+        misses: list[dict] = []
+        for entry in queue:
+            hit = cache.get(args.model, entry)
+            if hit:
+                kr[entry["name"]] = hit
+            else:
+                misses.append(entry)
+        print(f"from cache: {len(queue) - len(misses)} names")
+        queue = misses
 
     print(f"to translate: {len(queue)} unique names")
     batches = [queue[i : i + args.batch_size] for i in range(0, len(queue), args.batch_size)]
-    print(f"batches: {len(batches)} (size {args.batch_size}, concurrency {args.concurrency})")
+    print(
+        f"batches: {len(batches)} (size {args.batch_size}, concurrency {args.concurrency}"
+        f"→max {args.max_concurrency}, rps {args.rps})"
+    )
 
     if args.dry_run:
         return 0
@@ -221,52 +510,44 @@ def main() -> int:
     signal.signal(signal.SIGINT, _handle_signal)
     signal.signal(signal.SIGTERM, _handle_signal)
 
-    total_added = 0
     started = time.time()
-    # 매 N batch 마다 부분 저장 — 긴 작업 중 사고 시 손실 최소화.
-    SAVE_EVERY = 20
 
-    completed = 0
-    with concurrent.futures.ThreadPoolExecutor(max_workers=args.concurrency) as executor:
-        futures = {
-            executor.submit(call_anthropic, api_key, args.model, batch): batch
-            for batch in batches
-        }
-        for fut in concurrent.futures.as_completed(futures):
-            batch = futures[fut]
-            try:
-                result = fut.result()
-            except Exception as e:
-                print(f"batch failed (size {len(batch)}): {e}", file=sys.stderr)
-                completed += 1
-                continue
-            new_keys = 0
-            for entry in batch:
-                name = entry["name"]
-                if name in result and result[name] and name not in kr:
-                    kr[name] = result[name]
-                    new_keys += 1
-            total_added += new_keys
-            completed += 1
-            elapsed = time.time() - started
-            print(
-                f"  [{completed}/{len(batches)}] +{new_keys} "
-                f"(total {total_added}, {elapsed:.0f}s)",
-                flush=True,
-            )
-
-            if completed % SAVE_EVERY == 0:
-                save_kr(kr)
-                print(f"  ↳ checkpoint saved ({len(kr)} entries)")
-
-            if stop_requested:
-                break
+    async def _run() -> tuple[Translator, int]:
+        # asyncio primitive 들은 실행 중인 loop 안에서 만든다.
+        translator = Translator(
+            api_key=api_key,
+            model=args.model,
+            endpoint=args.endpoint,
+            cache=cache,
+            bucket=TokenBucket(rate=args.rps),
+            limiter=AimdLimiter(initial=args.concurrency, maximum=args.max_concurrency),
+        )
+        added = await run_pipeline(translator, batches, kr, lambda: stop_requested)
+        return translator, added
+
+    with stage("query"):
+        translator, total_added = asyncio.run(_run())
+    add_counters(
+        "translate",
+        lambda: {
+            "api_calls": translator.api_calls,
+            "throttled": translator.throttled,
+            "incomplete": translator.incomplete,
+            "cache_hits": cache.hits,
+            "cache_misses": cache.misses,
+        },
+    )
 
     save_kr(kr)
     print(f"\ndone. final mapping size: {len(kr)} (+{total_added} new)")
+    print(
+        f"api calls: {translator.api_calls} (throttled/retried {translator.throttled}, "
+        f"incomplete/re-sent {translator.incomplete}), "
+        f"cache hit {cache.hits} / miss {cache.misses}"
+    )
     print(f"elapsed: {time.time() - started:.0f}s")
     return 0
 
 
 if __name__ == "__main__":
-    sys.exit(main())
+    sys.exit(run_profiled("translate_cities_kr", main))